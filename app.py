@@ -1,5 +1,10 @@
+import os, sys, threading, time
 
-import os, sys, threading
+from core.startup import StartupProfile
+
+PROFILE = StartupProfile(enabled="--profile-startup" in sys.argv)
+
+from concurrent.futures import ThreadPoolExecutor
 import importlib.util
 import json
 import shutil
@@ -9,76 +14,33 @@ from pathlib import Path
 os.environ.setdefault("QT_ENABLE_HIGHDPI_SCALING", "1")
 os.environ.setdefault("QT_QUICK_CONTROLS_STYLE", "Basic")
 
-from PySide6.QtCore import QObject, Signal, Slot, QUrl, Qt, QTimer, QSettings
-from PySide6.QtGui import QIcon, QAction
+from PySide6.QtCore import QObject, Signal, Slot, QUrl, Qt, QTimer, QSettings, QFileSystemWatcher
+from PySide6.QtGui import QIcon, QAction, QGuiApplication
 from PySide6.QtQml import QQmlApplicationEngine
 from PySide6.QtWidgets import QApplication, QSystemTrayIcon, QMenu
 
-# Optional global hotkey via 'keyboard' (pure Python, Windows-friendly)
-try:
-    import keyboard
-except Exception:
-    keyboard = None
+PROFILE.mark("Qt imports")
 
-from core.config import load_actions
+from core.config import action_programs, action_sources, diff_actions, expand_env, load_actions, preload_actions, runnable
 from core.process import ProcessRunner
-from core.bincheck import preflight, probe_status
+from core.joblog import JobLogStore
+from core.models import ActionsModel, JobLogModel, LogModel, PaletteModel, PinnedModel
+from core.palette import Frecency, ModeIndex, PaletteIndex
 
 APP_DIR = Path(__file__).resolve().parent
+# background pools, created on first use: name -> max workers
+POOLS = {"webhook": 4, "hash": 2, "palette": 1}
+# tool statuses are probed again when the app is activated this long after the last probe
+PROBE_REFRESH_S = 300
 
-# ---- Windows Acrylic/Mica (system blur) ----
-from ctypes import Structure, c_int, c_void_p, sizeof, byref, windll
-from ctypes.wintypes import HWND, DWORD
-
-ACCENT_DISABLED = 0
-ACCENT_ENABLE_BLURBEHIND = 3
-ACCENT_ENABLE_ACRYLICBLURBEHIND = 4
-WCA_ACCENT_POLICY = 19
-
-class ACCENT_POLICY(Structure):
-    _fields_ = [
-        ("AccentState", c_int),
-        ("AccentFlags", c_int),
-        ("GradientColor", DWORD),  # ARGB
-        ("AnimationId", c_int),
-    ]
-
-class WINDOWCOMPOSITIONATTRIBDATA(Structure):
-    _fields_ = [
-        ("Attribute", c_int),
-        ("Data", c_void_p),
-        ("SizeOfData", c_int),
-    ]
-
-def _make_argb(a, r, g, b):
-    return (a << 24) | (b << 16) | (g << 8) | r
-
-def set_accent(hwnd: int, state: int, opacity=0xEE, tint=(26,26,26)):
-    accent = ACCENT_POLICY()
-    accent.AccentState = state
-    accent.AccentFlags = 0
-    r, g, b = tint
-    accent.GradientColor = _make_argb(opacity, r, g, b)
-
-    data = WINDOWCOMPOSITIONATTRIBDATA()
-    data.Attribute = WCA_ACCENT_POLICY
-    data.SizeOfData = sizeof(accent)
-    data.Data = c_void_p(c_void_p.from_buffer(accent).value)
-
-    SWCA = windll.user32.SetWindowCompositionAttribute
-    SWCA.argtypes = [HWND, c_void_p]
-    SWCA.restype = c_int
-    SWCA(HWND(hwnd), byref(data))
+PROFILE.mark("core imports")
 
 def enable_blur(window, acrylic=True):
-    try:
-        hwnd = int(window.winId())
-        try:
-            set_accent(hwnd, ACCENT_ENABLE_ACRYLICBLURBEHIND if acrylic else ACCENT_ENABLE_BLURBEHIND)
-        except Exception:
-            set_accent(hwnd, ACCENT_ENABLE_BLURBEHIND)
-    except Exception as e:
-        print(f"[WARN] Blur enable failed: {e}")
+    # the ctypes windll bindings only exist on Windows; load them on demand
+    if os.name != "nt":
+        return
+    from core.acrylic import enable_blur as _enable_blur
+    _enable_blur(window, acrylic)
 
 def _load_dotenv():
     env_path = APP_DIR / ".env"
@@ -125,12 +87,31 @@ class Bridge(QObject):
     modeChanged = Signal()
     statusesChanged = Signal()
     clickThroughChanged = Signal()
-
-    def __init__(self, runner: ProcessRunner, engine: QQmlApplicationEngine, parent=None):
+    autoReloadChanged = Signal()
+    paletteRequested = Signal()
+    # delivered from probe worker threads, handled on the GUI thread
+    _toolProbed = Signal(str, 'QVariant')
+    _probeDone = Signal()
+    _preflightDone = Signal('QVariant')
+    _webhookDone = Signal(str, int, str)
+    _spoolResult = Signal(str, 'QVariant', int, str)
+    _spoolError = Signal(str)
+    _historyWritten = Signal(str)
+    _inputsHashed = Signal(str, str, 'QVariant', bool)
+    _ocrImagesFound = Signal(str, str, 'QVariant')
+    _paletteIndexed = Signal(object)
+
+    def __init__(self, runner: ProcessRunner, engine: QQmlApplicationEngine, parent=None,
+                 config_dir: Path | None = None):
         super().__init__(parent)
         self.runner = runner
+        # mode files and everything the panel keeps between runs
+        self._config_dir = Path(config_dir) if config_dir else APP_DIR / "config"
+        self._cache_dir = self._config_dir / ".cache"
         self._click_through = False
         self._actions = []
+        self.actions_model = ActionsModel(self)
+        self.pinned_model = PinnedModel(self)
         self._engine = engine
         self._settings = QSettings("overlay_router", "panel")
         self._modes = {
@@ -141,7 +122,7 @@ class Bridge(QObject):
             "n8n": "actions_n8n.yaml",
         }
         self._current_mode = self._settings.value("mode", "default")
-        self._pinned_path = APP_DIR / "config" / "pinned.json"
+        self._pinned_path = self._config_dir / "pinned.json"
         self._pinned_path.parent.mkdir(exist_ok=True)
         self._pinned = []
         self._statuses = {
@@ -150,21 +131,371 @@ class Bridge(QObject):
             "ffmpeg": {"state": "unknown", "version": ""},
             "n8n": {"state": "unknown", "version": "not set"},
         }
+        self._probe_running = False
+        self._probe_pending = False
+        self._probed_at = 0.0
+        self._toolProbed.connect(self._on_tool_probed)
+        self._probeDone.connect(self._on_probe_done)
+        self._preflightDone.connect(self._on_preflight_done)
+        # the thread pools, the webhook spool, the run history and the skip
+        # cache are created on first use; start_services replays the spool
+        # and loads run stats once the first frame is up
+        self._started = False
+        self._pools: dict[str, ThreadPoolExecutor] = {}
+        self._webhookDone.connect(self._on_webhook_done)
+        self._spoolResult.connect(self._on_spool_result)
+        self._spoolError.connect(lambda error: self.log.emit(f"[ERR] spool: {error}"))
+        self._spool = None
+        self._kb_bridge = None
+        # run telemetry: job id -> (action id, mode) until the job's stats arrive
+        self._job_actions: dict[int, tuple[str, str]] = {}
+        # command actions toast on completion (pipelines and OCR batches do it once, at the end)
+        self._job_labels: dict[int, str] = {}
+        self._history = None
+        self._historyWritten.connect(self._refresh_stats)
+        self.runner.jobStats.connect(self._on_job_stats)
+        # inputs:/outputs: skip cache; hashing runs off the GUI thread
+        self._skip_cache = None
+        self._skip_cache_lock = threading.Lock()
+        self._job_fingerprints: dict[int, tuple[str, str]] = {}
+        self._inputsHashed.connect(self._on_inputs_hashed)
+        self._ocrImagesFound.connect(self._on_ocr_images)
+        # command palette over every mode; indexes are built off the GUI thread
+        self.palette_index = PaletteIndex(Frecency(self._config_dir / "palette_usage.json"))
+        QApplication.instance().aboutToQuit.connect(self.shutdown)
+        self.palette_model = PaletteModel(self.palette_index, self)
+        self._paletteIndexed.connect(self._on_palette_indexed)
         self._load_pinned()
         if not self._pinned_path.exists():
             self._save_pinned()
 
+        # hot reload of the active mode file; editors save in bursts (and
+        # often via rename), so events only (re)start a short debounce timer
+        self._auto_reload = self._settings.value("autoReload", True, type=bool)
+        self._loaded_path: Path | None = None
+        self._loaded_stamp = None
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._schedule_hot_reload)
+        self._watcher.directoryChanged.connect(self._schedule_hot_reload)
+        self._reload_timer = QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(300)
+        self._reload_timer.timeout.connect(self._hot_reload)
+
+    def start_services(self) -> None:
+        """Work kept off the startup path: replay a spool left with events by
+        the last run, then load run stats and probe the tools."""
+        self._started = True
+        try:
+            replay = (self._config_dir / "webhook_spool.jsonl").stat().st_size > 0
+        except OSError:
+            replay = False
+        if replay:
+            self._get_spool()
+        self._refresh_stats()
+        self.refreshStatuses()
+        QGuiApplication.instance().applicationStateChanged.connect(self._on_app_state)
+
+    def _on_app_state(self, state) -> None:
+        # the probe cache TTL is only looked at on a probe; re-probe when the
+        # user comes back so a tool installed or removed meanwhile shows up
+        if state == Qt.ApplicationActive and time.monotonic() - self._probed_at > PROBE_REFRESH_S:
+            self.refreshStatuses()
+
+    def shutdown(self) -> None:
+        """Stop the background services (on quit): queued work and writes
+        finish first, and no worker is left to signal into a closing app."""
+        pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.shutdown(wait=True)
+        spool, self._spool = self._spool, None
+        if spool is not None:
+            spool.stop(timeout=2)  # a send in flight is retried from the journal next run
+        history, self._history = self._history, None
+        if history is not None:
+            history.close()
+        self.palette_index.frecency.save()
+
+    def _pool(self, name: str) -> ThreadPoolExecutor:
+        pool = self._pools.get(name)
+        if pool is None:
+            pool = self._pools[name] = ThreadPoolExecutor(max_workers=POOLS[name], thread_name_prefix=name)
+        return pool
+
+    def _get_spool(self):
+        if self._spool is None:
+            from core.spool import WebhookSpool
+
+            self._spool = WebhookSpool(self._config_dir / "webhook_spool.jsonl", on_result=self._spoolResult.emit, on_error=self._spoolError.emit)
+            self._spool.start()
+        return self._spool
+
+    def _get_history(self):
+        if self._history is None:
+            from core.telemetry import RunHistory  # opens SQLite
+
+            self._history = RunHistory(self._config_dir / "history.sqlite3")
+        return self._history
+
+    def _get_skip_cache(self):
+        # hash pool threads; the first call reads the cache file
+        with self._skip_cache_lock:
+            if self._skip_cache is None:
+                from core.skipcache import SkipCache
+
+                self._skip_cache = SkipCache(self._cache_dir / "skip_cache.json")
+            return self._skip_cache
+
     @Slot(str, result=bool)
     def runAction(self, action_id: str) -> bool:
-        action = next((a for a in self._actions if a["id"] == action_id), None)
+        return self._run_action(action_id, force=False)
+
+    @Slot(str, result=bool)
+    def forceRunAction(self, action_id: str) -> bool:
+        """Run even if the action's outputs are up to date."""
+        return self._run_action(action_id, force=True)
+
+    def _run_action(self, action_id: str, force: bool) -> bool:
+        action = self.actions_model.get(action_id)
         if not action:
             self.log.emit(f"[ERR] Action '{action_id}' not found")
             return False
+        self.palette_index.record(self._current_mode, action_id)
+        if action.get("type") == "webhook":
+            return self._run_webhook(action)
+        if action.get("type") == "pipeline":
+            return self._run_pipeline(action)
+        if action.get("type") == "ocr":
+            from core.ocr import find_images
+
+            mode, cwd = self._current_mode, self._action_cwd(action)
+            # globbing big folders stays off the GUI thread
+            fut = self._pool("hash").submit(lambda: self._ocrImagesFound.emit(
+                action_id, mode, find_images(action["ocr"]["images"], cwd)))
+
+            def _found(f):
+                # a bad pattern or an unreadable folder would otherwise do nothing
+                if f.exception() is not None:
+                    self.log.emit(f"[ERR] {action_id}: finding images failed: {f.exception()}")
+
+            fut.add_done_callback(_found)
+            return True
+        if action.get("inputs") and action.get("outputs"):
+            mode = self._current_mode
+            cwd = self._action_cwd(action)
+
+            def _hash():
+                try:
+                    cache = self._get_skip_cache()
+                    # what will actually run: env references expanded, argv or shell string
+                    fp = cache.fingerprint(runnable(action), action["inputs"], cwd)
+                    fresh = cache.is_fresh(f"{mode}/{action_id}", fp, action["outputs"], cwd)
+                    cache.save()
+                except Exception as e:
+                    self.log.emit(f"[WARN] {action_id}: hashing inputs failed: {e}")
+                    fp, fresh = None, False
+                self._inputsHashed.emit(action_id, mode, fp, fresh and not force)
+
+            self._pool("hash").submit(_hash)
+            return True
+        self._start_action(action)
+        return True
+
+    @staticmethod
+    def _action_cwd(action: dict) -> str | None:
+        cwd = action.get("cwd")
+        return cwd if cwd and os.path.isdir(cwd) else None
+
+    def _on_inputs_hashed(self, action_id: str, mode: str, fingerprint, fresh: bool):
+        action = self.actions_model.get(action_id)
+        if action is None or mode != self._current_mode:
+            return  # reloaded or switched mode while hashing
+        if fresh:
+            self.log.emit(f"[SKIP] {action_id}: inputs unchanged and outputs present (hold to force)")
+            self.notify.emit(f"{action['label']}: up to date")
+            return
+        self._start_action(action, fingerprint)
+
+    def _start_action(self, action: dict, fingerprint: str | None = None) -> None:
         cmd = action["command"]
-        self.log.emit(f"[RUN] {cmd}")
-        self.runner.run(cmd)
+        estimate = self.actions_model.get_stats(action["id"]).get("p50")
+        job_id = self.runner.run(runnable(action), cwd=self._action_cwd(action), estimate_ms=estimate,
+                                 limits=action.get("limits"))
+        self._job_actions[job_id] = (action["id"], self._current_mode)
+        self._job_labels[job_id] = action["label"]
+        if fingerprint:
+            self._job_fingerprints[job_id] = (f"{self._current_mode}/{action['id']}", fingerprint)
+        self.log.emit(f"[RUN #{job_id}] {cmd}")
+
+    def _run_pipeline(self, action: dict) -> bool:
+        action_id, mode = action["id"], self._current_mode
+        from core.pipeline import Pipeline
+
+        commands = {s["id"]: s["command"] for s in action["steps"]}
+        pipe = Pipeline(self.runner, action["steps"], cwd=self._action_cwd(action), parent=self)
+
+        def _started(step: str, job_id: int):
+            # steps are recorded in the run history as "<action>.<step>"
+            self._job_actions[job_id] = (f"{action_id}.{step}", mode)
+            self.log.emit(f"[RUN #{job_id}] {action_id}.{step}: {commands[step]}")
+
+        def _finished(code: int):
+            if code == 0:
+                self.log.emit(f"[PIPE] {action_id}: all {len(commands)} steps ok")
+                self.notify.emit(f"{action['label']}: done")
+            else:
+                self.log.emit(f"[PIPE] {action_id}: failed (exit {code})")
+                self.notify.emit(f"{action['label']}: failed")
+            pipe.deleteLater()
+
+        def _step_finished(step: str, code: int):
+            if code == ProcessRunner.CANCELLED:
+                self.log.emit(f"[SKIP] {action_id}.{step}: cancelled after a failed step")
+
+        pipe.stepStarted.connect(_started)
+        pipe.stepFinished.connect(_step_finished)
+        pipe.finished.connect(_finished)
+        pipe.start()
+        return True
+
+    def _on_ocr_images(self, action_id: str, mode: str, images):
+        from core.bincheck import resolve_tesseract
+        from core.ocr import OcrBatch
+
+        action = self.actions_model.get(action_id)
+        if action is None or mode != self._current_mode:
+            return
+        spec, cwd = action["ocr"], self._action_cwd(action)
+        if not images:
+            self.log.emit(f"[ERR] {action_id}: no images match {', '.join(spec['images'])}")
+            return
+        # same executable the status probe found (PATH, TESSERACT_PATH, default dirs)
+        exe = self._statuses["tesseract"].get("path") or resolve_tesseract()
+        if not exe:
+            self.log.emit(f"[ERR] {action_id}: tesseract not found (set TESSERACT_PATH)")
+            return
+        batch = OcrBatch(self.runner, exe, images, lang=spec["lang"], workers=spec["workers"],
+                         threads=spec["threads"], cwd=cwd, limits=action.get("limits"), parent=self)
+        out_dir = Path(cwd or ".", spec["out"]) if spec["out"] else None
+        base = Path(cwd or ".").resolve()
+
+        def _started(job_id: int, count: int):
+            self._job_actions[job_id] = (f"{action_id}.ocr", mode)
+            self.log.emit(f"[RUN #{job_id}] {action_id}: tesseract over {count} images")
+
+        def _image(path: str, text: str):
+            first = next((l for l in text.splitlines() if l.strip()), "")
+            self.log.emit(f"[OCR] {os.path.basename(path)}: {first[:80]} ({len(text)} chars)")
+            if out_dir is None:
+                return
+            try:
+                rel = Path(path).resolve().relative_to(base)
+            except ValueError:
+                rel = Path(Path(path).name)
+            dest = out_dir / rel.with_suffix(".txt")
+            try:
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                dest.write_text(text + "\n", encoding="utf-8")
+            except OSError as e:
+                self.log.emit(f"[WARN] {action_id}: {e}")
+
+        def _finished(done: int, failed: int):
+            self.log.emit(f"[OCR] {action_id}: {done} images done, {failed} failed")
+            self.notify.emit(f"{action['label']}: {done} OCR'd" + (f", {failed} failed" if failed else ""))
+            batch.deleteLater()
+
+        batch.workerStarted.connect(_started)
+        batch.imageDone.connect(_image)
+        batch.imageFailed.connect(lambda path, why: self.log.emit(f"[FAIL] {os.path.basename(path)}: {why}"))
+        batch.finished.connect(_finished)
+        batch.start()
+
+    def _on_job_stats(self, job_id: int, stats):
+        done = self._job_fingerprints.pop(job_id, None)
+        if done is not None:
+            # remember what a good run was built from; a failed run invalidates it
+            # hashed before the run, so the cache is already loaded
+            if stats["code"] == 0:
+                self._skip_cache.record(*done)
+            else:
+                self._skip_cache.forget(done[0])
+            self._pool("hash").submit(self._skip_cache.save)
+        label = self._job_labels.pop(job_id, None)
+        if label is not None:
+            self.notify.emit(f"{label}: done" if stats["code"] == 0 else f"{label}: failed (exit {stats['code']})")
+        key = self._job_actions.pop(job_id, None)
+        if key is None:
+            return
+        action_id, mode = key
+        msg = f"[DONE #{job_id}] {action_id}: exit {stats['code']}"
+        if stats["wall_ms"] is not None:
+            msg += f" in {stats['wall_ms'] / 1000:.2f}s (waited {stats['wait_ms'] / 1000:.2f}s"
+            if stats["user_s"] is not None:
+                msg += f", cpu {stats['user_s'] + stats['sys_s']:.2f}s, peak {stats['peak_rss'] / 2**20:.1f} MB"
+            msg += ")"
+        self.log.emit(msg)
+        fut = self._get_history().record(action_id, mode, stats)
+        fut.add_done_callback(lambda _: self._historyWritten.emit(mode))
+
+    def _refresh_stats(self, mode: str = ""):
+        if mode and mode != self._current_mode:
+            return
+        try:
+            self.actions_model.set_stats(self._get_history().summary(self._current_mode))
+        except Exception as e:
+            self.log.emit(f"[WARN] run history: {e}")
+
+    def _run_webhook(self, action: dict) -> bool:
+        from core import webhook  # keeps http.client off the startup path
+
+        hook = action["webhook"]
+        url = expand_env(hook["url"])
+        if not url.lower().startswith(("http://", "https://")):
+            self.log.emit(f"[ERR] {action['id']}: webhook URL not set ({hook['url']})")
+            return False
+        data = {k: expand_env(v) for k, v in hook["data"].items()}
+        if hook["clipboard"]:
+            # clipboard is GUI-thread only, so read it before dispatching
+            data.setdefault("clipboard", QGuiApplication.clipboard().text())
+        cwd = action.get("cwd")
+        base = Path(cwd) if cwd and os.path.isdir(cwd) else Path.cwd()
+        files = {k: str(base / expand_env(v)) for k, v in hook["files"].items()}
+        headers = {k: expand_env(v) for k, v in hook["headers"].items()}
+        if hook["spool"]:
+            spool = self._get_spool()
+            spool.enqueue(url, data, headers, batch=hook["batch"])
+            self.log.emit(f"[SPOOL] {action['id']}: queued for {url} ({spool.pending_count()} pending)")
+            return True
+        self.log.emit(f"[WEBHOOK] {hook['method']} {url}")
+
+        def _call():
+            try:
+                status, text = webhook.send(url, hook["method"], data, files, headers, gzip_json=hook["gzip"])
+            except Exception as e:
+                status, text = 0, f"{type(e).__name__}: {e}"
+            self._webhookDone.emit(action["id"], status, text)
+
+        self._pool("webhook").submit(_call)
         return True
 
+    def _on_webhook_done(self, action_id: str, status: int, text: str):
+        action = self.actions_model.get(action_id)
+        label = action["label"] if action else action_id
+        if status == 0:
+            self.log.emit(f"[ERR] {action_id}: {text}")
+            self.notify.emit(f"{label}: failed")
+            return
+        self.log.emit(f"[WEBHOOK] {action_id}: {status} {text[:200]}")
+        self.notify.emit(f"{label}: {status}")
+
+    def _on_spool_result(self, url: str, ids, status: int, error: str):
+        if 200 <= status < 300:
+            self.log.emit(f"[SPOOL] {len(ids)} event(s) -> {url}: {status}")
+        elif error and not status:
+            self.log.emit(f"[SPOOL] {url}: {error} (will retry)")
+        else:
+            self.log.emit(f"[SPOOL] {url}: HTTP {status}" + (f" ({error})" if error else ""))
+
     @Slot()
     def toggleClickThrough(self):
         self._click_through = not self._click_through
@@ -195,7 +526,9 @@ class Bridge(QObject):
             if isinstance(pid, str) and pid not in seen:
                 seen.add(pid)
                 norm.append(pid)
-        self._pinned = [pid for pid in norm if any(a.get("id") == pid for a in self._actions)]
+        self._pinned = [pid for pid in norm if pid in self.actions_model]
+        self.pinned_model.sync([self.actions_model.get(pid) for pid in self._pinned])
+        self.actions_model.set_pinned_ids(self._pinned)
 
     def _save_pinned(self):
         try:
@@ -206,57 +539,173 @@ class Bridge(QObject):
         except Exception:
             pass
 
+    def _mode_path(self) -> Path:
+        fname = self._modes.get(self._current_mode, "actions.yaml")
+        return self._config_dir / fname
+
+    @staticmethod
+    def _stamp(path: Path):
+        """mtime/size of the mode file and its include: fragments."""
+        stamps = []
+        for src in action_sources(path):
+            try:
+                st = src.stat()
+            except OSError:
+                return None
+            stamps.append((st.st_mtime_ns, st.st_size))
+        return tuple(stamps)
+
+    def _set_actions(self, path: Path, actions: list[dict]) -> None:
+        self._actions = actions
+        self.actions_model.sync(actions)
+        self.palette_model.current_mode = mode = self._current_mode
+        self._pool("palette").submit(lambda: self._paletteIndexed.emit(ModeIndex(mode, actions)))
+        self._load_pinned()
+        self._loaded_path, self._loaded_stamp = path, self._stamp(path)
+        self._watch(path)
+        self.actionsChanged.emit()
+        self.pinnedChanged.emit()
+
     @Slot(result=bool)
     def reloadActions(self) -> bool:
         try:
-            fname = self._modes.get(self._current_mode, "actions.yaml")
-            path = APP_DIR / "config" / fname
+            path = self._mode_path()
             if not path.exists():
-                path = APP_DIR / "config" / "actions.yaml"
+                path = self._config_dir / "actions.yaml"
                 self.notify.emit("Fallback to actions.yaml")
-            self._actions = load_actions(path)
-            self._load_pinned()
-            self.actionsChanged.emit()
-            self.pinnedChanged.emit()
-            self.refreshStatuses()
+            self._set_actions(path, load_actions(path, cache_dir=self._cache_dir))
+            if self._started:
+                self._refresh_stats()
+                self.refreshStatuses()
             self.notify.emit("Actions reloaded")
             return True
         except Exception as e:
             self.log.emit(f"[ERR] reload: {e}")
             return False
 
+    def _watch(self, path: Path) -> None:
+        if self._watcher.files():
+            self._watcher.removePaths(self._watcher.files())
+        if self._watcher.directories():
+            self._watcher.removePaths(self._watcher.directories())
+        if self._auto_reload:
+            srcs = action_sources(path)
+            self._watcher.addPaths(sorted({str(p) for p in srcs} | {str(p.parent) for p in srcs}))
+
+    def _schedule_hot_reload(self, _path: str = "") -> None:
+        self._reload_timer.start()
+
+    def _hot_reload(self) -> None:
+        path = self._loaded_path
+        if path is None or not self._auto_reload:
+            return
+        stamp = self._stamp(path)
+        if stamp is None or stamp == self._loaded_stamp:
+            return  # deleted mid-save, or an unrelated file in the folder
+        try:
+            new = load_actions(path, cache_dir=self._cache_dir)
+        except Exception as e:
+            self.log.emit(f"[ERR] hot reload: {e}")
+            return
+        old = self._actions
+        added, changed, removed = diff_actions(old, new)
+        if not (added or changed or removed):
+            self._loaded_stamp = stamp
+            self._watch(path)
+            return
+        self._set_actions(path, new)
+        old_exes = {exe for a in old for exe in action_programs(a)}
+        if any(exe not in old_exes
+               for a in new if a["id"] in added or a["id"] in changed for exe in action_programs(a)):
+            self.refreshStatuses()
+        self.notify.emit(f"Actions reloaded (+{len(added)} ~{len(changed)} -{len(removed)})")
+
+    @Slot(result=bool)
+    def getAutoReload(self) -> bool:
+        return self._auto_reload
+
+    @Slot(bool)
+    def setAutoReload(self, enabled: bool):
+        if enabled == self._auto_reload:
+            return
+        self._auto_reload = enabled
+        self._settings.setValue("autoReload", enabled)
+        if self._loaded_path is not None:
+            self._watch(self._loaded_path)
+        self.autoReloadChanged.emit()
+
+    def preloadModes(self) -> None:
+        """Parse every mode file in the background so setMode is a cache hit,
+        and index the other modes for the command palette."""
+        paths = {mode: self._config_dir / f for mode, f in self._modes.items()}
+        paths = {mode: p for mode, p in paths.items() if p.exists()}
+        futures = preload_actions(list(paths.values()), cache_dir=self._cache_dir)
+        for mode, future in zip(paths, futures):
+            future.add_done_callback(lambda f, mode=mode: self._index_preloaded(mode, f))
+
+    def _index_preloaded(self, mode: str, future) -> None:
+        # yaml thread; the current mode is indexed by _set_actions
+        if future.exception() is None and mode != self._current_mode:
+            self._paletteIndexed.emit(ModeIndex(mode, future.result()))
+
+    def _on_palette_indexed(self, index: ModeIndex) -> None:
+        self.palette_index.set_mode(index)
+        self.palette_model.refresh()
+
+    @Slot(str, str, result=bool)
+    def runPaletteItem(self, mode: str, action_id: str) -> bool:
+        """Run a palette result; one from another mode switches to that mode first."""
+        if mode != self._current_mode:
+            if mode not in self._modes:
+                return False
+            self.setMode(mode)
+        return self.runAction(action_id)
+
     @Slot(result='QVariant')
     def getActions(self):
         return self._actions
 
+    @Slot(result='QVariant')
+    def getJobLogs(self):
+        """Per-job log files, newest first (empty without a log store)."""
+        store = self.runner.log_store
+        if store is None:
+            return []
+        return [{"path": str(path), "name": path.name, "size": st.st_size, "mtime": st.st_mtime * 1000}
+                for path, st in store.logs()]
+
     @Slot(result='QVariant')
     def getPinned(self):
-        return [a for pid in self._pinned for a in self._actions if a["id"] == pid]
+        return self.pinned_model.items()
 
     @Slot(str)
     def pinAction(self, action_id: str):
-        if action_id not in self._pinned:
+        action = self.actions_model.get(action_id)
+        if action and action_id not in self.pinned_model:
             self._pinned.append(action_id)
+            self.pinned_model.insert(len(self._pinned) - 1, action)
+            self.actions_model.set_pinned(action_id, True)
             self._save_pinned()
             self.pinnedChanged.emit()
 
     @Slot(str)
     def unpinAction(self, action_id: str):
-        if action_id in self._pinned:
+        if self.pinned_model.remove(action_id):
             self._pinned.remove(action_id)
+            self.actions_model.set_pinned(action_id, False)
             self._save_pinned()
             self.pinnedChanged.emit()
 
     @Slot(int, int)
     def movePinned(self, from_index: int, to_index: int):
-        if 0 <= from_index < len(self._pinned) and 0 <= to_index < len(self._pinned):
+        if self.pinned_model.move(from_index, to_index):
             self._pinned.insert(to_index, self._pinned.pop(from_index))
             self._save_pinned()
             self.pinnedChanged.emit()
 
     @Slot(str, result=bool)
     def isPinned(self, action_id: str) -> bool:
-        return action_id in self._pinned
+        return action_id in self.pinned_model
 
     @Slot(result='QStringList')
     def getModes(self):
@@ -280,10 +729,90 @@ class Bridge(QObject):
 
     @Slot()
     def refreshStatuses(self):
-        import os
-        self._statuses = probe_status(self._actions, env=os.environ)
+        # coalesce: requests made while probing collapse into one re-run
+        if self._probe_running:
+            self._probe_pending = True
+            return
+        from core.bincheck import probe_status_async
+
+        self._probe_running = True
+        self._probed_at = time.monotonic()
+        fut = probe_status_async(self._actions, env=os.environ, on_tool=self._toolProbed.emit)
+        fut.add_done_callback(lambda _: self._probeDone.emit())
+
+    def _on_tool_probed(self, name: str, status):
+        self._statuses = {**self._statuses, name: status}
         self.statusesChanged.emit()
 
+    def _on_probe_done(self):
+        self._probe_running = False
+        if self._probe_pending:
+            self._probe_pending = False
+            self.refreshStatuses()
+
+    @Slot()
+    def runPreflight(self):
+        from core.bincheck import preflight_async
+
+        fut = preflight_async(self._actions)
+        fut.add_done_callback(lambda f: self._preflightDone.emit(f.result()))
+
+    def _on_preflight_done(self, msgs):
+        for m in msgs:
+            self.notify.emit(m)
+        self.refreshStatuses()
+
+    def handle_control(self, msg: dict):
+        """Control socket request (GUI thread); ValueError becomes an error reply."""
+        op = msg.get("op")
+        if op == "run":
+            action_id = str(msg.get("action", ""))
+            if not self.actions_model.get(action_id):
+                raise ValueError(f"unknown action '{action_id}' in mode {self._current_mode}")
+            return self._run_action(action_id, force=bool(msg.get("force")))
+        if op == "status":
+            return {
+                "mode": self._current_mode,
+                "running": self.runner.running_count(),
+                "queued": self.runner.queued_count(),
+                "tools": self._statuses,
+            }
+        if op == "actions":
+            return [{"id": a["id"], "label": a["label"], "type": a.get("type", "command")}
+                    for a in self._actions]
+        if op == "mode":
+            mode = msg.get("mode")
+            if mode:
+                if mode not in self._modes:
+                    raise ValueError(f"unknown mode '{mode}' (one of {', '.join(self._modes)})")
+                self.setMode(mode)
+            return self._current_mode
+        if op == "reload":
+            return self.reloadActions()
+        raise ValueError(f"unknown op '{op}'")
+
+    @Slot(result=bool)
+    def loadKenBurns(self) -> bool:
+        """Import the Ken Burns plugin and its schemas (first dialog open)."""
+        if self._kb_bridge is not None:
+            return True
+        ctx = self._engine.rootContext()
+        if not _has_kenburns():
+            return False
+        try:
+            from plugins.kenburns.plugin_kenburns import KenBurnsBridge
+
+            self._kb_bridge = KenBurnsBridge(self, runner=self.runner)
+        except Exception as e:
+            self.log.emit(f"[WARN] Ken Burns bridge load failed: {e}")
+            ctx.setContextProperty("HasKenBurns", False)
+            return False
+        ctx.setContextProperty("KenBurnsSchema", _load_kb_schema())
+        ctx.setContextProperty("KenBurnsUi", _load_kb_ui_grouped())
+        ctx.setContextProperty("KenBurnsQueue", self._kb_bridge.queue_model)
+        ctx.setContextProperty("KenBurns", self._kb_bridge)
+        return True
+
     def _get_window(self):
         if self._engine.rootObjects():
             return self._engine.rootObjects()[0]
@@ -313,6 +842,12 @@ def create_tray(app: QApplication, bridge: Bridge, win):
     act_panic.triggered.connect(_panic)
     menu.addAction(act_panic)
 
+    act_auto = QAction("Auto-reload YAML", tray)
+    act_auto.setCheckable(True)
+    act_auto.setChecked(bridge.getAutoReload())
+    act_auto.toggled.connect(bridge.setAutoReload)
+    menu.addAction(act_auto)
+
     act_blur = QAction("Toggle Acrylic/Blur", tray)
     act_blur.setCheckable(True)
     act_blur.setChecked(True)
@@ -325,12 +860,7 @@ def create_tray(app: QApplication, bridge: Bridge, win):
     menu.addSeparator()
 
     act_preflight = QAction("Run pre-flight", tray)
-    def _run_preflight():
-        msgs = preflight(bridge.getActions())
-        for m in msgs:
-            bridge.notify.emit(m)
-        bridge.refreshStatuses()
-    act_preflight.triggered.connect(_run_preflight)
+    act_preflight.triggered.connect(bridge.runPreflight)
     menu.addAction(act_preflight)
 
     menu.addSeparator()
@@ -345,14 +875,19 @@ def create_tray(app: QApplication, bridge: Bridge, win):
     return tray
 
 def setup_keyboard_hotkey(win, bridge):
-    if keyboard is None:
-        bridge.log.emit("[INFO] 'keyboard' not installed; panic hotkey disabled")
-        return None
-
-    # Register Alt+Shift+P in a background thread to not block Qt loop
+    # Register Alt+Shift+P (panic) and Alt+Shift+K (palette) in a background
+    # thread to not block Qt loop; the optional 'keyboard' module is imported
+    # there too (it hooks the OS on import)
     def _worker():
+        try:
+            import keyboard
+        except Exception:
+            bridge.log.emit("[INFO] 'keyboard' not installed; panic hotkey disabled")
+            return
+        bridge.notify.emit("Hotkeys active (Alt+Shift+P panic, Alt+Shift+K palette)")
         try:
             keyboard.add_hotkey("alt+shift+p", lambda: _panic_action())
+            keyboard.add_hotkey("alt+shift+k", bridge.paletteRequested.emit)
             keyboard.wait()  # block thread until program exit
         except Exception as e:
             bridge.log.emit(f"[WARN] keyboard hotkey error: {e}")
@@ -367,60 +902,89 @@ def setup_keyboard_hotkey(win, bridge):
 
     t = threading.Thread(target=_worker, daemon=True)
     t.start()
-    bridge.notify.emit("Panic hotkey active (Alt+Shift+P)")
     return t
 
+def setup_control_server(app, bridge):
+    from core.control import default_address
+
+    address = default_address()
+    if address is None:
+        return None
+    from core.control_server import ControlServer  # asyncio stays off the startup path
+
+    server = ControlServer(bridge.handle_control, address, parent=bridge)
+    server.listening.connect(lambda where: bridge.log.emit(f"[INFO] control socket: {where}"))
+    server.failed.connect(lambda why: bridge.log.emit(f"[WARN] control socket disabled: {why}"))
+    bridge.log.connect(server.publish)
+    app.aboutToQuit.connect(server.stop)
+    server.start()
+    return server
+
 if __name__ == "__main__":
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
     app = QApplication(sys.argv)
     app.setApplicationDisplayName("Overlay Router")
     app.setWindowIcon(QIcon(str(APP_DIR / "assets" / "icon.png")))
+    PROFILE.mark("QApplication")
 
     engine = QQmlApplicationEngine()
 
-    has_kb = _has_kenburns()
-    engine.rootContext().setContextProperty("HasKenBurns", has_kb)
-    schema = _load_kb_schema() if has_kb else None
-    ui_grouped = _load_kb_ui_grouped() if has_kb else None
-    engine.rootContext().setContextProperty("KenBurnsSchema", schema)
-    engine.rootContext().setContextProperty("KenBurnsUi", ui_grouped)
+    # the Ken Burns plugin and its schemas load when the dialog first opens
+    ctx = engine.rootContext()
+    ctx.setContextProperty("HasKenBurns", _has_kenburns())
+    ctx.setContextProperty("KenBurns", None)
+    ctx.setContextProperty("KenBurnsSchema", None)
+    ctx.setContextProperty("KenBurnsUi", None)
+    ctx.setContextProperty("KenBurnsQueue", None)
 
-    kb_bridge = None
-    if has_kb:
-        try:
-            from plugins.kenburns.plugin_kenburns import KenBurnsBridge
-
-            kb_bridge = KenBurnsBridge()
-            engine.rootContext().setContextProperty("KenBurns", kb_bridge)
-        except Exception as e:
-            print(f"[WARN] Ken Burns bridge load failed: {e}")
-            has_kb = False
-            engine.rootContext().setContextProperty("HasKenBurns", False)
-            engine.rootContext().setContextProperty("KenBurns", None)
-
-    runner = ProcessRunner()
+    runner = ProcessRunner(log_store=JobLogStore(APP_DIR / "config" / "logs"))
     bridge = Bridge(runner, engine)
 
     runner.output.connect(bridge.log)
-    runner.finished.connect(lambda code: bridge.notify.emit(f"Process finished ({code})"))
 
-    engine.rootContext().setContextProperty("Bridge", bridge)
+    log_model = LogModel(capacity=2000, flush_ms=50)
+    bridge.log.connect(log_model.append)
+    ctx.setContextProperty("LogModel", log_model)
+    ctx.setContextProperty("JobLog", JobLogModel(parent=bridge))
+
+    ctx.setContextProperty("Bridge", bridge)
+    ctx.setContextProperty("ActionsModel", bridge.actions_model)
+    ctx.setContextProperty("PinnedModel", bridge.pinned_model)
+    ctx.setContextProperty("PaletteModel", bridge.palette_model)
+    PROFILE.mark("engine + bridge")
 
     bridge.reloadActions()
+    PROFILE.mark("actions")
 
     engine.load(QUrl.fromLocalFile(str(APP_DIR / "ui" / "Main.qml")))
     if not engine.rootObjects():
         sys.exit("Failed to load QML")
+    PROFILE.mark("QML load")
 
     win = engine.rootObjects()[0]
     enable_blur(win, acrylic=True)
-
-    tray = create_tray(app, bridge, win)
-    hk_thread = setup_keyboard_hotkey(win, bridge)
-
-    def _startup():
-        for m in preflight(bridge.getActions()):
-            bridge.notify.emit(m)
-        bridge.refreshStatuses()
-    QTimer.singleShot(300, _startup)
+    PROFILE.mark("blur")
+
+    def _after_first_frame(phase="first frame"):
+        PROFILE.mark(phase)
+        PROFILE.report()
+        # everything below can wait until the overlay is on screen
+        global tray, hk_thread, control
+        from core.bincheck import ProbeCache, ProbeEngine, set_default_engine
+
+        set_default_engine(ProbeEngine(cache=ProbeCache(APP_DIR / "config" / "probe_cache.json")))
+        bridge.start_services()
+        tray = create_tray(app, bridge, win)
+        hk_thread = setup_keyboard_hotkey(win, bridge)
+        control = setup_control_server(app, bridge)
+        bridge.preloadModes()
+        QTimer.singleShot(300, bridge.runPreflight)
+
+    if win.isVisible():
+        win.frameSwapped.connect(_after_first_frame, Qt.SingleShotConnection)
+    else:
+        # starts hidden (tray/hotkey brings it up): nothing to paint yet
+        QTimer.singleShot(0, lambda: _after_first_frame("event loop"))
 
     sys.exit(app.exec())
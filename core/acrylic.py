@@ -0,0 +1,58 @@
+"""Windows Acrylic/Mica (system blur) via SetWindowCompositionAttribute.
+
+Windows only: ``ctypes.windll`` does not exist elsewhere, so import this
+module lazily.
+"""
+from __future__ import annotations
+from ctypes import Structure, c_int, c_void_p, sizeof, byref, windll
+from ctypes.wintypes import HWND, DWORD
+
+ACCENT_DISABLED = 0
+ACCENT_ENABLE_BLURBEHIND = 3
+ACCENT_ENABLE_ACRYLICBLURBEHIND = 4
+WCA_ACCENT_POLICY = 19
+
+class ACCENT_POLICY(Structure):
+    _fields_ = [
+        ("AccentState", c_int),
+        ("AccentFlags", c_int),
+        ("GradientColor", DWORD),  # ARGB
+        ("AnimationId", c_int),
+    ]
+
+class WINDOWCOMPOSITIONATTRIBDATA(Structure):
+    _fields_ = [
+        ("Attribute", c_int),
+        ("Data", c_void_p),
+        ("SizeOfData", c_int),
+    ]
+
+def _make_argb(a, r, g, b):
+    return (a << 24) | (b << 16) | (g << 8) | r
+
+def set_accent(hwnd: int, state: int, opacity=0xEE, tint=(26,26,26)):
+    accent = ACCENT_POLICY()
+    accent.AccentState = state
+    accent.AccentFlags = 0
+    r, g, b = tint
+    accent.GradientColor = _make_argb(opacity, r, g, b)
+
+    data = WINDOWCOMPOSITIONATTRIBDATA()
+    data.Attribute = WCA_ACCENT_POLICY
+    data.SizeOfData = sizeof(accent)
+    data.Data = c_void_p(c_void_p.from_buffer(accent).value)
+
+    SWCA = windll.user32.SetWindowCompositionAttribute
+    SWCA.argtypes = [HWND, c_void_p]
+    SWCA.restype = c_int
+    SWCA(HWND(hwnd), byref(data))
+
+def enable_blur(window, acrylic=True):
+    try:
+        hwnd = int(window.winId())
+        try:
+            set_accent(hwnd, ACCENT_ENABLE_ACRYLICBLURBEHIND if acrylic else ACCENT_ENABLE_BLURBEHIND)
+        except Exception:
+            set_accent(hwnd, ACCENT_ENABLE_BLURBEHIND)
+    except Exception as e:
+        print(f"[WARN] Blur enable failed: {e}")
@@ -1,6 +1,12 @@
-
 import glob
-import os, shutil, subprocess, shlex
+import json
+import os, shutil, subprocess
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from core.config import action_programs
 
 def _version_ok(cmd: list[str]) -> tuple[bool, str]:
     try:
@@ -11,77 +17,177 @@ def _version_ok(cmd: list[str]) -> tuple[bool, str]:
     except Exception as e:
         return False, f"ERR: {e}"
 
-def preflight(actions: list[dict]) -> list[str]:
-    msgs = []
-    # Check explicit executables present in commands
-    for a in actions:
-        cmd = a.get("command","")
+
+def _fingerprint(exe: str) -> tuple[str, int, int] | None:
+    """(resolved path, mtime_ns, size) of an executable, or None if missing."""
+    path = exe if os.path.isabs(exe) else shutil.which(exe)
+    if not path:
+        return None
+    try:
+        path = os.path.realpath(path)
+        st = os.stat(path)
+    except OSError:
+        return None
+    return path, st.st_mtime_ns, st.st_size
+
+
+class ProbeCache:
+    """Persistent version-probe results keyed on the executable fingerprint.
+
+    An entry is valid while the resolved binary keeps its mtime and size.
+    Entries older than ``ttl`` seconds are still served but flagged stale so
+    the engine revalidates them in the background.
+    """
+
+    def __init__(self, path, ttl: float = 24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
         try:
-            tokens = shlex.split(cmd, posix=False)
+            data = json.loads(open(path, encoding="utf-8").read())
         except Exception:
-            tokens = cmd.split()
-        exe = tokens[0] if tokens else ""
-        exe_l = exe.lower()
-
-        # Tesseract: absolute exe path
-        if exe_l.endswith("tesseract.exe"):
-            if os.path.exists(exe):
-                ok, text = _version_ok([exe, "--version"])
-                msgs.append(f"[OK] tesseract (explicit): {text.splitlines()[0] if text else 'version ok'}" if ok else f"[WARN] tesseract (explicit): {text}")
-            else:
-                msgs.append(f"[FAIL] tesseract path missing: {exe}")
-            continue
+            data = {}
+        self._entries: dict = data if isinstance(data, dict) else {}
 
-        # Tesseract via PATH
-        if exe_l == "tesseract":
-            if shutil.which("tesseract"):
-                ok, text = _version_ok(["tesseract", "--version"])
-                msgs.append(f"[OK] tesseract: {text.splitlines()[0] if text else 'version ok'}" if ok else f"[WARN] tesseract: {text}")
-            else:
-                msgs.append("[FAIL] 'tesseract' not found in PATH")
-            continue
+    @staticmethod
+    def _key(fp: tuple[str, int, int], args: list[str]) -> str:
+        return "\x1f".join([fp[0], *args])
 
-        # ImageMagick via PATH
-        if exe_l in ("magick", "magick.exe"):
-            if shutil.which("magick"):
-                ok, text = _version_ok(["magick", "-version"])
-                msgs.append(f"[OK] magick: {text.splitlines()[0] if text else 'version ok'}" if ok else f"[WARN] magick: {text}")
-            else:
-                msgs.append("[FAIL] 'magick' not found in PATH")
-
-    # Deduplicate messages
-    seen = set()
-    uniq = []
-    for m in msgs:
-        if m not in seen:
-            uniq.append(m); seen.add(m)
-    return uniq
+    def get(self, cmd: list[str]) -> tuple[tuple[bool, str], bool] | None:
+        """Return ((ok, text), stale) for a matching entry, else None."""
+        fp = _fingerprint(cmd[0])
+        if fp is None:
+            return None
+        with self._lock:
+            e = self._entries.get(self._key(fp, cmd[1:]))
+        if not e or e.get("mtime_ns") != fp[1] or e.get("size") != fp[2]:
+            return None
+        stale = time.time() - e.get("checked", 0) > self.ttl
+        return (bool(e.get("ok")), e.get("text", "")), stale
 
-def probe_status(actions: list[dict], env: dict | None = None) -> dict:
-    env = env or os.environ
-    status = {
-        "magick": {"state": "unknown", "version": ""},
-        "tesseract": {"state": "unknown", "version": ""},
-        "ffmpeg": {"state": "unknown", "version": ""},
-        "n8n": {"state": "unknown", "version": "not set"},
-    }
+    def put(self, cmd: list[str], result: tuple[bool, str]) -> None:
+        fp = _fingerprint(cmd[0])
+        if fp is None:
+            return
+        ok, text = result
+        with self._lock:
+            self._entries[self._key(fp, cmd[1:])] = {
+                "mtime_ns": fp[1], "size": fp[2], "ok": ok, "text": text, "checked": time.time(),
+            }
+            self._save()
+
+    def _save(self) -> None:
+        try:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(self._entries, fh)
+            os.replace(tmp, self.path)
+        except Exception:
+            pass
+
+
+class ProbeEngine:
+    """Runs version probes on a worker pool.
+
+    Probes for the same argv share one in-flight future, so callers that ask
+    for the same executable at the same time spawn it only once. With a
+    ``ProbeCache`` unchanged binaries are not spawned at all.
+    """
+
+    def __init__(self, max_workers: int = 4, cache: ProbeCache | None = None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="probe")
+        self._lock = threading.Lock()
+        self._inflight: dict[tuple[str, ...], Future] = {}
+        self.cache = cache
+
+    def version(self, cmd: list[str]) -> Future:
+        if self.cache is not None:
+            hit = self.cache.get(cmd)
+            if hit is not None:
+                result, stale = hit
+                if stale:
+                    self._probe(cmd)  # revalidate in the background
+                fut: Future = Future()
+                fut.set_result(result)
+                return fut
+        return self._probe(cmd)
+
+    def _probe(self, cmd: list[str]) -> Future:
+        key = tuple(cmd)
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                return fut
+            fut = self._pool.submit(self._run, list(cmd))
+            self._inflight[key] = fut
+        fut.add_done_callback(lambda f: self._forget(key, f))
+        return fut
+
+    def _run(self, cmd: list[str]) -> tuple[bool, str]:
+        result = _version_ok(cmd)
+        if self.cache is not None and not result[1].startswith("ERR:"):
+            self.cache.put(cmd, result)
+        return result
+
+    def _forget(self, key: tuple[str, ...], fut: Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_engine: ProbeEngine | None = None
+_engine_lock = threading.Lock()
+
+def default_engine() -> ProbeEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ProbeEngine()
+        return _engine
+
+def set_default_engine(engine: ProbeEngine) -> None:
+    global _engine
+    with _engine_lock:
+        _engine = engine
 
-    # --- ImageMagick ---
+def _gather(futures: list[Future], build: Callable[[], object]) -> Future:
+    """Future resolved with ``build()`` once every future in ``futures`` is done."""
+    result: Future = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def _done(_):
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            try:
+                result.set_result(build())
+            except Exception as e:
+                result.set_exception(e)
+
+    if not futures:
+        result.set_result(build())
+    for f in futures:
+        f.add_done_callback(_done)
+    return result
+
+def _first_line(text: str) -> str:
+    return text.splitlines()[0] if text else ""
+
+def resolve_magick(env: dict | None = None) -> str | None:
     magick_cmd = shutil.which("magick")
     if not magick_cmd:
         pf = "C:/Program Files"
         candidates = glob.glob(os.path.join(pf, "ImageMagick*", "magick.exe"))
         magick_cmd = candidates[0] if candidates else None
-    if magick_cmd:
-        ok, text = _version_ok([magick_cmd, "-version"])
-        status["magick"] = {
-            "state": "ok" if ok else "warn",
-            "version": text.splitlines()[0] if text else "",
-        }
-    else:
-        status["magick"] = {"state": "fail", "version": ""}
-
-    # --- Tesseract ---
+    return magick_cmd
+
+def resolve_tesseract(env: dict | None = None) -> str | None:
+    env = env or os.environ
     tess_cmd = shutil.which("tesseract")
     if not tess_cmd:
         tess_cmd = env.get("TESSERACT_PATH")
@@ -94,29 +200,129 @@ def probe_status(actions: list[dict], env: dict | None = None) -> dict:
             if os.path.exists(c):
                 tess_cmd = c
                 break
-    if tess_cmd:
-        ok, text = _version_ok([tess_cmd, "--version"])
-        status["tesseract"] = {
-            "state": "ok" if ok else "warn",
-            "version": text.splitlines()[0] if text else "",
-        }
-    else:
-        status["tesseract"] = {"state": "fail", "version": ""}
-
-    # --- ffmpeg ---
-    if shutil.which("ffmpeg"):
-        ok, text = _version_ok(["ffmpeg", "-version"])
-        status["ffmpeg"] = {
-            "state": "ok" if ok else "warn",
-            "version": text.splitlines()[0] if text else "",
-        }
-    else:
-        status["ffmpeg"] = {"state": "fail", "version": ""}
-
-    # --- n8n ---
+    return tess_cmd
+
+def resolve_ffmpeg(env: dict | None = None) -> str | None:
+    return shutil.which("ffmpeg")
+
+# tool -> (resolver, version flag)
+TOOLS = {
+    "magick": (resolve_magick, "-version"),
+    "tesseract": (resolve_tesseract, "--version"),
+    "ffmpeg": (resolve_ffmpeg, "-version"),
+}
+
+def _preflight_check(exe: str) -> tuple[str, list[str] | None, str] | None:
+    """Map the program an action runs to (tool label, version argv or None, failure message)."""
+    exe_l = exe.lower()
+
+    # Tesseract: absolute exe path
+    if exe_l.endswith("tesseract.exe"):
+        if os.path.exists(exe):
+            return "tesseract (explicit)", [exe, "--version"], ""
+        return "tesseract (explicit)", None, f"[FAIL] tesseract path missing: {exe}"
+
+    # Tesseract via PATH
+    # (resolved paths, so the probe is shared with probe_status)
+    if exe_l == "tesseract":
+        found = shutil.which("tesseract")
+        if found:
+            return "tesseract", [found, "--version"], ""
+        return "tesseract", None, "[FAIL] 'tesseract' not found in PATH"
+
+    # ImageMagick via PATH
+    if exe_l in ("magick", "magick.exe"):
+        found = shutil.which("magick")
+        if found:
+            return "magick", [found, "-version"], ""
+        return "magick", None, "[FAIL] 'magick' not found in PATH"
+    return None
+
+def preflight_async(actions: list[dict], engine: ProbeEngine | None = None) -> Future:
+    """Non-blocking preflight; the future resolves to the message list."""
+    engine = engine or default_engine()
+    checks = []
+    probes: dict[tuple[str, ...], Future] = {}
+    # Check explicit executables present in commands
+    for a in actions:
+        for exe in action_programs(a):
+            check = _preflight_check(exe)
+            if check is None:
+                continue
+            checks.append(check)
+            cmd = check[1]
+            if cmd and tuple(cmd) not in probes:
+                probes[tuple(cmd)] = engine.version(cmd)
+
+    def _build() -> list[str]:
+        msgs = []
+        for label, cmd, fail in checks:
+            if cmd is None:
+                msgs.append(fail)
+                continue
+            ok, text = probes[tuple(cmd)].result()
+            msgs.append(f"[OK] {label}: {_first_line(text) or 'version ok'}" if ok else f"[WARN] {label}: {text}")
+        # Deduplicate messages
+        seen = set()
+        uniq = []
+        for m in msgs:
+            if m not in seen:
+                uniq.append(m); seen.add(m)
+        return uniq
+
+    return _gather(list(probes.values()), _build)
+
+def preflight(actions: list[dict]) -> list[str]:
+    return preflight_async(actions).result()
+
+def _n8n_status(env: dict) -> dict:
     if env.get("N8N_WEBHOOK_PING"):
-        status["n8n"] = {"state": "ok", "version": "configured"}
-    else:
-        status["n8n"] = {"state": "unknown", "version": "not set"}
+        return {"state": "ok", "version": "configured"}
+    return {"state": "unknown", "version": "not set"}
+
+def probe_status_async(
+    actions: list[dict],
+    env: dict | None = None,
+    on_tool: Callable[[str, dict], None] | None = None,
+    engine: ProbeEngine | None = None,
+) -> Future:
+    """Probe all tools in parallel.
 
-    return status
+    ``on_tool(name, status)`` is called from a worker thread as soon as each
+    tool is done; the returned future resolves to the full status dict.
+    """
+    env = env or os.environ
+    engine = engine or default_engine()
+    status = {
+        "magick": {"state": "unknown", "version": ""},
+        "tesseract": {"state": "unknown", "version": ""},
+        "ffmpeg": {"state": "unknown", "version": ""},
+        "n8n": _n8n_status(env),
+    }
+
+    def _report(name: str, st: dict) -> None:
+        status[name] = st
+        if on_tool:
+            on_tool(name, st)
+
+    pending = []
+    for name, (resolve, flag) in TOOLS.items():
+        cmd = resolve(env)
+        if not cmd:
+            _report(name, {"state": "fail", "version": ""})
+            continue
+        fut = engine.version([cmd, flag])
+
+        def _done(f, name=name, cmd=cmd):
+            ok, text = f.result()
+            _report(name, {"state": "ok" if ok else "warn", "version": _first_line(text), "path": cmd})
+
+        fut.add_done_callback(_done)
+        pending.append(fut)
+    if on_tool:
+        on_tool("n8n", status["n8n"])
+
+    return _gather(pending, lambda: dict(status))
+
+def probe_status(actions: list[dict], env: dict | None = None) -> dict:
+    return probe_status_async(actions, env=env).result()
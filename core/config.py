@@ -1,21 +1,428 @@
-
 from __future__ import annotations
+import hashlib
+import os
+import pickle
+import re
+import shlex
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-import yaml
 
-def load_actions(path: Path):
-    data = yaml.safe_load(Path(path).read_text(encoding="utf-8")) or {}
+from core.limits import PRIORITIES
+
+_CACHE_VERSION = 9
+# resolved path -> (deps, items); deps are (path, mtime_ns, size) of the file
+# and every fragment it includes
+_memo: dict[str, tuple[list, list[dict]]] = {}
+_memo_lock = threading.Lock()
+
+_ENV_REF = re.compile(r"\$\{(\w+)\}|%(\w+)%")
+# the half the shell leaves alone: sh has no %VAR%, cmd.exe no ${VAR}
+_FOREIGN_REF = re.compile(r"%(\w+)%" if os.name != "nt" else r"\$\{(\w+)\}")
+# a leading NAME=value sets the variable for that one command (sh only)
+_SH_ASSIGN = re.compile(r"\s*[A-Za-z_]\w*=")
+# shell syntax outside quotes; ${VAR} and %VAR% are expanded without a shell
+_SH_META = set("|&;<>()`*?[\n")
+_CMD_META = set("|&<>^\n")
+# commands that only exist inside the shell
+_SH_BUILTINS = {".", ":", "alias", "cd", "command", "eval", "exec", "exit", "export", "read",
+                "set", "shift", "source", "trap", "ulimit", "umask", "unset", "wait"}
+_CMD_BUILTINS = {"assoc", "call", "cd", "chdir", "cls", "color", "copy", "date", "del", "dir",
+                 "echo", "erase", "for", "ftype", "if", "md", "mkdir", "mklink", "move", "path",
+                 "popd", "pushd", "rd", "ren", "rename", "rmdir", "set", "start", "time", "title",
+                 "type", "ver", "vol"}
+
+def expand_env(value: str, env: dict | None = None) -> str:
+    """Expand ``${VAR}`` and ``%VAR%`` references; unknown names are kept."""
+    env = os.environ if env is None else env
+    def _sub(m):
+        name = m.group(1) or m.group(2)
+        return env.get(name, m.group(0))
+    return _ENV_REF.sub(_sub, value)
+
+def _needs_shell(cmd: str, posix: bool) -> bool:
+    """True if ``cmd`` uses shell syntax outside quotes (pipes, redirects,
+    globs, ``$(...)``, ``$VAR``, ``${VAR:-x}``, ``NAME=value cmd``,
+    comments...)."""
+    if posix and _SH_ASSIGN.match(cmd):
+        return True
+    meta = _SH_META if posix else _CMD_META
+    quote = None
+    i = 0
+    while i < len(cmd):
+        c = cmd[i]
+        if quote == "'":
+            if c == "'":
+                quote = None
+        elif c == "\\" and posix:
+            i += 1
+        elif c in "'\"" and (posix or c == '"') and quote is None:
+            quote = c
+        elif c == quote:
+            quote = None
+        elif c == "$" and posix and not _ENV_REF.match(cmd, i):
+            return True  # $VAR, $(...), $((...)), ${VAR:-x} - even inside double quotes
+        elif c == "`" and posix:
+            return True
+        elif c in "~#" and posix and quote is None and (i == 0 or cmd[i - 1].isspace()):
+            return True  # ~ expands and # starts a comment only at the start of a word
+        elif quote is None and c in meta:
+            return True
+        i += 1
+    return False
+
+def _compile(key: str, cmd: str, shell) -> list[str] | None:
+    """argv template of ``cmd``, or None if it has to run through the shell."""
+    if shell:
+        return None
+    posix = os.name != "nt"
+    if shell is None and _needs_shell(cmd, posix):
+        return None
+    try:
+        argv = shlex.split(cmd, posix=posix)
+    except ValueError as e:
+        raise ValueError(f"Action '{key}': cannot parse command: {e}")
+    if not posix:
+        argv = [a[1:-1] if len(a) > 1 and a[0] == a[-1] == '"' else a for a in argv]
+    if not argv:
+        return None
+    program = argv[0].lower()
+    if shell is None and (program in (_SH_BUILTINS if posix else _CMD_BUILTINS)
+                          or program.endswith((".bat", ".cmd"))):
+        return None
+    return argv
+
+def expand_argv(argv: list[str], env: dict | None = None) -> list[str]:
+    return [expand_env(a, env) if ("$" in a or "%" in a) else a for a in argv]
+
+def runnable(item: dict, env: dict | None = None) -> str | list[str]:
+    """What ProcessRunner should start for a command item or pipeline step:
+    its expanded argv, or the command string when it needs the shell, with
+    the references that shell would not expand (``%VAR%`` for sh) expanded."""
+    argv = item.get("argv")
+    if argv:
+        return expand_argv(argv, env)
+    env = os.environ if env is None else env
+    return _FOREIGN_REF.sub(lambda m: env.get(m.group(1), m.group(0)), item["command"])
+
+def _stat(path: str) -> tuple[str, int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return path, st.st_mtime_ns, st.st_size
+
+def _fresh(deps: list) -> bool:
+    return all(_stat(d[0]) == tuple(d) for d in deps)
+
+def _includes(data: dict, base: Path) -> list[Path]:
+    inc = data.get("include") or []
+    if isinstance(inc, str):
+        inc = [inc]
+    return [(base / p).resolve() for p in inc]
+
+def _parse_yaml(text: str):
+    import yaml  # only on a cache miss; a warm start reads the pickle
+
+    # libyaml-backed loader when PyYAML was built with it
+    return yaml.load(text, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+def _collect(path: Path, seen: frozenset) -> tuple[dict, list]:
+    """Parse ``path`` and its ``include:`` fragments -> (actions spec, deps)."""
+    deps = [_stat(str(path))]
+    data = _parse_yaml(path.read_text(encoding="utf-8")) or {}
+    incs = [p for p in _includes(data, path.parent) if str(p) not in seen]
+    seen = seen | {str(p) for p in incs}
+    if len(incs) > 1:
+        with ThreadPoolExecutor(max_workers=min(8, len(incs)), thread_name_prefix="yaml") as ex:
+            parts = list(ex.map(lambda p: _collect(p, seen), incs))
+    else:
+        parts = [_collect(p, seen) for p in incs]
+    # fragments in listed order, then the file itself; later ids win
+    spec: dict = {}
+    for part_spec, part_deps in parts:
+        spec.update(part_spec)
+        deps.extend(part_deps)
+    spec.update(data.get("actions") or {})
+    return spec, deps
+
+def _webhook_spec(key: str, spec: dict) -> dict:
+    url = spec.get("url")
+    if not url:
+        raise ValueError(f"Action '{key}' missing 'url'")
+    if spec.get("spool") and spec.get("files"):
+        raise ValueError(f"Action '{key}': 'spool' supports JSON data only, not 'files'")
+    if spec.get("batch") and not spec.get("spool"):
+        raise ValueError(f"Action '{key}': 'batch' needs 'spool: true'")
+    return {
+        "url": str(url),
+        "method": str(spec.get("method", "POST")).upper(),
+        "data": {str(k): str(v) for k, v in (spec.get("data") or {}).items()},
+        "files": {str(k): str(v) for k, v in (spec.get("files") or {}).items()},
+        "headers": {str(k): str(v) for k, v in (spec.get("headers") or {}).items()},
+        "clipboard": bool(spec.get("clipboard", False)),
+        "gzip": bool(spec.get("gzip", False)),
+        "spool": bool(spec.get("spool", False)),
+        "batch": bool(spec.get("batch", False)),
+    }
+
+def _paths(key: str, spec: dict, field: str) -> list[str]:
+    value = spec.get(field) or []
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        raise ValueError(f"Action '{key}': '{field}' must be a path or a list of paths")
+    return [str(v) for v in value]
+
+def _cpu_list(key: str, value) -> list[int] | str:
+    """``[0, 2]``, ``"2-5,7"`` or ``"all"`` (ignore the reserved cores)."""
+    if isinstance(value, str) and value.strip().lower() == "all":
+        return "all"
+    parts = value.split(",") if isinstance(value, str) else value if isinstance(value, list) else [value]
+    cpus: list[int] = []
+    try:
+        for part in parts:
+            lo, _, hi = str(part).strip().partition("-")
+            cpus.extend(range(int(lo), int(hi or lo) + 1))
+    except ValueError:
+        cpus = []
+    if not cpus or min(cpus) < 0:
+        raise ValueError(f"Action '{key}': 'cpu_affinity' must be core numbers like [0, 2] or \"2-5\", or \"all\"")
+    return sorted(set(cpus))
+
+def _limits(key: str, spec: dict, inherited: dict | None = None) -> dict:
+    """``priority``/``cpu_affinity``/``max_memory_mb``/``max_cpu_seconds`` ->
+    limits for core.limits; fields a step leaves out come from its action."""
+    limits = dict(inherited or {})
+    prio = spec.get("priority")
+    if prio is not None:
+        if isinstance(prio, int) and not isinstance(prio, bool) and -20 <= prio <= 19:
+            limits["nice"] = prio
+        elif str(prio).lower() in PRIORITIES:
+            limits["nice"] = PRIORITIES[str(prio).lower()]
+        else:
+            raise ValueError(f"Action '{key}': 'priority' must be one of {', '.join(PRIORITIES)} "
+                             "or a nice value from -20 to 19")
+    if spec.get("cpu_affinity") is not None:
+        limits["cpus"] = _cpu_list(key, spec["cpu_affinity"])
+    for field, name in (("max_memory_mb", "memory_mb"), ("max_cpu_seconds", "cpu_seconds")):
+        value = spec.get(field)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            raise ValueError(f"Action '{key}': '{field}' must be a positive number")
+        limits[name] = value
+    return limits
+
+def _pipeline_steps(key: str, spec, limits: dict | None = None) -> list[dict]:
+    """Normalize ``steps:`` (mapping or list) -> steps in dependency order.
+
+    ``stdin: <step>`` pipes that step's stdout into this one and implies
+    ``needs``; a step can feed at most one other step.
+    """
+    if isinstance(spec, list):
+        spec = {str(s.get("id") or f"step{i}") if isinstance(s, dict) else f"step{i}": s
+                for i, s in enumerate(spec, 1)}
+    if not isinstance(spec, dict) or not spec:
+        raise ValueError(f"Action '{key}': 'steps' must be a non-empty mapping or list")
+    steps: dict[str, dict] = {}
+    for sid, s in spec.items():
+        sid = str(sid)
+        if isinstance(s, str):
+            s = {"command": s}
+        if not isinstance(s, dict) or not s.get("command"):
+            raise ValueError(f"Action '{key}': step '{sid}' missing 'command'")
+        needs = s.get("needs") or []
+        if isinstance(needs, str):
+            needs = [needs]
+        stdin = s.get("stdin")
+        stdin = str(stdin) if stdin else None
+        needs = [str(n) for n in needs]
+        if stdin and stdin not in needs:
+            needs.append(stdin)
+        command = str(s["command"])
+        argv = _compile(f"{key}.{sid}", command, s.get("shell"))
+        steps[sid] = {"id": sid, "command": command, "cwd": s.get("cwd"), "argv": argv,
+                      "program": argv[0] if argv else command_executable(command),
+                      "needs": needs, "stdin": stdin, "limits": _limits(f"{key}.{sid}", s, limits)}
+    fed: dict[str, str] = {}
+    for sid, s in steps.items():
+        for n in s["needs"]:
+            if n not in steps:
+                raise ValueError(f"Action '{key}': step '{sid}' needs unknown step '{n}'")
+        if s["stdin"]:
+            if s["stdin"] in fed:
+                raise ValueError(f"Action '{key}': step '{s['stdin']}' pipes into both "
+                                 f"'{fed[s['stdin']]}' and '{sid}'")
+            fed[s["stdin"]] = sid
+    # Kahn's algorithm; keeps the written order among ready steps
+    ordered: list[dict] = []
+    done: set[str] = set()
+    while len(ordered) < len(steps):
+        ready = [s for sid, s in steps.items() if sid not in done and all(n in done for n in s["needs"])]
+        if not ready:
+            cycle = sorted(sid for sid in steps if sid not in done)
+            raise ValueError(f"Action '{key}': steps form a cycle ({', '.join(cycle)})")
+        for s in ready:
+            ordered.append(s)
+            done.add(s["id"])
+    return ordered
+
+def action_programs(action: dict) -> list[str]:
+    """Program each command of an action starts, as resolved at load time."""
+    return [s.get("program", "") for s in action.get("steps") or [action]]
+
+def _build_items(specs: dict) -> list[dict]:
     items = []
-    for key, spec in (data.get("actions") or {}).items():
+    for key, spec in specs.items():
         label = spec.get("label", key)
-        cmd = spec.get("command")
+        kind = spec.get("type", "command")
         cwd = spec.get("cwd")
+        limits = _limits(key, spec)
+        if kind == "webhook":
+            hook = _webhook_spec(key, spec)
+            items.append({
+                "id": key,
+                "label": label,
+                "command": f"{hook['method']} {hook['url']}",
+                "cwd": cwd,
+                "type": kind,
+                "webhook": hook,
+            })
+            continue
+        if kind == "ocr":
+            images = _paths(key, spec, "images")
+            if not images:
+                raise ValueError(f"Action '{key}' missing 'images'")
+            ocr = {
+                "images": images,
+                "out": str(spec["out"]) if spec.get("out") else None,
+                "lang": str(spec["lang"]) if spec.get("lang") else None,
+                "workers": int(spec.get("workers") or 0),
+                "threads": max(1, int(spec.get("threads") or 1)),
+            }
+            items.append({
+                "id": key,
+                "label": label,
+                "command": "tesseract " + " ".join(images),
+                "cwd": cwd,
+                "type": kind,
+                "ocr": ocr,
+                "limits": limits,
+            })
+            continue
+        if kind == "command" and spec.get("steps"):
+            kind = "pipeline"
+        if kind == "pipeline":
+            steps = _pipeline_steps(key, spec.get("steps"), limits)
+            items.append({
+                "id": key,
+                "label": label,
+                "command": " ; ".join(f"{s['id']}: {s['command']}" for s in steps),
+                "cwd": cwd,
+                "type": kind,
+                "steps": steps,
+            })
+            continue
+        if kind != "command":
+            raise ValueError(f"Action '{key}' has unknown type '{kind}'")
+        cmd = spec.get("command")
         if not cmd:
             raise ValueError(f"Action '{key}' missing 'command'")
+        argv = _compile(key, cmd, spec.get("shell"))
         items.append({
             "id": key,
             "label": label,
             "command": cmd,
+            "argv": argv,
+            "program": argv[0] if argv else command_executable(cmd),
             "cwd": cwd,
+            "type": kind,
+            "inputs": _paths(key, spec, "inputs"),
+            "outputs": _paths(key, spec, "outputs"),
+            "limits": limits,
         })
     return items
+
+def _cache_file(cache_dir: Path, key: str) -> Path:
+    return Path(cache_dir) / (hashlib.sha1(key.encode()).hexdigest()[:16] + ".pickle")
+
+def _read_cache(cache_dir: Path, key: str):
+    try:
+        entry = pickle.loads(_cache_file(cache_dir, key).read_bytes())
+    except Exception:
+        return None
+    if entry.get("version") != _CACHE_VERSION or entry.get("path") != key:
+        return None
+    if not _fresh(entry["deps"]):
+        return None
+    return entry["deps"], entry["items"]
+
+def _write_cache(cache_dir: Path, key: str, deps: list, items: list[dict]) -> None:
+    try:
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        dest = _cache_file(cache_dir, key)
+        tmp = dest.with_name(f"{dest.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(pickle.dumps(
+            {"version": _CACHE_VERSION, "path": key, "deps": deps, "items": items},
+            protocol=pickle.HIGHEST_PROTOCOL,
+        ))
+        os.replace(tmp, dest)
+    except Exception:
+        pass
+
+def load_actions(path: Path, cache_dir: Path | None = None):
+    """Load actions from ``path`` (and its ``include:`` fragments).
+
+    Results are memoized in-process and, with ``cache_dir``, pickled to disk;
+    both are reused while the file and all fragments keep their mtime/size.
+    """
+    key = str(Path(path).resolve())
+    with _memo_lock:
+        hit = _memo.get(key)
+    if hit is None or not _fresh(hit[0]):
+        hit = _read_cache(cache_dir, key) if cache_dir else None
+        if hit is None:
+            spec, deps = _collect(Path(key), frozenset({key}))
+            hit = (deps, _build_items(spec))
+            if cache_dir:
+                _write_cache(cache_dir, key, *hit)
+        with _memo_lock:
+            _memo[key] = hit
+    return list(hit[1])
+
+def clear_memo() -> None:
+    """Drop in-process results (the on-disk cache is kept)."""
+    with _memo_lock:
+        _memo.clear()
+
+def action_sources(path: Path) -> list[Path]:
+    """Files the last ``load_actions(path)`` read: the file plus its fragments."""
+    key = str(Path(path).resolve())
+    with _memo_lock:
+        hit = _memo.get(key)
+    return [Path(d[0]) for d in hit[0]] if hit else [Path(key)]
+
+def preload_actions(paths: list[Path], cache_dir: Path | None = None) -> list[Future]:
+    """Parse ``paths`` on background threads so later loads hit the memo."""
+    ex = ThreadPoolExecutor(max_workers=max(1, min(8, len(paths))), thread_name_prefix="yaml")
+    futures = [ex.submit(load_actions, p, cache_dir) for p in paths]
+    ex.shutdown(wait=False)
+    return futures
+
+def command_executable(cmd: str) -> str:
+    """First token of a shell command (the program it runs)."""
+    try:
+        tokens = shlex.split(cmd, posix=False)
+    except ValueError:
+        tokens = cmd.split()
+    return tokens[0].strip('"') if tokens else ""
+
+def diff_actions(old: list[dict], new: list[dict]) -> tuple[list[str], list[str], list[str]]:
+    """Compare two action lists by id -> (added, changed, removed) ids."""
+    old_by_id = {a["id"]: a for a in old}
+    new_by_id = {a["id"]: a for a in new}
+    added = [k for k in new_by_id if k not in old_by_id]
+    changed = [k for k in new_by_id if k in old_by_id and new_by_id[k] != old_by_id[k]]
+    removed = [k for k in old_by_id if k not in new_by_id]
+    return added, changed, removed
@@ -0,0 +1,126 @@
+from __future__ import annotations
+import itertools
+import json
+import os
+import socket
+from pathlib import Path
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "config"
+DEFAULT_SOCKET = CONFIG_DIR / "control.sock"
+DEFAULT_PORT = 47631
+TOKEN_FILE = CONFIG_DIR / "control.token"
+MAX_LINE = 64 * 1024
+
+
+def parse_address(value: str) -> str | tuple[str, int]:
+    """``host:port`` -> (host, port); anything else is a socket path."""
+    host, sep, port = value.rpartition(":")
+    if sep and port.isdigit() and not os.path.isabs(value):
+        return host or "127.0.0.1", int(port)
+    return value
+
+
+def default_address() -> str | tuple[str, int] | None:
+    """Where the control server listens: a Unix socket path or (host, port).
+
+    ``OVERLAY_CONTROL`` overrides it with a path, ``host:port`` or ``off``;
+    the default is ``config/control.sock``, or localhost:47631 on Windows.
+    """
+    value = os.environ.get("OVERLAY_CONTROL", "").strip()
+    if value.lower() in ("off", "0", "no"):
+        return None
+    if value:
+        return parse_address(value)
+    if os.name == "nt" or not hasattr(socket, "AF_UNIX"):
+        return "127.0.0.1", DEFAULT_PORT
+    return str(DEFAULT_SOCKET)
+
+
+def read_token() -> str | None:
+    try:
+        return TOKEN_FILE.read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+
+def encode(msg: dict) -> bytes:
+    return json.dumps(msg, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+
+class ControlError(RuntimeError):
+    pass
+
+
+class ControlClient:
+    """Blocking client for the line-delimited JSON control protocol.
+
+    Every request is ``{"id", "op", ...}``; replies echo the id with
+    ``{"ok": true, "result": ...}`` or ``{"ok": false, "error": ...}``.
+    After ``subscribe``, ``{"event": "log", "lines": [...]}`` messages
+    arrive between replies; ``events`` yields them.
+    """
+
+    def __init__(self, address=None, token: str | None = None, timeout: float | None = 5.0):
+        address = address or default_address()
+        if address is None:
+            raise ControlError("control server disabled (OVERLAY_CONTROL=off)")
+        if isinstance(address, tuple):
+            self._sock = socket.create_connection(address, timeout=timeout)
+            self.token = token or read_token()
+        else:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(timeout)
+            self._sock.connect(address)
+            self.token = token
+        self._file = self._sock.makefile("rb")
+        self._ids = itertools.count(1)
+        self._events: list[dict] = []
+
+    def send(self, op: str, **args) -> int:
+        """Send a request without waiting; returns its id."""
+        req_id = next(self._ids)
+        msg = {"id": req_id, "op": op, **args}
+        if self.token:
+            msg["token"] = self.token
+        self._sock.sendall(encode(msg))
+        return req_id
+
+    def recv(self) -> dict:
+        # MAX_LINE bounds requests only: an ``actions`` reply for a big
+        # catalog or a burst of log lines is longer, and a cut line would
+        # leave its tail to be parsed as the next message
+        line = self._file.readline()
+        if line and not line.endswith(b"\n"):
+            raise ControlError("connection closed mid-message")
+        if not line:
+            raise ControlError("connection closed")
+        return json.loads(line)
+
+    def call(self, op: str, **args):
+        req_id = self.send(op, **args)
+        while True:
+            msg = self.recv()
+            if "event" in msg:
+                self._events.append(msg)
+            elif msg.get("id") == req_id:
+                if not msg.get("ok"):
+                    raise ControlError(msg.get("error", "request failed"))
+                return msg.get("result")
+
+    def events(self):
+        while self._events:
+            yield self._events.pop(0)
+        while True:
+            msg = self.recv()
+            if "event" in msg:
+                yield msg
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
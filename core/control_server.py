@@ -0,0 +1,249 @@
+from __future__ import annotations
+import asyncio
+import collections
+import json
+import os
+import secrets
+import socket
+import threading
+from typing import Callable
+from PySide6.QtCore import QObject, Signal
+
+from core.control import MAX_LINE, TOKEN_FILE, encode
+
+# stop sending log events to a subscriber that has this much unread
+MAX_BACKLOG = 1024 * 1024
+# answered on the server thread; everything else runs on the GUI thread
+_LOCAL_OPS = {"ping", "subscribe", "unsubscribe"}
+
+
+class _Conn:
+    def __init__(self, writer: asyncio.StreamWriter, authed: bool):
+        self.writer = writer
+        self.authed = authed
+        self.subscribed = False
+        self.dropped = 0
+
+    def send(self, msg: dict) -> None:
+        self.write(encode(msg))
+
+    def write(self, data: bytes) -> None:
+        if not self.writer.is_closing():
+            self.writer.write(data)
+
+
+class ControlServer(QObject):
+    """Local control socket served by asyncio on its own thread.
+
+    Requests are line-delimited JSON. ``ping``/``subscribe``/``unsubscribe``
+    are answered on the server thread; every other request is handed to
+    ``handler(msg)`` on the GUI thread, which returns the result or raises
+    ValueError. Requests that arrive together are delivered in one batch, so
+    a burst costs a single wake-up of the Qt loop. On TCP the first request
+    of a connection must carry the token written to ``config/control.token``;
+    the Unix socket is only accessible to its owner.
+    """
+
+    listening = Signal(str)
+    failed = Signal(str)
+    _wake = Signal()
+
+    def __init__(self, handler: Callable[[dict], object], address, parent=None):
+        super().__init__(parent)
+        self.handler = handler
+        self.address = address
+        self._token = secrets.token_hex(16) if isinstance(address, tuple) else None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server = None
+        self._thread: threading.Thread | None = None
+        self._conns: set[_Conn] = set()
+        self._lock = threading.Lock()
+        self._inbox: collections.deque = collections.deque()
+        self._wake_pending = False
+        self._events: list[str] = []
+        self._events_pending = False
+        self._subscribers = 0  # under _lock: counted on the server thread, read by publish
+        self._wake.connect(self._drain)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._serve, name="control", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(loop.stop)
+        if self._thread is not None:
+            self._thread.join(2)
+        if isinstance(self.address, str):
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
+
+    def publish(self, line: str) -> None:
+        """Queue a log line for subscribers (GUI thread)."""
+        if self._loop is None:
+            return
+        with self._lock:
+            if not self._subscribers:
+                return
+            self._events.append(line)
+            if self._events_pending:
+                return
+            self._events_pending = True
+        self._post(self._flush_events)
+
+    def _post(self, fn, *args) -> None:
+        try:
+            self._loop.call_soon_threadsafe(fn, *args)
+        except RuntimeError:  # loop already closed (shutting down)
+            pass
+
+    # --- server thread -------------------------------------------------
+
+    def _serve(self) -> None:
+        self._loop = loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._open())
+        except Exception as e:
+            self.failed.emit(f"{self._describe()}: {e}")
+            loop.close()
+            return
+        self.listening.emit(self._describe())
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            for conn in list(self._conns):
+                conn.writer.close()
+            loop.close()
+
+    def _describe(self) -> str:
+        if isinstance(self.address, tuple):
+            return "%s:%d" % self.address
+        return self.address
+
+    async def _open(self) -> None:
+        if isinstance(self.address, tuple):
+            host, port = self.address
+            self._server = await asyncio.start_server(self._client, host, port, limit=MAX_LINE)
+            TOKEN_FILE.parent.mkdir(parents=True, exist_ok=True)
+            TOKEN_FILE.write_text(self._token, encoding="utf-8")
+            os.chmod(TOKEN_FILE, 0o600)
+            return
+        if os.path.exists(self.address):
+            # a socket left by a crashed run refuses connections; a live one is another instance
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.address)
+            except OSError:
+                os.unlink(self.address)
+            else:
+                raise OSError("another instance is listening")
+            finally:
+                probe.close()
+        self._server = await asyncio.start_unix_server(self._client, self.address, limit=MAX_LINE)
+        os.chmod(self.address, 0o600)
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        conn = _Conn(writer, authed=self._token is None)
+        self._conns.add(conn)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # longer than MAX_LINE
+                    conn.send({"ok": False, "error": "request too long"})
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    self._request(conn, line)
+                if writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if conn.subscribed:
+                self._subscribe(conn, False)
+            self._conns.discard(conn)
+            writer.close()
+
+    def _request(self, conn: _Conn, line: bytes) -> None:
+        try:
+            msg = json.loads(line)
+            if not isinstance(msg, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            conn.send({"ok": False, "error": f"bad request: {e}"})
+            return
+        req_id = msg.get("id")
+        if not conn.authed:
+            if not secrets.compare_digest(str(msg.get("token", "")), self._token):
+                conn.send({"id": req_id, "ok": False, "error": "bad token"})
+                return
+            conn.authed = True
+        op = msg.get("op")
+        if op in _LOCAL_OPS:
+            if op == "subscribe" and not conn.subscribed:
+                self._subscribe(conn, True)
+            elif op == "unsubscribe" and conn.subscribed:
+                self._subscribe(conn, False)
+            conn.send({"id": req_id, "ok": True, "result": op})
+            return
+        with self._lock:
+            self._inbox.append((conn, msg))
+            if self._wake_pending:
+                return
+            self._wake_pending = True
+        self._wake.emit()
+
+    def _subscribe(self, conn: _Conn, on: bool) -> None:
+        conn.subscribed = on
+        with self._lock:
+            self._subscribers += 1 if on else -1
+
+    def _reply(self, replies: list) -> None:
+        for conn, data in replies:
+            conn.write(data)
+
+    def _flush_events(self) -> None:
+        with self._lock:
+            lines, self._events = self._events, []
+            self._events_pending = False
+        for conn in self._conns:
+            if not conn.subscribed:
+                continue
+            if conn.writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+                conn.dropped += len(lines)  # slow reader: skip rather than buffer without bound
+                continue
+            event = {"event": "log", "lines": lines}
+            if conn.dropped:
+                event["dropped"], conn.dropped = conn.dropped, 0
+            conn.send(event)
+
+    # --- GUI thread ----------------------------------------------------
+
+    def _drain(self) -> None:
+        with self._lock:
+            batch = list(self._inbox)
+            self._inbox.clear()
+            self._wake_pending = False
+        replies = []
+        for conn, msg in batch:
+            reply = {"id": msg.get("id"), "ok": True}
+            try:
+                reply["result"] = self.handler(msg)
+            except ValueError as e:
+                reply = {"id": msg.get("id"), "ok": False, "error": str(e)}
+            except Exception as e:
+                reply = {"id": msg.get("id"), "ok": False, "error": f"{type(e).__name__}: {e}"}
+            # serialized here, one by one: a result JSON can't hold fails its own request only
+            try:
+                data = encode(reply)
+            except (TypeError, ValueError) as e:
+                data = encode({"id": msg.get("id"), "ok": False, "error": f"result is not JSON: {e}"})
+            replies.append((conn, data))
+        self._post(self._reply, replies)
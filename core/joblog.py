@@ -0,0 +1,201 @@
+from __future__ import annotations
+import mmap
+import os
+import time
+from array import array
+from pathlib import Path
+
+DEFAULT_MAX_FILES = 200
+DEFAULT_MAX_BYTES = 512 * 2**20
+DEFAULT_SEGMENT_BYTES = 32 * 2**20
+DEFAULT_KEEP_SEGMENTS = 2
+# lines indexed per backward step when paging towards the start
+_BACK_CHUNK = 2048
+_COUNT_CHUNK = 4 * 2**20
+
+
+class JobLog:
+    """Combined stdout/stderr of one job, written in size-capped segments.
+
+    ``<name>.log`` is the first segment, ``<name>.1.log`` the next and so on;
+    only the newest ``keep_segments`` are kept. Segments are never renamed,
+    so a reader can keep one mapped while the job writes on.
+    """
+
+    def __init__(self, base: Path, header: str, segment_bytes: int, keep_segments: int):
+        self.base = base
+        self.segment_bytes = segment_bytes
+        self.keep_segments = max(1, keep_segments)
+        self.segment = 0
+        self._fh = open(self.path, "ab")
+        self._written = 0
+        self.write([header])
+
+    @property
+    def path(self) -> Path:
+        suffix = f".{self.segment}.log" if self.segment else ".log"
+        return self.base.with_name(self.base.name + suffix)
+
+    def write(self, lines: list[str]) -> None:
+        data = "".join(f"{line}\n" for line in lines).encode("utf-8", "replace")
+        if self._written and self._written + len(data) > self.segment_bytes:
+            self._rotate()
+        self._fh.write(data)
+        self._written += len(data)
+
+    def _rotate(self) -> None:
+        self._fh.close()
+        self.segment += 1
+        stale = self.segment - self.keep_segments
+        if stale >= 0:
+            old = self.base.with_name(self.base.name + (f".{stale}.log" if stale else ".log"))
+            try:
+                old.unlink()
+            except OSError:  # still mapped by a viewer (Windows); pruned later
+                pass
+        self._fh = open(self.path, "ab")
+        self._written = 0
+
+    def flush(self) -> None:
+        if not self._fh.closed:
+            self._fh.flush()
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+class JobLogStore:
+    """Folder of per-job logs, pruned oldest-first to ``max_files`` files and
+    ``max_bytes`` in total whenever a new job log is opened."""
+
+    def __init__(self, folder, max_files: int = DEFAULT_MAX_FILES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 segment_bytes: int = DEFAULT_SEGMENT_BYTES, keep_segments: int = DEFAULT_KEEP_SEGMENTS):
+        self.folder = Path(folder)
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.keep_segments = keep_segments
+
+    def open(self, job_id: int, command: str) -> JobLog | None:
+        try:
+            self.folder.mkdir(parents=True, exist_ok=True)
+            self.prune()
+            base = self.folder / f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{job_id}"
+            return JobLog(base, f"$ {command}", self.segment_bytes, self.keep_segments)
+        except OSError:
+            return None
+
+    def logs(self) -> list[tuple[Path, os.stat_result]]:
+        """Log files, newest first."""
+        out = []
+        try:
+            entries = list(os.scandir(self.folder))
+        except OSError:
+            return []
+        for e in entries:
+            if e.name.endswith(".log"):
+                try:
+                    out.append((Path(e.path), e.stat()))
+                except OSError:
+                    pass
+        out.sort(key=lambda item: item[1].st_mtime, reverse=True)
+        return out
+
+    def prune(self) -> None:
+        total = 0
+        for i, (path, st) in enumerate(self.logs()):
+            total += st.st_size
+            if i >= self.max_files or total > self.max_bytes:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+
+class LogReader:
+    """Line access to a growing log file through mmap.
+
+    ``refresh`` maps the file again after it grew and indexes only the new
+    bytes. The line count comes from one C-speed scan; start offsets of older
+    lines are indexed backwards only when a row before the indexed tail is
+    read, so opening a large log costs the tail, not the file. Only complete
+    (newline-terminated) lines are visible.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._fh = None
+        self._mm: mmap.mmap | None = None
+        self._size = 0
+        self._end = 0        # offset just past the last complete line
+        self._first = 0      # row of _starts[0]
+        self._starts = array("Q")
+        self.count = 0
+
+    def refresh(self) -> int:
+        """Pick up appended data; returns the number of rows (-1 if the file
+        was replaced or truncated, after which the reader starts over)."""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size < self._size:
+            self.close()
+            self.refresh()
+            return -1
+        if size == self._size:
+            return self.count
+        if self._fh is None:
+            self._fh = open(self.path, "rb")
+        if self._mm is not None:
+            self._mm.close()
+        self._mm = mmap.mmap(self._fh.fileno(), size, access=mmap.ACCESS_READ)
+        mm, self._size = self._mm, size
+        if self.count == 0 and self._end == 0:
+            # first map: count lines, index nothing yet
+            end = mm.rfind(b"\n") + 1
+            self.count = self._first = sum(
+                mm[i:min(i + _COUNT_CHUNK, end)].count(b"\n") for i in range(0, end, _COUNT_CHUNK))
+            self._end = end
+            return self.count
+        pos = self._end
+        while (nl := mm.find(b"\n", pos)) != -1:
+            self._starts.append(pos)
+            pos = nl + 1
+            self.count += 1
+        self._end = pos
+        return self.count
+
+    def line(self, row: int) -> str:
+        if not 0 <= row < self.count or self._mm is None:
+            return ""
+        if row < self._first:
+            self._index_back(max(0, min(row, self._first - _BACK_CHUNK)))
+        i = row - self._first
+        start = self._starts[i]
+        stop = self._starts[i + 1] - 1 if i + 1 < len(self._starts) else self._end - 1
+        return self._mm[start:stop].decode("utf-8", "replace").rstrip("\r")
+
+    def lines(self, start: int, stop: int) -> list[str]:
+        return [self.line(r) for r in range(max(0, start), min(stop, self.count))]
+
+    def _index_back(self, row: int) -> None:
+        mm = self._mm
+        pos = self._starts[0] if self._starts else self._end
+        found = []
+        for _ in range(self._first - row):
+            start = mm.rfind(b"\n", 0, pos - 1) + 1
+            found.append(start)
+            pos = start
+        found.reverse()
+        self._starts = array("Q", found) + self._starts
+        self._first = row
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+        if self._fh is not None:
+            self._fh.close()
+        self._fh = self._mm = None
+        self._size = self._end = self._first = self.count = 0
+        self._starts = array("Q")
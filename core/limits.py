@@ -0,0 +1,249 @@
+"""CPU priority, core affinity and resource limits for job processes.
+
+A limits dict has any of ``nice`` (-20..19), ``cpus`` (core numbers, or
+"all"), ``memory_mb`` and ``cpu_seconds``. On POSIX they are set on the
+job's process (nice value, sched_setaffinity, RLIMIT_AS/RLIMIT_CPU through
+prlimit on Linux); processes it starts later inherit them and
+``Limiter.sweep`` covers the ones it started before. On Windows the process
+is put in a job object, whose limits hold for everything it starts.
+"""
+from __future__ import annotations
+import os
+import time
+
+from core.telemetry import load_psutil
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# named priorities -> nice value; Windows maps them back to priority classes
+PRIORITIES = {"idle": 19, "low": 10, "below_normal": 5, "normal": 0, "above_normal": -5, "high": -10}
+DEFAULT_RESERVED_CORES = 1
+# below this many cores nothing is reserved by default
+_MIN_CORES_TO_RESERVE = 4
+CAN_PIN = os.name == "nt" or hasattr(os, "sched_setaffinity")
+# processes started after the limits were set inherit them, so only the
+# first moments of a job need sweeping
+SWEEP_SECONDS = 1.0
+
+
+def available_cores() -> list[int]:
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        return list(range(os.cpu_count() or 1))
+
+
+def reserved_cores() -> list[int]:
+    """Cores kept free for the overlay: the first ``OVERLAY_RESERVED_CORES``
+    it may run on (default 1, none on machines with fewer than 4 cores)."""
+    if not CAN_PIN:
+        return []
+    cores = available_cores()
+    n = DEFAULT_RESERVED_CORES if len(cores) >= _MIN_CORES_TO_RESERVE else 0
+    try:
+        n = int(os.environ.get("OVERLAY_RESERVED_CORES", n))
+    except ValueError:
+        pass
+    return cores[:max(0, min(n, len(cores) - 1))]
+
+
+def job_cores() -> list[int]:
+    reserved = set(reserved_cores())
+    return [c for c in available_cores() if c not in reserved]
+
+
+def default_limits() -> dict:
+    """Limits for jobs that set none: every core but the reserved ones."""
+    return {"cpus": job_cores()} if reserved_cores() else {}
+
+
+def merge(base: dict | None, limits: dict | None) -> dict:
+    merged = {**(base or {}), **(limits or {})}
+    if merged.get("cpus") == "all":
+        del merged["cpus"]
+    return merged
+
+
+class Limiter:
+    """Applies one job's limits to its process and, on ``sweep``, to
+    descendants it started before that. Problems come back as messages."""
+
+    def __init__(self, pid: int, limits: dict):
+        self.pid = pid
+        self.limits = limits
+        self._seen: set[int] = set()
+        self._until = time.monotonic() + SWEEP_SECONDS
+
+    def apply(self) -> list[str]:
+        if os.name == "nt":
+            return _job_object(self.pid, self.limits)
+        self._seen.add(self.pid)
+        errors = _apply_posix(self.pid, self.limits)
+        self.sweep()
+        return errors
+
+    def sweep(self) -> None:
+        psutil = load_psutil()
+        if os.name == "nt" or psutil is None or time.monotonic() > self._until:
+            return
+        try:
+            children = psutil.Process(self.pid).children(recursive=True)
+        except psutil.Error:
+            return
+        for child in children:
+            if child.pid not in self._seen:
+                self._seen.add(child.pid)
+                _apply_posix(child.pid, self.limits)
+
+
+def contain_children() -> list[str]:
+    """Windows: put this process in a job object that ends, killing what is
+    still in it, when this process exits, so processes it started do not
+    outlive it. Elsewhere a no-op. Problems come back as messages."""
+    if os.name != "nt":
+        return []
+    return _job_object(os.getpid(), {}, kill_on_close=True)
+
+
+def _cpus(limits: dict) -> list[int]:
+    cpus = limits.get("cpus")
+    if not cpus:
+        return []
+    usable = set(available_cores())
+    return [c for c in cpus if c in usable]
+
+
+def _apply_posix(pid: int, limits: dict) -> list[str]:
+    errors = []
+    if "nice" in limits:
+        try:
+            os.setpriority(os.PRIO_PROCESS, pid, limits["nice"])
+        except OSError as e:
+            errors.append(f"priority {limits['nice']}: {e.strerror or e}")
+    if limits.get("cpus"):
+        cpus = _cpus(limits)
+        if not CAN_PIN:
+            errors.append("cpu_affinity is not supported on this platform")
+        elif not cpus:
+            errors.append(f"cpu_affinity {limits['cpus']}: none of these cores is available")
+        else:
+            try:
+                os.sched_setaffinity(pid, cpus)
+            except OSError as e:
+                errors.append(f"cpu_affinity: {e.strerror or e}")
+    rlimits = []
+    if limits.get("memory_mb"):
+        size = int(limits["memory_mb"] * 2**20)
+        rlimits.append(("max_memory_mb", "RLIMIT_AS", size, size))
+    if limits.get("cpu_seconds"):
+        # SIGXCPU at the soft limit, SIGKILL a second later if it is ignored
+        secs = max(1, int(limits["cpu_seconds"]))
+        rlimits.append(("max_cpu_seconds", "RLIMIT_CPU", secs, secs + 1))
+    for field, name, soft, hard in rlimits:
+        if resource is None or not hasattr(resource, "prlimit"):
+            errors.append(f"{field} is not supported on this platform")
+            continue
+        try:
+            resource.prlimit(pid, getattr(resource, name), (soft, hard))
+        except (OSError, ValueError) as e:
+            errors.append(f"{field}: {e}")
+    return errors
+
+
+def _priority_class(nice: int) -> int:
+    if nice >= 15:
+        return 0x40      # IDLE_PRIORITY_CLASS
+    if nice > 0:
+        return 0x4000    # BELOW_NORMAL_PRIORITY_CLASS
+    if nice == 0:
+        return 0x20      # NORMAL_PRIORITY_CLASS
+    if nice > -10:
+        return 0x8000    # ABOVE_NORMAL_PRIORITY_CLASS
+    return 0x80          # HIGH_PRIORITY_CLASS
+
+
+def _job_object(pid: int, limits: dict, kill_on_close: bool = False) -> list[str]:
+    from ctypes import Structure, WinError, byref, c_size_t, c_ulonglong, c_void_p, sizeof, windll
+    from ctypes.wintypes import BOOL, DWORD, HANDLE, LARGE_INTEGER
+
+    class BASIC(Structure):
+        _fields_ = [
+            ("PerProcessUserTimeLimit", LARGE_INTEGER),
+            ("PerJobUserTimeLimit", LARGE_INTEGER),
+            ("LimitFlags", DWORD),
+            ("MinimumWorkingSetSize", c_size_t),
+            ("MaximumWorkingSetSize", c_size_t),
+            ("ActiveProcessLimit", DWORD),
+            ("Affinity", c_size_t),
+            ("PriorityClass", DWORD),
+            ("SchedulingClass", DWORD),
+        ]
+
+    class EXTENDED(Structure):
+        _fields_ = [
+            ("BasicLimitInformation", BASIC),
+            ("IoInfo", c_ulonglong * 6),
+            ("ProcessMemoryLimit", c_size_t),
+            ("JobMemoryLimit", c_size_t),
+            ("PeakProcessMemoryUsed", c_size_t),
+            ("PeakJobMemoryUsed", c_size_t),
+        ]
+
+    info = EXTENDED()
+    basic = info.BasicLimitInformation
+    errors = []
+    if "nice" in limits:
+        basic.LimitFlags |= 0x20  # JOB_OBJECT_LIMIT_PRIORITY_CLASS
+        basic.PriorityClass = _priority_class(limits["nice"])
+    if limits.get("cpus"):
+        mask = sum(1 << c for c in _cpus(limits) if c < 8 * sizeof(c_size_t))
+        if mask:
+            basic.LimitFlags |= 0x10  # JOB_OBJECT_LIMIT_AFFINITY
+            basic.Affinity = mask
+        else:
+            errors.append(f"cpu_affinity {limits['cpus']}: none of these cores is available")
+    if limits.get("memory_mb"):
+        basic.LimitFlags |= 0x100  # JOB_OBJECT_LIMIT_PROCESS_MEMORY
+        info.ProcessMemoryLimit = int(limits["memory_mb"] * 2**20)
+    if limits.get("cpu_seconds"):
+        basic.LimitFlags |= 0x2  # JOB_OBJECT_LIMIT_PROCESS_TIME, in 100 ns units
+        basic.PerProcessUserTimeLimit = int(limits["cpu_seconds"] * 10_000_000)
+    if kill_on_close:
+        basic.LimitFlags |= 0x2000  # JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE
+    if not basic.LimitFlags:
+        return errors
+
+    kernel32 = windll.kernel32
+    kernel32.CreateJobObjectW.restype = HANDLE
+    kernel32.CreateJobObjectW.argtypes = [c_void_p, c_void_p]
+    kernel32.OpenProcess.restype = HANDLE
+    kernel32.OpenProcess.argtypes = [DWORD, BOOL, DWORD]
+    kernel32.SetInformationJobObject.argtypes = [HANDLE, DWORD, c_void_p, DWORD]
+    kernel32.AssignProcessToJobObject.argtypes = [HANDLE, HANDLE]
+    kernel32.CloseHandle.argtypes = [HANDLE]
+
+    job = kernel32.CreateJobObjectW(None, None)
+    if not job:
+        return errors + [f"job object: {WinError()}"]
+    proc = None
+    assigned = False
+    try:
+        # JobObjectExtendedLimitInformation
+        if not kernel32.SetInformationJobObject(job, 9, byref(info), sizeof(info)):
+            return errors + [f"limits: {WinError()}"]
+        proc = kernel32.OpenProcess(0x0101, False, pid)  # PROCESS_SET_QUOTA | PROCESS_TERMINATE
+        if not proc or not kernel32.AssignProcessToJobObject(job, proc):
+            return errors + [f"limits: {WinError()}"]
+        assigned = True
+    finally:
+        if proc:
+            kernel32.CloseHandle(proc)
+        # the job object lives on as long as a process is assigned to it; a
+        # kill-on-close one ends with its last handle, so that stays open
+        # until this process exits
+        if not (kill_on_close and assigned):
+            kernel32.CloseHandle(job)
+    return errors
@@ -0,0 +1,333 @@
+from __future__ import annotations
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer, Slot
+
+from core.joblog import LogReader
+from core.palette import PaletteIndex
+
+class LogModel(QAbstractListModel):
+    """Fixed-capacity ring buffer of log lines for a QML ListView.
+
+    ``append`` only queues text; queued lines are inserted in one batch every
+    ``flush_ms``, and the oldest rows are dropped once ``capacity`` is
+    reached, so the cost per flush is bounded by the batch, not the log size.
+    """
+
+    LineRole = Qt.UserRole + 1
+
+    def __init__(self, capacity: int = 2000, flush_ms: int = 50, parent=None):
+        super().__init__(parent)
+        self._capacity = max(1, capacity)
+        self._buf: list[str] = [""] * self._capacity
+        self._head = 0
+        self._size = 0
+        self._pending: list[str] = []
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(flush_ms)
+        self._timer.timeout.connect(self.flush)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._size
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < self._size:
+            return None
+        if role in (Qt.DisplayRole, self.LineRole):
+            return self._buf[(self._head + index.row()) % self._capacity]
+        return None
+
+    def roleNames(self):
+        return {self.LineRole: b"line"}
+
+    @Slot(str)
+    def append(self, text: str) -> None:
+        self._pending.extend(text.splitlines() or [""])
+        if len(self._pending) > self._capacity:
+            del self._pending[:-self._capacity]
+        if not self._timer.isActive():
+            self._timer.start()
+
+    @Slot()
+    def flush(self) -> None:
+        lines, self._pending = self._pending, []
+        n = len(lines)
+        if not n:
+            return
+        cap = self._capacity
+        if n == cap:
+            self.beginResetModel()
+            self._buf[:] = lines
+            self._head, self._size = 0, n
+            self.endResetModel()
+            return
+        overflow = self._size + n - cap
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            self._head = (self._head + overflow) % cap
+            self._size -= overflow
+            self.endRemoveRows()
+        self.beginInsertRows(QModelIndex(), self._size, self._size + n - 1)
+        for i, line in enumerate(lines):
+            self._buf[(self._head + self._size + i) % cap] = line
+        self._size += n
+        self.endInsertRows()
+
+    @Slot()
+    def clear(self) -> None:
+        self._pending.clear()
+        self.beginResetModel()
+        self._head = self._size = 0
+        self.endResetModel()
+
+
+class JobLogModel(QAbstractListModel):
+    """Rows of one job log file, read through a LogReader.
+
+    Only rows the view asks for are decoded, so paging back through a long
+    render log touches just the visible part of the file. While a file is
+    open it is polled every ``poll_ms`` and new lines are appended as rows.
+    """
+
+    LineRole = Qt.UserRole + 1
+
+    def __init__(self, poll_ms: int = 500, parent=None):
+        super().__init__(parent)
+        self._reader: LogReader | None = None
+        self._rows = 0
+        self._timer = QTimer(self)
+        self._timer.setInterval(poll_ms)
+        self._timer.timeout.connect(self._poll)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def data(self, index, role=Qt.DisplayRole):
+        if self._reader is None or not index.isValid() or not 0 <= index.row() < self._rows:
+            return None
+        if role in (Qt.DisplayRole, self.LineRole):
+            return self._reader.line(index.row())
+        return None
+
+    def roleNames(self):
+        return {self.LineRole: b"line"}
+
+    @Slot(str)
+    def open(self, path: str) -> None:
+        self.beginResetModel()
+        if self._reader is not None:
+            self._reader.close()
+        self._reader = LogReader(path) if path else None
+        try:
+            self._rows = self._reader.refresh() if self._reader else 0
+        except (OSError, ValueError):
+            self._reader, self._rows = None, 0
+        self.endResetModel()
+        if self._reader is not None:
+            self._timer.start()
+        else:
+            self._timer.stop()
+
+    @Slot()
+    def close(self) -> None:
+        self.open("")
+
+    @Slot(result=str)
+    def getPath(self) -> str:
+        return str(self._reader.path) if self._reader else ""
+
+    def _poll(self) -> None:
+        try:
+            rows = self._reader.refresh()
+        except (OSError, ValueError):
+            rows = -1
+        if rows == -1:
+            self.open(self.getPath())  # rotated away or truncated: start over
+        elif rows > self._rows:
+            self.beginInsertRows(QModelIndex(), self._rows, rows - 1)
+            self._rows = rows
+            self.endInsertRows()
+
+
+class KeyedListModel(QAbstractListModel):
+    """List model of dicts with an ``id`` -> row index.
+
+    Mutations emit row-level insert/remove/move/dataChanged signals so QML
+    views keep the delegates of untouched rows. Subclasses list their roles
+    in ``ROLES`` (role name -> dict key).
+    """
+
+    ROLES: dict[str, str] = {}
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._items: list[dict] = []
+        self._index: dict[str, int] = {}
+        self._role_keys = {Qt.UserRole + 1 + i: name for i, name in enumerate(self.ROLES)}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._items)
+
+    def roleNames(self):
+        return {role: name.encode() for role, name in self._role_keys.items()}
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._items):
+            return None
+        name = self._role_keys.get(role)
+        if name is None:
+            return None
+        return self._value(self._items[index.row()], name)
+
+    def _value(self, item: dict, name: str):
+        return item.get(self.ROLES[name])
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def row(self, key: str) -> int:
+        return self._index.get(key, -1)
+
+    def get(self, key: str) -> dict | None:
+        row = self._index.get(key)
+        return None if row is None else self._items[row]
+
+    def items(self) -> list[dict]:
+        return list(self._items)
+
+    def _reindex(self, start: int = 0, stop: int | None = None) -> None:
+        stop = len(self._items) if stop is None else min(stop, len(self._items))
+        for row in range(start, stop):
+            self._index[self._items[row]["id"]] = row
+
+    def _changed(self, row: int) -> None:
+        idx = self.index(row, 0)
+        self.dataChanged.emit(idx, idx)
+
+    def insert(self, row: int, item: dict) -> None:
+        row = max(0, min(row, len(self._items)))
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._items.insert(row, item)
+        self._reindex(row)
+        self.endInsertRows()
+
+    def remove(self, key: str) -> bool:
+        row = self._index.get(key)
+        if row is None:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._items[row]
+        del self._index[key]
+        self._reindex(row)
+        self.endRemoveRows()
+        return True
+
+    def move(self, src: int, dst: int) -> bool:
+        n = len(self._items)
+        if not (0 <= src < n and 0 <= dst < n) or src == dst:
+            return False
+        # Qt wants the destination as "insert before" in pre-move coordinates
+        if not self.beginMoveRows(QModelIndex(), src, src, QModelIndex(), dst + 1 if dst > src else dst):
+            return False
+        self._items.insert(dst, self._items.pop(src))
+        self._reindex(min(src, dst), max(src, dst) + 1)
+        self.endMoveRows()
+        return True
+
+    def update(self, item: dict) -> bool:
+        row = self._index.get(item["id"])
+        if row is None:
+            return False
+        if self._items[row] != item:
+            self._items[row] = item
+            self._changed(row)
+        return True
+
+    def sync(self, items: list[dict]) -> None:
+        """Bring the model to ``items`` with the fewest row operations."""
+        keep = {it["id"] for it in items}
+        for row in reversed(range(len(self._items))):
+            if self._items[row]["id"] not in keep:
+                self.remove(self._items[row]["id"])
+        for target, item in enumerate(items):
+            row = self._index.get(item["id"])
+            if row is None:
+                self.insert(target, item)
+                continue
+            # rows before target already match, so row >= target here
+            if row != target:
+                self.move(row, target)
+            self.update(item)
+
+
+class ActionsModel(KeyedListModel):
+    ROLES = {"actionId": "id", "label": "label", "command": "command", "pinned": "",
+             "runs": "runs", "p50Ms": "p50", "p95Ms": "p95"}
+    _STAT_ROLES = {"runs", "p50Ms", "p95Ms"}
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pinned: set[str] = set()
+        self._stats: dict[str, dict] = {}
+
+    def _value(self, item: dict, name: str):
+        if name == "pinned":
+            return item["id"] in self._pinned
+        if name in self._STAT_ROLES:
+            return self._stats.get(item["id"], {}).get(self.ROLES[name], 0)
+        return super()._value(item, name)
+
+    def get_stats(self, key: str) -> dict:
+        return self._stats.get(key, {})
+
+    def set_stats(self, stats: dict[str, dict]) -> None:
+        """Duration stats per action id (``runs``/``p50``/``p95``, ms)."""
+        old, self._stats = self._stats, dict(stats)
+        for key in old.keys() | self._stats.keys():
+            row = self._index.get(key)
+            if row is not None and old.get(key) != self._stats.get(key):
+                self._changed(row)
+
+    def set_pinned(self, key: str, pinned: bool) -> None:
+        if pinned == (key in self._pinned):
+            return
+        if pinned:
+            self._pinned.add(key)
+        else:
+            self._pinned.discard(key)
+        row = self._index.get(key)
+        if row is not None:
+            self._changed(row)
+
+    def set_pinned_ids(self, keys) -> None:
+        keys = set(keys)
+        for key in self._pinned ^ keys:
+            self.set_pinned(key, key in keys)
+
+
+class PinnedModel(KeyedListModel):
+    ROLES = {"actionId": "id", "label": "label"}
+
+
+class PaletteModel(KeyedListModel):
+    """Command palette results for ``setQuery``, from every mode's actions.
+
+    Rows are keyed ``<mode>/<action id>``; each keystroke syncs the model
+    row by row, so delegates of results that stay on the list are kept.
+    """
+
+    ROLES = {"key": "id", "actionId": "action", "mode": "mode", "label": "label", "command": "command"}
+
+    def __init__(self, index: PaletteIndex, parent=None):
+        super().__init__(parent)
+        self.palette = index
+        self.current_mode = ""
+        self._query = ""
+
+    @Slot(str)
+    def setQuery(self, query: str) -> None:
+        self._query = query
+        self.refresh()
+
+    @Slot()
+    def refresh(self) -> None:
+        self.sync(self.palette.search(self._query, self.current_mode))
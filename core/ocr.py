@@ -0,0 +1,200 @@
+from __future__ import annotations
+import os
+import tempfile
+from pathlib import Path
+from PySide6.QtCore import QObject, Signal
+
+from core.limits import available_cores, job_cores
+from core.process import ProcessRunner
+from core.skipcache import expand_paths
+
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".gif", ".webp", ".pbm", ".pgm", ".ppm"}
+# may hold several pages (frames), each followed by its own separator
+MULTI_PAGE_EXTS = {".tif", ".tiff", ".gif"}
+# tesseract's default page_separator for txt output, written after each page
+PAGE_SEPARATOR = "\f"
+
+
+def find_images(patterns: list[str], cwd: str | None) -> list[Path]:
+    """Image files under ``patterns`` (paths, globs or folders); [] if any matches nothing."""
+    files = expand_paths(patterns, cwd) or []
+    return [f for f in files if f.suffix.lower() in IMAGE_EXTS]
+
+
+def default_workers(threads: int = 1, limits: dict | None = None) -> int:
+    """Workers that fit the job's cores: its ``cpu_affinity``, else every
+    core not reserved for the overlay."""
+    cpus = (limits or {}).get("cpus")
+    if isinstance(cpus, list):
+        cores = len(cpus)
+    else:
+        cores = len(available_cores() if cpus == "all" else job_cores())
+    return max(1, cores // max(1, threads))
+
+
+def shard(images: list[Path], n: int) -> list[list[Path]]:
+    """Split ``images`` into at most ``n`` lists of similar total file size
+    (largest first onto the lightest shard); each keeps the input order."""
+    n = max(1, min(n, len(images)))
+    loads = [0] * n
+    owner: dict[Path, int] = {}
+    for img in sorted(images, key=_size, reverse=True):
+        i = loads.index(min(loads))
+        owner[img] = i
+        loads[i] += max(1, _size(img))
+    shards: list[list[Path]] = [[] for _ in range(n)]
+    for img in images:
+        shards[owner[img]].append(img)
+    return [s for s in shards if s]
+
+
+def _size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+class _Worker:
+    """Parse state of one tesseract run over a list file."""
+
+    def __init__(self, images: list[Path], list_file: str):
+        self.images = images
+        self.list_file = list_file
+        # a lone multi-page image: its pages are joined, not one per image
+        self.whole = len(images) == 1 and images[0].suffix.lower() in MULTI_PAGE_EXTS
+        self.index = 0
+        self.lines: list[str] = []
+        self.errors: list[str] = []
+
+
+class OcrBatch(QObject):
+    """OCR many images with few tesseract processes.
+
+    Images are sharded across ``workers`` jobs on the ProcessRunner; each job
+    runs tesseract once over a list file of its shard (so the language model
+    is loaded once per worker) with ``OMP_THREAD_LIMIT`` set to ``threads``.
+    Text is read from stdout and split on the page separator, so
+    ``imageDone`` fires per image while the worker keeps going; images that
+    may hold several pages (TIFF, GIF) get a job each, so their separators
+    cannot shift the results of the images after them. tesseract
+    stops at an unreadable image: that one is reported via ``imageFailed``
+    and the rest of its shard is queued again.
+    """
+
+    imageDone = Signal(str, str)    # image path, text
+    imageFailed = Signal(str, str)  # image path, reason
+    workerStarted = Signal(int, int)  # job id, images in its shard
+    finished = Signal(int, int)     # images done, images failed
+
+    def __init__(self, runner: ProcessRunner, tesseract: str, images: list[Path],
+                 lang: str | None = None, workers: int | None = None, threads: int = 1,
+                 cwd: str | None = None, limits: dict | None = None, parent=None):
+        super().__init__(parent)
+        self.runner = runner
+        self.tesseract = tesseract
+        self.lang = lang
+        self.threads = max(1, threads)
+        self.cwd = cwd
+        self.limits = limits
+        self.images = list(images)
+        self.workers = max(1, min(workers or default_workers(self.threads, limits), runner.max_concurrent))
+        self._jobs: dict[int, _Worker] = {}
+        self._done = 0
+        self._failed = 0
+        self._cancelled = False
+
+    def start(self) -> None:
+        self.runner.jobLines.connect(self._on_lines)
+        self.runner.jobFinished.connect(self._on_finished)
+        multi = [img for img in self.images if img.suffix.lower() in MULTI_PAGE_EXTS]
+        single = [img for img in self.images if img.suffix.lower() not in MULTI_PAGE_EXTS]
+        for images in shard(single, self.workers):
+            self._spawn(images)
+        for img in multi:
+            self._spawn([img])
+        self._check_done()
+
+    def cancel(self) -> None:
+        self._cancelled = True
+        for job_id in list(self._jobs):
+            self.runner.cancel(job_id)
+
+    def _spawn(self, images: list[Path]) -> None:
+        fd, list_file = tempfile.mkstemp(prefix="ocr_", suffix=".txt")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write("".join(f"{img.resolve()}\n" for img in images))
+        argv = [self.tesseract, list_file, "stdout"]
+        if self.lang:
+            argv += ["-l", self.lang]
+        # the text comes out per image on imageDone, not in the panel log
+        job_id = self.runner.run(argv, cwd=self.cwd, env={"OMP_THREAD_LIMIT": str(self.threads)},
+                                 limits=self.limits, quiet=True)
+        self._jobs[job_id] = _Worker(images, list_file)
+        self.workerStarted.emit(job_id, len(images))
+
+    def _on_lines(self, job_id: int, lines: list) -> None:
+        worker = self._jobs.get(job_id)
+        if worker is None:
+            return
+        for tag, line in lines:
+            if tag != "stdout":
+                worker.errors.append(line)
+                continue
+            if worker.whole:
+                worker.lines.append(line.replace(PAGE_SEPARATOR, "\n"))
+                continue
+            head, *pages = line.split(PAGE_SEPARATOR)
+            worker.lines.append(head)
+            for page in pages:
+                self._emit_page(worker)
+                worker.lines.append(page)
+
+    def _emit_page(self, worker: _Worker) -> None:
+        if worker.index < len(worker.images):
+            self._done += 1
+            self.imageDone.emit(str(worker.images[worker.index]), "\n".join(worker.lines).strip())
+        worker.index += 1
+        worker.lines = []
+
+    def _on_finished(self, job_id: int, code: int) -> None:
+        worker = self._jobs.pop(job_id, None)
+        if worker is None:
+            return
+        try:
+            os.remove(worker.list_file)
+        except OSError:
+            pass
+        if code == 0:
+            if worker.index < len(worker.images):
+                self._emit_page(worker)  # the last page has no separator after it
+        elif self._cancelled or code == ProcessRunner.CANCELLED:
+            for img in worker.images[worker.index:]:
+                self._failed += 1
+                self.imageFailed.emit(str(img), "cancelled")
+        elif worker.index < len(worker.images):
+            bad = self._failing_index(worker)
+            while worker.index < bad:
+                self._emit_page(worker)  # finished before tesseract hit the bad image
+            reason = next((e for e in reversed(worker.errors) if e.strip()), f"exit {code}")
+            self._failed += 1
+            self.imageFailed.emit(str(worker.images[bad]), reason)
+            if bad + 1 < len(worker.images):
+                self._spawn(worker.images[bad + 1:])
+        self._check_done()
+
+    @staticmethod
+    def _failing_index(worker: _Worker) -> int:
+        """Image tesseract gave up on: the one its error names, else the current one."""
+        for i in range(worker.index, len(worker.images)):
+            path = str(worker.images[i].resolve())
+            if any(path in e for e in worker.errors):
+                return i
+        return worker.index
+
+    def _check_done(self) -> None:
+        if self._jobs:
+            return
+        self.runner.jobLines.disconnect(self._on_lines)
+        self.runner.jobFinished.disconnect(self._on_finished)
+        self.finished.emit(self._done, self._failed)
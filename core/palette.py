@@ -0,0 +1,280 @@
+"""Search index for the command palette over the actions of every mode.
+
+Each mode gets a ``ModeIndex`` (built off the GUI thread, replaced whole on
+reload). Tokens of 3+ characters are looked up through trigram posting
+lists and checked as substrings, falling back to trigram overlap for typos;
+shorter tokens match word prefixes of id and label. Matches are ranked by
+where the token hit, then boosted by ``Frecency`` (runs decayed with a
+half-life) and by belonging to the current mode.
+"""
+from __future__ import annotations
+import heapq
+import itertools
+import json
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from pathlib import Path
+
+DEFAULT_LIMIT = 50
+# commands are long and mostly paths; only their head is indexed
+_COMMAND_CHARS = 200
+# above this many candidates in all modes only used entries, exact id/label
+# hits, the first ones in catalog order and (unless one- or two-letter tokens
+# make every candidate one) hits in id or label are scored, so a token found
+# in many commands stays cheap
+_SCORE_MAX = 200
+_WORD_SPLIT = re.compile(r"[^0-9a-z]+")
+# letters NFKD does not decompose
+_FOLD = str.maketrans({"ł": "l", "ß": "ss", "ø": "o", "đ": "d", "æ": "ae", "œ": "oe"})
+
+
+def fold(text: str) -> str:
+    """Lowercase without diacritics, so "zrzut" finds "Zrzut ekranu" and "źródło"."""
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize("NFKD", text.lower().translate(_FOLD))
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class Frecency:
+    """Run counts that halve every ``half_life_days``, kept in a JSON file.
+
+    ``bump`` only changes memory; the file is written on a timer thread
+    ``save_delay`` seconds after the first unsaved bump, or by ``save``.
+    """
+
+    def __init__(self, path, half_life_days: float = 7.0, max_entries: int = 500,
+                 save_delay: float = 5.0):
+        self.path = Path(path)
+        self.half_life = half_life_days * 86400
+        self.max_entries = max_entries
+        self.save_delay = save_delay
+        self._data: dict[str, list[float]] = {}  # key -> [score, time of score]
+        self._snapshot: dict[str, float] | None = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self._data = {str(k): [float(v[0]), float(v[1])] for k, v in data.items()}
+        except Exception:
+            pass
+
+    def _decayed(self, entry: list[float], now: float) -> float:
+        return entry[0] * 0.5 ** ((now - entry[1]) / self.half_life)
+
+    def bump(self, key: str) -> None:
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            self._data[key] = [(self._decayed(entry, now) if entry else 0.0) + 1.0, now]
+            if len(self._data) > self.max_entries:
+                for k in heapq.nsmallest(len(self._data) - self.max_entries, self._data,
+                                         key=lambda k: self._decayed(self._data[k], now)):
+                    del self._data[k]
+            self._snapshot = None
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.save_delay, self.save)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def scores(self) -> dict[str, float]:
+        """key -> decayed score; recomputed only after a bump."""
+        if self._snapshot is None:
+            now = time.time()
+            self._snapshot = {k: self._decayed(v, now) for k, v in self._data.items()}
+        return self._snapshot
+
+    def save(self) -> None:
+        """Write unsaved bumps now (on exit; otherwise the timer does)."""
+        # writes one at a time, in order; bumps only wait for the JSON dump
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                text = json.dumps(self._data)
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_name(self.path.name + ".tmp")
+                tmp.write_text(text, encoding="utf-8")
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
+
+
+class _Entry:
+    __slots__ = ("key", "mode", "action", "label", "command", "fields", "order")
+
+    def __init__(self, mode: str, action: dict, order: int):
+        self.key = f"{mode}/{action['id']}"
+        self.mode = mode
+        self.action = action["id"]
+        self.label = str(action.get("label", action["id"]))
+        self.command = str(action.get("command", ""))
+        # (folded text, weight): hits in id and label count more than in the command
+        self.fields = ((fold(self.action), 3), (fold(self.label), 3), (fold(self.command[:_COMMAND_CHARS]), 1))
+        self.order = order
+
+
+class ModeIndex:
+    """Trigram and word-prefix postings over one mode's actions."""
+
+    def __init__(self, mode: str, actions: list[dict]):
+        self.mode = mode
+        self.entries = [_Entry(mode, a, i) for i, a in enumerate(actions)]
+        self.by_key = {e.key: i for i, e in enumerate(self.entries)}
+        # folded id and label -> entries, for exact hits
+        self.names: dict[str, list[int]] = {}
+        grams: dict[str, list[int]] = {}
+        name_grams: dict[str, list[int]] = {}
+        prefixes: dict[str, list[int]] = {}
+        for i, e in enumerate(self.entries):
+            mine: set[str] = set()
+            named: set[str] = set()
+            starts: set[str] = set()
+            for text, weight in e.fields:
+                mine |= trigrams(text)
+                if weight > 1:
+                    named |= trigrams(text)
+                    self.names.setdefault(text, []).append(i)
+                    for word in _WORD_SPLIT.split(text):
+                        starts.update((word[:1], word[:2]))
+            for g in mine:
+                grams.setdefault(g, []).append(i)
+            for g in named:
+                name_grams.setdefault(g, []).append(i)
+            for p in starts:
+                if p:
+                    prefixes.setdefault(p, []).append(i)
+        # frozensets: query-time intersections run in C
+        self._grams = {g: frozenset(ids) for g, ids in grams.items()}
+        self._name_grams = {g: frozenset(ids) for g, ids in name_grams.items()}
+        self._prefixes = {p: frozenset(ids) for p, ids in prefixes.items()}
+
+    def match(self, tokens: list[str]) -> tuple[set[int] | range, dict[str, dict | None]]:
+        """Entries matching every token; per token, None for exact matches or
+        entry -> trigram overlap (0..1) when it only matched fuzzily."""
+        if not tokens:
+            return range(len(self.entries)), {}
+        found: set[int] | None = None
+        fuzzy: dict[str, dict | None] = {}
+        for token in tokens:
+            ids, fuzzy[token] = self.candidates(token)
+            found = ids if found is None else found & ids
+            if not found:
+                break
+        return found, fuzzy
+
+    def named(self, tokens: list[str], found) -> set[int]:
+        """Entries of ``found`` whose id or label holds every token of 3+
+        characters (by trigrams; scoring drops the false hits)."""
+        hits = set(found)
+        for token in tokens:
+            if len(token) >= 3 and hits:
+                hits.intersection_update(*(self._name_grams.get(g, _EMPTY) for g in trigrams(token)))
+        return hits
+
+    def candidates(self, token: str) -> tuple[set[int], dict | None]:
+        if len(token) < 3:
+            return set(self._prefixes.get(token[:2], ())), None
+        grams = trigrams(token)
+        postings = [self._grams.get(g, _EMPTY) for g in grams]
+        # may hold entries with every trigram but not the substring; scoring drops those
+        found = set(min(postings, key=len)).intersection(*postings)
+        if found:
+            return found, None
+        hits = Counter(itertools.chain.from_iterable(postings))
+        need = max(2, math.ceil(len(grams) * 0.5))
+        overlap = {i: n / len(grams) for i, n in hits.items() if n >= need}
+        return set(overlap), overlap
+
+
+_EMPTY: frozenset = frozenset()
+
+
+def _token_score(token: str, entry: _Entry, overlap: dict | None) -> float:
+    if overlap is not None:
+        return 30 * overlap.get(entry.order, 0.0)  # typo: no position to judge by
+    best = 0.0
+    for text, weight in entry.fields:
+        if text == token:
+            score = 100
+        elif text.startswith(token):
+            score = 60
+        else:
+            pos = text.find(token)
+            if pos < 0:
+                continue
+            # a hit at a word start ("png" in "ocr_png") beats one mid-word
+            score = 40 if not text[pos - 1].isalnum() else 20
+        best = max(best, score * weight)
+    return best
+
+
+class PaletteIndex:
+    """All modes' indexes plus usage; ``search`` returns ranked entries."""
+
+    def __init__(self, frecency: Frecency | None = None):
+        self.frecency = frecency
+        self._modes: dict[str, ModeIndex] = {}
+
+    def set_mode(self, index: ModeIndex) -> None:
+        self._modes[index.mode] = index
+
+    def modes(self) -> list[str]:
+        return list(self._modes)
+
+    def record(self, mode: str, action_id: str) -> None:
+        if self.frecency is not None:
+            self.frecency.bump(f"{mode}/{action_id}")
+
+    def search(self, query: str, current_mode: str = "", limit: int = DEFAULT_LIMIT) -> list[dict]:
+        tokens = fold(query).split()
+        used = self.frecency.scores() if self.frecency else {}
+        modes = sorted(self._modes.values(), key=lambda index: index.mode != current_mode)
+        matches = [(index, *index.match(tokens)) for index in modes]
+        broad = not tokens or sum(len(found) for _, found, _ in matches) > _SCORE_MAX
+        # short tokens only match id/label word prefixes, so all their
+        # candidates are name hits; of those only exact ones are sure to rank
+        short = all(len(t) < 3 for t in tokens)
+        exact = " ".join(tokens)
+        head = limit
+        ranked: list[tuple[float, int, _Entry]] = []
+        for index, found, fuzzy in matches:
+            if not found:
+                continue
+            picked = found
+            if broad:
+                # rank only used entries, id/label hits and the first ones in catalog order
+                picked = set(sorted(found)[:head])
+                head -= len(picked)
+                picked.update(i for i in (index.by_key.get(k) for k in used) if i is not None and i in found)
+                picked.update(i for i in index.names.get(exact, ()) if i in found)
+                if not short:
+                    named = index.named(tokens, found)
+                    picked |= named if len(named) <= _SCORE_MAX else set(sorted(named)[:limit])
+            boost = 8.0 if index.mode == current_mode else 0.0
+            for i in picked:
+                e = index.entries[i]
+                score = sum(_token_score(t, e, fuzzy[t]) for t in tokens)
+                if tokens and not score:
+                    continue  # all trigrams present, but not as a substring
+                ranked.append((score + 20 * math.log1p(used.get(e.key, 0.0)) + boost, -e.order, e))
+        best = heapq.nlargest(limit, ranked, key=lambda r: (r[0], r[1]))
+        return [{"id": e.key, "mode": e.mode, "action": e.action, "label": e.label, "command": e.command}
+                for _, _, e in best]
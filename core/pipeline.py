@@ -0,0 +1,118 @@
+from __future__ import annotations
+import os
+from PySide6.QtCore import QObject, Signal
+
+from core.config import runnable
+from core.process import ProcessRunner
+
+
+def _chains(steps: list[dict]) -> list[list[dict]]:
+    """Group steps joined by ``stdin`` into pipes (producer first)."""
+    consumer = {s["stdin"]: s for s in steps if s["stdin"]}
+    chains = []
+    for s in steps:
+        if s["stdin"]:
+            continue
+        chain = [s]
+        while chain[-1]["id"] in consumer:
+            chain.append(consumer[chain[-1]["id"]])
+        chains.append(chain)
+    return chains
+
+
+class Pipeline(QObject):
+    """One run of a ``steps:`` action on a ProcessRunner.
+
+    Steps start as soon as everything they need has succeeded, so independent
+    branches run side by side; steps joined by ``stdin`` are queued as one
+    chain. The first failure cancels running steps and skips the rest
+    (reported with ProcessRunner.CANCELLED); ``finished`` then carries that
+    step's exit code, or 0 when every step succeeded.
+    """
+
+    stepStarted = Signal(str, int)   # step id, job id
+    stepFinished = Signal(str, int)  # step id, exit code
+    finished = Signal(int)
+
+    def __init__(self, runner: ProcessRunner, steps: list[dict], cwd: str | None = None, parent=None):
+        super().__init__(parent)
+        self.runner = runner
+        self.cwd = cwd
+        self._waiting = _chains(steps)
+        self._jobs: dict[int, str] = {}  # job id -> step id, while active
+        self._ok: set[str] = set()
+        self._code = 0
+        self._done = False
+
+    @property
+    def job_ids(self) -> list[int]:
+        return list(self._jobs)
+
+    def start(self) -> None:
+        self.runner.jobStarted.connect(self._on_job_started)
+        self.runner.jobFinished.connect(self._on_job_finished)
+        self._advance()
+
+    def cancel(self) -> None:
+        self._fail(ProcessRunner.CANCELLED)
+
+    def _cwd(self, step: dict) -> str | None:
+        cwd = step.get("cwd")
+        if cwd and not os.path.isabs(cwd) and self.cwd:
+            cwd = os.path.join(self.cwd, cwd)
+        cwd = cwd or self.cwd
+        return cwd if cwd and os.path.isdir(cwd) else None
+
+    def _advance(self) -> None:
+        for unit in list(self._waiting):
+            members = {s["id"] for s in unit}
+            if all(n in self._ok or n in members for s in unit for n in s["needs"]):
+                self._waiting.remove(unit)
+                specs = [(runnable(s), self._cwd(s), s.get("limits")) for s in unit]
+                if len(unit) == 1:
+                    command, cwd, limits = specs[0]
+                    job_ids = [self.runner.run(command, cwd, limits=limits)]
+                else:
+                    job_ids = self.runner.run_chain(specs)
+                for job_id, s in zip(job_ids, unit):
+                    self._jobs[job_id] = s["id"]
+        self._check_done()
+
+    def _on_job_started(self, job_id: int) -> None:
+        step = self._jobs.get(job_id)
+        if step is not None:
+            self.stepStarted.emit(step, job_id)
+
+    def _on_job_finished(self, job_id: int, code: int) -> None:
+        step = self._jobs.pop(job_id, None)
+        if step is None:
+            return
+        self.stepFinished.emit(step, code)
+        if code == 0:
+            self._ok.add(step)
+            if not self._code:
+                self._advance()
+                return
+        elif not self._code:
+            self._fail(code)
+        self._check_done()
+
+    def _fail(self, code: int) -> None:
+        if self._code or self._done:
+            return
+        self._code = code
+        for unit in self._waiting:
+            for s in unit:
+                self.stepFinished.emit(s["id"], ProcessRunner.CANCELLED)
+        self._waiting.clear()
+        for job_id in list(self._jobs):
+            self.runner.cancel(job_id)
+        self._check_done()
+
+    def _check_done(self) -> None:
+        if self._done or self._jobs or (self._waiting and not self._code):
+            return
+        self._done = True
+        self.runner.jobStarted.disconnect(self._on_job_started)
+        self.runner.jobFinished.disconnect(self._on_job_finished)
+        self.finished.emit(self._code)
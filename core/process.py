@@ -1,38 +1,363 @@
-
 from __future__ import annotations
+import codecs
+import heapq
+import itertools
 import os
-from PySide6.QtCore import QObject, Signal, QProcess
+import re
+import time
+from PySide6.QtCore import QObject, Signal, QProcess, QProcessEnvironment, QTimer
+
+from core.joblog import JobLog, JobLogStore
+from core.limits import Limiter, default_limits, merge
+from core.telemetry import TreeSampler, load_psutil
+
+DEFAULT_MAX_JOBS = 4
+DEFAULT_UPDATES_PER_SEC = 10
+# lines per job and batch passed on through ``output`` when the job logs to disk
+DEFAULT_TAIL_LINES = 200
+SAMPLE_INTERVAL_MS = 250
+
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+
+def _default_max_jobs() -> int:
+    try:
+        return max(1, int(os.environ.get("OVERLAY_MAX_JOBS", DEFAULT_MAX_JOBS)))
+    except ValueError:
+        return DEFAULT_MAX_JOBS
+
+
+class LineStream:
+    """Incremental UTF-8 decoder and line splitter for one pipe.
+
+    Multibyte characters and ``\\r\\n`` pairs split across reads are carried
+    over to the next ``feed``; a bare ``\\r`` (ffmpeg progress) ends a line.
+    """
+
+    def __init__(self, tag: str):
+        self.tag = tag
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+
+    def feed(self, data: bytes, final: bool = False) -> list[str]:
+        text = self._partial + self._decoder.decode(data, final)
+        carry = ""
+        if text.endswith("\r") and not final:
+            text, carry = text[:-1], "\r"
+        lines = _LINE_BREAK.split(text)
+        self._partial = lines.pop() + carry
+        if final and self._partial:
+            lines.append(self._partial)
+            self._partial = ""
+        return lines
+
 
 class ProcessRunner(QObject):
+    """Pool of jobs with bounded concurrency.
+
+    A job is an argv list, started directly, or a command string, run by
+    ``/bin/sh -c`` (``cmd /C`` on Windows).
+
+    ``run`` never refuses work: jobs beyond ``max_concurrent`` wait in a
+    priority queue (higher ``priority`` first; within a priority, lower
+    ``estimate_ms`` first with unknown as 0, then FIFO). ``output``/``finished``
+    carry every job but the ones run with ``quiet`` (``output`` only; their
+    owner shows them); the ``job*`` signals carry the job id returned by ``run``.
+
+    ``run_chain`` queues several commands as one unit that starts together
+    once it fits (or nothing else runs), each stdout piped straight into the
+    next command's stdin.
+
+    Right before ``jobFinished``, ``jobStats`` reports the run's
+    ``wait_ms``/``wall_ms`` and, with psutil, ``user_s``/``sys_s``/``peak_rss``
+    of the whole process tree (sampled every SAMPLE_INTERVAL_MS; None if
+    unavailable).
+
+    Output is decoded per pipe, split into lines and delivered in batches at
+    most ``updates_per_sec`` times per second: ``jobLines`` gets
+    ``[stream, line]`` pairs tagged ``"stdout"``/``"stderr"``, ``jobOutput``
+    and ``output`` the same lines joined with newlines.
+
+    With a ``log_store`` every job's combined output is also written to its
+    own log file (path in the stats as ``log``) and ``output`` only carries
+    the last ``tail_lines`` lines of each batch, so chatty jobs cost the UI
+    a bounded amount per update; the per-job signals still get every line.
+
+    ``limits`` (see core.limits) set a job's CPU priority, cores and
+    memory/CPU-time caps once it started; keys it leaves out come from
+    ``default_limits``, which by default keeps jobs off the cores reserved
+    for the overlay. Limits that cannot be applied are reported on stderr.
+    """
+
     output = Signal(str)
     finished = Signal(int)
+    jobQueued = Signal(int)
+    jobStarted = Signal(int)
+    jobOutput = Signal(int, str)
+    jobLines = Signal(int, list)
+    jobFinished = Signal(int, int)
+    jobStats = Signal(int, 'QVariant')
 
-    def __init__(self, parent=None):
+    CANCELLED = -1
+    FAILED_TO_START = -2
+
+    def __init__(self, parent=None, max_concurrent: int | None = None,
+                 updates_per_sec: int = DEFAULT_UPDATES_PER_SEC,
+                 log_store: JobLogStore | None = None, tail_lines: int = DEFAULT_TAIL_LINES,
+                 limits: dict | None = None):
         super().__init__(parent)
-        self.proc = None
+        self.default_limits = default_limits() if limits is None else limits
+        self._limiters: dict[int, Limiter] = {}
+        self.log_store = log_store
+        self.tail_lines = max(1, tail_lines)
+        self._logs: dict[int, JobLog] = {}
+        self.max_concurrent = max(1, max_concurrent) if max_concurrent else _default_max_jobs()
+        self._ids = itertools.count(1)
+        self._queue: list[tuple[int, float, int]] = []  # (-priority, estimate, job_id)
+        self._pending: dict[int, tuple[str | list[str], str | None, dict | None, dict | None]] = {}
+        self._chains: dict[int, list[int]] = {}  # job_id -> queued chain it belongs to
+        self._running: dict[int, QProcess] = {}
+        self._streams: dict[int, tuple[LineStream, LineStream]] = {}
+        self._batches: dict[int, list[list[str]]] = {}
+        self._quiet: set[int] = set()  # jobs left out of ``output``
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(max(1, 1000 // max(1, updates_per_sec)))
+        self._flush_timer.timeout.connect(self._flush)
+        self._times: dict[int, list[float]] = {}  # job_id -> [queued, started]
+        self._samplers: dict[int, TreeSampler] = {}
+        self._sample_timer = QTimer(self)
+        self._sample_timer.setInterval(SAMPLE_INTERVAL_MS)
+        self._sample_timer.timeout.connect(self._sample)
 
-    def run(self, command: str, cwd: str | None = None):
-        if self.proc and self.proc.state() != QProcess.NotRunning:
-            self.output.emit("[WARN] Previous process still running")
-            return
-        self.proc = QProcess()
+    def run(self, command: str | list[str], cwd: str | None = None, priority: int = 0,
+            estimate_ms: float | None = None, env: dict | None = None, limits: dict | None = None,
+            quiet: bool = False) -> int:
+        """Queue ``command``; ``env`` adds/overrides environment variables."""
+        job_id = next(self._ids)
+        if quiet:
+            self._quiet.add(job_id)
+        self._pending[job_id] = (command, cwd, env, limits)
+        self._times[job_id] = [time.monotonic(), 0.0]
+        heapq.heappush(self._queue, (-priority, estimate_ms or 0.0, job_id))
+        self.jobQueued.emit(job_id)
+        self._drain()
+        return job_id
+
+    def run_chain(self, steps: list[tuple], priority: int = 0,
+                  estimate_ms: float | None = None) -> list[int]:
+        """Queue ``(command, cwd[, limits])`` steps as a pipe; returns their job ids.
+
+        Only the last job's stdout is delivered; every job's stderr is.
+        """
+        now = time.monotonic()
+        chain = [next(self._ids) for _ in steps]
+        for job_id, (command, cwd, *limits) in zip(chain, steps):
+            self._pending[job_id] = (command, cwd, None, limits[0] if limits else None)
+            self._times[job_id] = [now, 0.0]
+            self._chains[job_id] = chain
+        heapq.heappush(self._queue, (-priority, estimate_ms or 0.0, chain[0]))
+        for job_id in chain:
+            self.jobQueued.emit(job_id)
+        self._drain()
+        return chain
+
+    def cancel(self, job_id: int) -> bool:
+        if job_id in self._pending:
+            # a queued chain only runs whole; heap entries are dropped lazily in _drain
+            for jid in self._chains.get(job_id, [job_id]):
+                self._chains.pop(jid, None)
+                if self._pending.pop(jid, None) is not None:
+                    self._finish(jid, self.CANCELLED)
+            return True
+        proc = self._running.get(job_id)
+        if proc is None:
+            return False
+        proc.terminate()
+        QTimer.singleShot(1500, lambda: self._kill(job_id, proc))
+        return True
+
+    def cancel_all(self) -> None:
+        for job_id in list(self._pending) + list(self._running):
+            self.cancel(job_id)
+
+    def is_active(self, job_id: int) -> bool:
+        return job_id in self._pending or job_id in self._running
+
+    def running_count(self) -> int:
+        return len(self._running)
+
+    def queued_count(self) -> int:
+        return len(self._pending)
+
+    def _kill(self, job_id: int, proc: QProcess) -> None:
+        if self._running.get(job_id) is proc and proc.state() != QProcess.NotRunning:
+            proc.kill()
+
+    def _drain(self) -> None:
+        while self._queue and len(self._running) < self.max_concurrent:
+            *_, job_id = self._queue[0]
+            if job_id not in self._pending:
+                heapq.heappop(self._queue)
+                continue
+            chain = self._chains.get(job_id, [job_id])
+            if self._running and len(self._running) + len(chain) > self.max_concurrent:
+                break  # keep order: wait until the whole chain fits
+            heapq.heappop(self._queue)
+            procs = []
+            for jid in chain:
+                self._chains.pop(jid, None)
+                procs.append(self._prepare(jid, *self._pending.pop(jid)))
+            for upstream, downstream in zip(procs, procs[1:]):
+                upstream.setStandardOutputProcess(downstream)
+            for jid, proc in zip(chain, procs):
+                self._times[jid][1] = time.monotonic()
+                proc.start()
+
+    def log_path(self, job_id: int) -> str | None:
+        """Current log segment of a running job."""
+        log = self._logs.get(job_id)
+        return str(log.path) if log else None
+
+    def _prepare(self, job_id: int, command: str | list[str], cwd: str | None,
+                 env: dict | None, limits: dict | None) -> QProcess:
+        proc = QProcess(self)
+        self._running[job_id] = proc
+        limits = merge(self.default_limits, limits)
+        if self.log_store is not None:
+            log = self.log_store.open(job_id, command if isinstance(command, str) else " ".join(command))
+            if log is not None:
+                self._logs[job_id] = log
 
         if cwd:
-            self.proc.setWorkingDirectory(cwd)
+            proc.setWorkingDirectory(cwd)
+        if env:
+            penv = QProcessEnvironment.systemEnvironment()
+            for key, value in env.items():
+                penv.insert(key, str(value))
+            proc.setProcessEnvironment(penv)
 
-        if os.name == "nt":
+        if not isinstance(command, str):
+            proc.setProgram(command[0])
+            proc.setArguments(command[1:])
+        elif os.name == "nt":
             comspec = os.environ.get("ComSpec", r"C:\Windows\System32\cmd.exe")
-            self.proc.setProgram(comspec)
-            self.proc.setArguments(["/C", command])
+            proc.setProgram(comspec)
+            proc.setArguments(["/C", command])
         else:
-            self.proc.setProgram("/bin/sh")
-            self.proc.setArguments(["-lc", command])
+            proc.setProgram("/bin/sh")
+            proc.setArguments(["-c", command])
 
-        self.proc.readyReadStandardOutput.connect(
-            lambda: self.output.emit(bytes(self.proc.readAllStandardOutput()).decode(errors="ignore"))
+        out, err = self._streams[job_id] = (LineStream("stdout"), LineStream("stderr"))
+        proc.readyReadStandardOutput.connect(
+            lambda: self._queue_lines(job_id, out.tag, out.feed(bytes(proc.readAllStandardOutput())))
         )
-        self.proc.readyReadStandardError.connect(
-            lambda: self.output.emit(bytes(self.proc.readAllStandardError()).decode(errors="ignore"))
+        proc.readyReadStandardError.connect(
+            lambda: self._queue_lines(job_id, err.tag, err.feed(bytes(proc.readAllStandardError())))
         )
-        self.proc.finished.connect(lambda code, _=None: self.finished.emit(code))
-        self.proc.start()
+        proc.finished.connect(lambda code, _=None: self._on_finished(job_id, code))
+        proc.errorOccurred.connect(lambda error: self._on_error(job_id, proc, error))
+        proc.started.connect(lambda: self._on_started(job_id, proc, limits))
+        return proc
+
+    def _on_started(self, job_id: int, proc: QProcess, limits: dict) -> None:
+        if limits:
+            limiter = Limiter(proc.processId(), limits)
+            errors = limiter.apply()
+            if errors:
+                self._queue_lines(job_id, "stderr", [f"[WARN] limits: {e}" for e in errors])
+            self._limiters[job_id] = limiter
+        if load_psutil() is not None:
+            try:
+                sampler = TreeSampler(proc.processId())
+            except Exception:  # already gone
+                sampler = None
+            if sampler is not None:
+                sampler.sample()
+                self._samplers[job_id] = sampler
+                if not self._sample_timer.isActive():
+                    self._sample_timer.start()
+        self.jobStarted.emit(job_id)
+
+    def _sample(self) -> None:
+        for sampler in self._samplers.values():
+            sampler.sample()
+        for limiter in self._limiters.values():
+            limiter.sweep()  # children started before the limits were set
+        if not self._samplers:
+            self._sample_timer.stop()
+
+    def _queue_lines(self, job_id: int, tag: str, lines: list[str]) -> None:
+        if not lines:
+            return
+        log = self._logs.get(job_id)
+        if log is not None:
+            try:
+                log.write(lines)
+            except OSError:
+                self._logs.pop(job_id).close()
+        self._batches.setdefault(job_id, []).extend([tag, line] for line in lines)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush(self, job_id: int | None = None) -> None:
+        if job_id is None:
+            batches, self._batches = self._batches, {}
+        else:
+            batch = self._batches.pop(job_id, None)
+            batches = {job_id: batch} if batch else {}
+        for jid, lines in batches.items():
+            text = "\n".join(line for _, line in lines)
+            self.jobLines.emit(jid, lines)
+            self.jobOutput.emit(jid, text)
+            log = self._logs.get(jid)
+            if log is not None:
+                log.flush()
+            if jid in self._quiet:
+                continue
+            if log is None:
+                self.output.emit(text)
+                continue
+            if len(lines) > self.tail_lines:
+                skipped = len(lines) - self.tail_lines
+                text = "\n".join([f"[... {skipped} lines in {log.path.name}]",
+                                  *(line for _, line in lines[-self.tail_lines:])])
+            self.output.emit(text)
+
+    def _on_error(self, job_id: int, proc: QProcess, err) -> None:
+        # FailedToStart never emits QProcess.finished, so release the slot here
+        if err == QProcess.FailedToStart and self._running.get(job_id) is proc:
+            self._queue_lines(job_id, "stderr", [f"[ERR] Failed to start: {proc.errorString()}"])
+            self._on_finished(job_id, self.FAILED_TO_START)
+
+    def _on_finished(self, job_id: int, code: int) -> None:
+        proc = self._running.pop(job_id, None)
+        if proc is None:
+            return
+        out, err = self._streams.pop(job_id)
+        self._queue_lines(job_id, out.tag, out.feed(bytes(proc.readAllStandardOutput()), final=True))
+        self._queue_lines(job_id, err.tag, err.feed(bytes(proc.readAllStandardError()), final=True))
+        self._flush(job_id)
+        proc.deleteLater()
+        self._finish(job_id, code)
+        self._drain()
+
+    def _finish(self, job_id: int, code: int) -> None:
+        now = time.monotonic()
+        queued, started = self._times.pop(job_id, (now, 0.0))
+        sampler = self._samplers.pop(job_id, None)
+        self._limiters.pop(job_id, None)
+        self._quiet.discard(job_id)
+        log = self._logs.pop(job_id, None)
+        if log is not None:
+            log.close()
+        stats = {
+            "code": code,
+            "log": str(log.path) if log else None,
+            "wait_ms": ((started or now) - queued) * 1000,
+            "wall_ms": (now - started) * 1000 if started else None,
+            **(sampler.totals() if sampler else {"user_s": None, "sys_s": None, "peak_rss": None}),
+        }
+        self.jobStats.emit(job_id, stats)
+        self.jobFinished.emit(job_id, code)
+        self.finished.emit(code)
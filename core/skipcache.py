@@ -0,0 +1,126 @@
+from __future__ import annotations
+import glob
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+CHUNK = 1024 * 1024
+_VERSION = 1
+
+
+def expand_paths(patterns: list[str], cwd: str | None) -> list[Path] | None:
+    """Files matched by ``patterns`` (paths, globs or folders, relative to
+    ``cwd``), sorted. Folders are walked recursively. None if a pattern
+    matches nothing.
+    """
+    base = Path(cwd) if cwd else Path.cwd()
+    files: set[Path] = set()
+    for pattern in patterns:
+        pattern = os.path.expanduser(os.path.expandvars(pattern))
+        full = str(base / pattern)
+        matches = glob.glob(full, recursive=True) if glob.has_magic(full) else (
+            [full] if os.path.exists(full) else [])
+        if not matches:
+            return None
+        for m in matches:
+            if os.path.isdir(m):
+                for root, _, names in os.walk(m):
+                    files.update(Path(root, n) for n in names)
+            else:
+                files.add(Path(m))
+    return sorted(files)
+
+
+class SkipCache:
+    """Persistent content hashes of action inputs and last good fingerprints.
+
+    File hashes are reused while a file keeps its size and mtime, so only
+    changed files are read again. An action is up to date when its command
+    and input contents hash to the fingerprint recorded after its last
+    successful run and all its outputs exist.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._files: dict[str, list] = {}  # path -> [mtime_ns, size, sha256]
+        self._actions: dict[str, str] = {}  # action key -> fingerprint
+        self._dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == _VERSION:
+                self._files = data.get("files", {})
+                self._actions = data.get("actions", {})
+        except Exception:
+            pass
+
+    def file_hash(self, path: Path) -> str:
+        st = path.stat()
+        key = str(path.resolve())
+        with self._lock:
+            hit = self._files.get(key)
+        if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            return hit[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as fh:
+            while chunk := fh.read(CHUNK):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self._lock:
+            self._files[key] = [st.st_mtime_ns, st.st_size, digest]
+            self._dirty = True
+        return digest
+
+    def fingerprint(self, command: str | list[str], inputs: list[str], cwd: str | None) -> str | None:
+        """Hash of ``command`` (as it will run: the argv, or the string for
+        the shell) plus the content of every input; None if an input is
+        missing."""
+        files = expand_paths(inputs, cwd)
+        if files is None:
+            return None
+        h = hashlib.sha256(json.dumps(command).encode())
+        base = Path(cwd) if cwd else Path.cwd()
+        for f in files:
+            try:
+                digest = self.file_hash(f)
+            except OSError:
+                return None
+            h.update(b"\0" + os.path.relpath(f, base).encode() + b"\0" + digest.encode())
+        return h.hexdigest()
+
+    def is_fresh(self, key: str, fingerprint: str | None, outputs: list[str], cwd: str | None) -> bool:
+        if fingerprint is None or not outputs:
+            return False
+        with self._lock:
+            if self._actions.get(key) != fingerprint:
+                return False
+        return expand_paths(outputs, cwd) is not None
+
+    def record(self, key: str, fingerprint: str) -> None:
+        with self._lock:
+            self._actions[key] = fingerprint
+            self._dirty = True
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            if self._actions.pop(key, None) is not None:
+                self._dirty = True
+
+    def save(self) -> None:
+        # writes one at a time, in order: an older snapshot never lands last
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = json.dumps({"version": _VERSION, "files": self._files, "actions": self._actions})
+                self._dirty = False
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_name(self.path.name + ".tmp")
+                tmp.write_text(data, encoding="utf-8")
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
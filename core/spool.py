@@ -0,0 +1,232 @@
+from __future__ import annotations
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable
+
+# (url, payload, headers, timeout) -> HTTP status
+Sender = Callable[[str, object, dict, float], int]
+
+
+def _http_sender(url: str, payload, headers: dict, timeout: float) -> int:
+    from core import webhook  # http.client only once something is sent
+
+    body = json.dumps(payload).encode()
+    hdrs = {"Content-Type": "application/json", **headers}
+    status, _ = webhook.default_pool().request("POST", url, body, hdrs, timeout=timeout)
+    return status
+
+
+class WebhookSpool:
+    """Durable queue of outgoing webhook events with a background sender.
+
+    Events are appended to a JSON-lines journal (``add``/``ack`` records)
+    so they survive crashes and restarts. ``enqueue`` only queues the
+    record: the sender thread writes it (and the acks) before it sends
+    anything, so a slow disk never blocks the caller. It posts each event
+    as its JSON payload; events enqueued with
+    ``batch=True`` go out instead as a JSON array of up to ``batch_size``
+    payloads, one array per URL and set of headers. Failures back off
+    exponentially per URL; 4xx answers other than 408/429 are permanent and
+    drop the batch.
+
+    ``on_result(url, ids, status, error)`` is called from the sender thread
+    after every attempt. ``on_error(message)`` reports a journal that could
+    not be written; the events are then kept in memory only.
+    """
+
+    def __init__(self, path, sender: Sender | None = None, batch_size: int = 50,
+                 timeout: float = 10.0, base_delay: float = 1.0, max_delay: float = 300.0,
+                 on_result: Callable[[str, list[str], int, str], None] | None = None,
+                 on_error: Callable[[str], None] | None = None):
+        self.path = Path(path)
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.on_result = on_result
+        self.on_error = on_error
+        self._send = sender or _http_sender
+        self._cond = threading.Condition()
+        self._pending: dict[str, dict] = {}  # id -> event, insertion ordered
+        self._unwritten: list[dict] = []  # journal records the sender thread has yet to write
+        self._failures: dict[str, int] = {}  # url -> consecutive failures
+        self._retry_at: dict[str, float] = {}  # url -> monotonic time
+        self._inflight = 0
+        self._writing = False
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._load()
+
+    # ---- journal ----
+    def _load(self) -> None:
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            lines = []
+        acked = 0
+        for line in lines:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # torn write at the tail
+            if not isinstance(rec, dict):
+                continue  # hand-edited; skipped like a torn line
+            if rec.get("op") == "add" and "id" in rec and "url" in rec:
+                self._pending[rec["id"]] = rec
+            elif rec.get("op") == "ack":
+                self._pending.pop(rec.get("id"), None)
+                acked += 1
+        if acked:
+            try:
+                self._compact()
+            except OSError:
+                pass  # the acks are still in the journal; compacted next time
+
+    def _append(self, records: list[dict]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write("".join(json.dumps(r) + "\n" for r in records))
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def _compact(self) -> None:
+        with self._cond:
+            events = list(self._pending.values())
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write("".join(json.dumps(e) + "\n" for e in events))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.path)
+
+    # ---- public API ----
+    def enqueue(self, url: str, data, headers: dict | None = None, batch: bool = False) -> str:
+        event = {"op": "add", "id": uuid.uuid4().hex, "url": url, "data": data,
+                 "headers": dict(headers or {}), "batch": batch, "ts": time.time()}
+        with self._cond:
+            self._unwritten.append(event)
+            self._pending[event["id"]] = event
+            self._cond.notify_all()
+        return event["id"]
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def start(self) -> None:
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="webhook-spool", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until the spool is empty and journaled (True) or ``timeout`` runs out."""
+        self.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._inflight or self._unwritten or self._writing:
+                left = None if deadline is None else deadline - time.monotonic()
+                if left is not None and left <= 0:
+                    return False
+                self._cond.wait(left)
+            return True
+
+    # ---- sender ----
+    def _next_batch(self) -> tuple[str, list[dict]] | tuple[None, float | None]:
+        """Due batch for one URL, or (None, seconds until the next is due)."""
+        now = time.monotonic()
+        wait = None
+        groups: dict[object, list[dict]] = {}
+        for e in self._pending.values():
+            due = self._retry_at.get(e["url"], 0.0)
+            if due > now:
+                wait = due - now if wait is None else min(wait, due - now)
+                continue
+            # a batch is one request, so it needs one URL and one set of headers
+            key = (e["url"], frozenset((e.get("headers") or {}).items())) if e.get("batch") else e["id"]
+            groups.setdefault(key, []).append(e)
+        if groups:
+            events = next(iter(groups.values()))
+            return events[0]["url"], events[:self.batch_size]
+        return None, wait
+
+    def _journal(self, records: list[dict]) -> None:
+        """Append records (compacting once nothing is pending); sender thread only."""
+        try:
+            self._append(records)
+            with self._cond:
+                idle = not self._pending and not self._unwritten
+            if idle:
+                self._compact()
+        except OSError as e:
+            if self.on_error:
+                try:
+                    self.on_error(f"journal {self.path}: {e.strerror or e}")
+                except Exception:
+                    pass
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    records, self._unwritten = self._unwritten, []
+                    if records:
+                        self._writing = True
+                        break
+                    if self._stopping:
+                        return
+                    url, batch = self._next_batch()
+                    if url is not None:
+                        self._inflight += 1
+                        break
+                    self._cond.wait(batch)
+            if records:
+                # journal first: an ack never lands before its add
+                self._journal(records)
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+                continue
+            ids = [e["id"] for e in batch]
+            payload = [e["data"] for e in batch] if batch[0].get("batch") else batch[0]["data"]
+            status, error = 0, ""
+            try:
+                status = self._send(url, payload, batch[0].get("headers") or {}, self.timeout)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            delivered = 200 <= status < 300
+            rejected = 400 <= status < 500 and status not in (408, 429)
+            with self._cond:
+                self._inflight -= 1
+                if delivered or rejected:
+                    for i in ids:
+                        self._pending.pop(i, None)
+                    self._failures.pop(url, None)
+                    self._retry_at.pop(url, None)
+                    self._unwritten.extend({"op": "ack", "id": i} for i in ids)
+                else:
+                    n = self._failures.get(url, 0) + 1
+                    self._failures[url] = n
+                    delay = min(self.max_delay, self.base_delay * 2 ** (n - 1))
+                    self._retry_at[url] = time.monotonic() + delay * random.uniform(0.8, 1.2)
+                self._cond.notify_all()
+            if self.on_result:
+                try:
+                    self.on_result(url, ids, status, error)
+                except Exception:
+                    pass
@@ -0,0 +1,35 @@
+from __future__ import annotations
+import sys
+import time
+
+# as close to interpreter start as app.py gets: it imports this module first
+_T0 = time.perf_counter()
+
+
+class StartupProfile:
+    """Wall-clock timeline of startup phases (``--profile-startup``).
+
+    ``mark(name)`` closes the phase that ran since the previous mark. Marks
+    are always recorded (they are cheap); ``report`` prints them only when
+    the profile is enabled.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._last = _T0
+        self.phases: list[tuple[str, float, float]] = []  # (name, ms, ms since start)
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        self.phases.append((name, (now - self._last) * 1000, (now - _T0) * 1000))
+        self._last = now
+
+    def report(self, out=None) -> None:
+        if not self.enabled:
+            return
+        out = out or sys.stderr
+        width = max((len(n) for n, _, _ in self.phases), default=5)
+        out.write(f"[STARTUP] {'phase':<{width}} {'ms':>8} {'total':>8}\n")
+        for name, ms, total in self.phases:
+            out.write(f"[STARTUP] {name:<{width}} {ms:>8.1f} {total:>8.1f}\n")
+        out.flush()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+DEFAULT_WINDOW = 50
+
+_psutil = False  # not imported yet; None once known to be missing
+
+
+def load_psutil():
+    """The optional psutil module, or None; imported on first use since it
+    costs tens of milliseconds and nothing needs it before a job starts."""
+    global _psutil
+    if _psutil is False:
+        try:
+            import psutil
+        except Exception:  # optional: without it only wait/wall times are recorded
+            psutil = None
+        _psutil = psutil
+    return _psutil
+
+
+class TreeSampler:
+    """Peak RSS and CPU time of a process and its descendants (needs psutil).
+
+    Call ``sample`` periodically while the job runs: CPU times are kept per
+    pid as last seen, so children that exited between samples still count.
+    Work done after the last sample (or by jobs shorter than one interval)
+    is not seen.
+    """
+
+    def __init__(self, pid: int):
+        self._psutil = load_psutil()
+        self._root = self._psutil.Process(pid) if self._psutil and pid > 0 else None
+        self._cpu: dict[int, tuple[float, float]] = {}
+        self.peak_rss = 0
+        self.samples = 0
+
+    def sample(self) -> None:
+        if self._root is None:
+            return
+        try:
+            procs = [self._root, *self._root.children(recursive=True)]
+        except self._psutil.Error:
+            return
+        rss = 0
+        for p in procs:
+            try:
+                with p.oneshot():
+                    cpu = p.cpu_times()
+                    rss += p.memory_info().rss
+            except self._psutil.Error:
+                continue
+            self._cpu[p.pid] = (cpu.user, cpu.system)
+        self.peak_rss = max(self.peak_rss, rss)
+        self.samples += 1
+
+    def totals(self) -> dict:
+        if not self.samples:
+            return {"user_s": None, "sys_s": None, "peak_rss": None}
+        return {
+            "user_s": sum(u for u, _ in self._cpu.values()),
+            "sys_s": sum(s for _, s in self._cpu.values()),
+            "peak_rss": self.peak_rss,
+        }
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    idx = min(len(sorted_values) - 1, max(0, round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class RunHistory:
+    """SQLite store of finished runs, keyed by action id and mode.
+
+    Writes go through a single background thread so the GUI never waits on
+    the disk; reads are small indexed queries over the last ``window`` runs.
+    """
+
+    def __init__(self, path, window: int = DEFAULT_WINDOW):
+        self.path = Path(path)
+        self.window = window
+        import sqlite3  # core.process imports this module; only the history needs SQLite
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                " id INTEGER PRIMARY KEY, action TEXT NOT NULL, mode TEXT NOT NULL,"
+                " ts REAL NOT NULL, code INTEGER, wait_ms REAL, wall_ms REAL,"
+                " user_s REAL, sys_s REAL, peak_rss INTEGER)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS runs_key ON runs (mode, action, ts)")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history")
+
+    def record(self, action: str, mode: str, stats: dict) -> Future:
+        row = (action, mode, time.time(), stats.get("code"), stats.get("wait_ms"), stats.get("wall_ms"),
+               stats.get("user_s"), stats.get("sys_s"), stats.get("peak_rss"))
+        return self._writer.submit(self._insert, row)
+
+    def _insert(self, row: tuple) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO runs (action, mode, ts, code, wait_ms, wall_ms, user_s, sys_s, peak_rss)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+
+    def durations(self, action: str, mode: str) -> list[float]:
+        """Wall times (ms) of the last ``window`` successful runs, ascending."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT wall_ms FROM runs WHERE mode = ? AND action = ? AND code = 0"
+                " ORDER BY ts DESC LIMIT ?", (mode, action, self.window)).fetchall()
+        return sorted(r[0] for r in rows if r[0] is not None)
+
+    def summary(self, mode: str) -> dict[str, dict]:
+        """action id -> {"runs", "p50", "p95"} (ms) over the last ``window`` runs."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT action, wall_ms FROM ("
+                "  SELECT action, wall_ms, ROW_NUMBER() OVER (PARTITION BY action ORDER BY ts DESC) AS n"
+                "  FROM runs WHERE mode = ? AND code = 0 AND wall_ms IS NOT NULL"
+                ") WHERE n <= ?", (mode, self.window)).fetchall()
+        by_action: dict[str, list[float]] = {}
+        for action, wall in rows:
+            by_action.setdefault(action, []).append(wall)
+        out = {}
+        for action, walls in by_action.items():
+            walls.sort()
+            out[action] = {"runs": len(walls), "p50": percentile(walls, 50), "p95": percentile(walls, 95)}
+        return out
+
+    def flush(self) -> None:
+        self._writer.submit(lambda: None).result()
+
+    def close(self) -> None:
+        self._writer.shutdown(wait=True)
+        with self._lock:
+            self._db.close()
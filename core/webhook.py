@@ -0,0 +1,201 @@
+from __future__ import annotations
+import gzip
+import http.client
+import json
+import os
+import socket
+import threading
+import urllib.parse
+import uuid
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_TIMEOUT = 30.0
+
+def parse_kv(items):
+    out = {}
+    for it in items:
+        if "=" in it:
+            k, v = it.split("=", 1)
+        else:
+            k, v = it, ""
+        out[k] = v
+    return out
+
+
+def _file_chunks(path):
+    with open(path, "rb") as fh:
+        while True:
+            chunk = fh.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def multipart_body(data, files, boundary):
+    """Stream a multipart/form-data body.
+
+    Returns (iterable of bytes, content length or None). File contents are
+    read in CHUNK_SIZE pieces while sending, so memory stays flat; the
+    length is None when a file size can't be determined up front.
+    """
+    parts = []
+    for k, v in data.items():
+        parts.append((f"--{boundary}\r\n" +
+                      f"Content-Disposition: form-data; name=\"{k}\"\r\n\r\n{v}\r\n").encode())
+    for name, path in files.items():
+        parts.append((f"--{boundary}\r\n" +
+                      f"Content-Disposition: form-data; name=\"{name}\"; filename=\"{os.path.basename(path)}\"\r\n" +
+                      "Content-Type: application/octet-stream\r\n\r\n").encode())
+        parts.append(path)
+        parts.append(b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+
+    length = 0
+    for part in parts:
+        if isinstance(part, bytes):
+            length += len(part)
+            continue
+        try:
+            length += os.path.getsize(part)
+        except OSError:
+            length = None
+            break
+
+    def _gen():
+        for part in parts:
+            if isinstance(part, bytes):
+                yield part
+            else:
+                yield from _file_chunks(part)
+
+    return _gen(), length
+
+
+def build_request(url, method="POST", data=None, files=None, headers=None,
+                  gzip_json=False, chunked=False):
+    """-> (url, body, headers) for a webhook call, n8n_trigger style.
+
+    Files make a streamed multipart body, GET puts ``data`` in the query
+    string, anything else sends ``data`` as JSON.
+    """
+    method = method.upper()
+    data = dict(data or {})
+    headers = dict(headers or {})
+    if files:
+        boundary = f"----n8n-trigger-{uuid.uuid4().hex}"
+        body, length = multipart_body(data, files, boundary)
+        headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
+        # without Content-Length http.client falls back to chunked encoding
+        if length is not None and not chunked:
+            headers["Content-Length"] = str(length)
+    elif method == "GET":
+        url += ("?" + urllib.parse.urlencode(data)) if data else ""
+        body = None
+    else:
+        body = json.dumps(data).encode()
+        headers["Content-Type"] = "application/json"
+        if gzip_json:
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+    return url, body, headers
+
+
+class HttpPool:
+    """Keep-alive HTTP(S) connections, pooled per scheme/host/port.
+
+    Safe to use from several threads; each request borrows an idle
+    connection (or opens one) and returns it if the server keeps it open.
+    """
+
+    def __init__(self, max_idle_per_host: int = 4):
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: dict[tuple[str, str, int], list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, parts: urllib.parse.SplitResult) -> tuple[str, str, int]:
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {parts.scheme!r}")
+        return scheme, parts.hostname or "", parts.port or (443 if scheme == "https" else 80)
+
+    def _connect(self, key, timeout):
+        scheme, host, port = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = cls(host, port, timeout=timeout)
+        conn.connect()
+        # headers and streamed body chunks go out in separate sends
+        conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return conn
+
+    def _borrow(self, key):
+        with self._lock:
+            idle = self._idle.get(key)
+            return idle.pop() if idle else None
+
+    def _give_back(self, key, conn) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, method: str, url: str, body=None, headers=None,
+                timeout: float = DEFAULT_TIMEOUT) -> tuple[int, str]:
+        parts = urllib.parse.urlsplit(url)
+        key = self._key(parts)
+        path = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        # a streamed body can't be replayed, so only bytes bodies may try a
+        # pooled connection that the server might already have dropped
+        replayable = body is None or isinstance(body, (bytes, bytearray))
+        conn = self._borrow(key) if replayable else None
+        reused = conn is not None
+        while True:
+            if conn is None:
+                conn = self._connect(key, timeout)
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            try:
+                conn.request(method.upper(), path, body=body, headers=headers or {})
+                resp = conn.getresponse()
+                text = resp.read().decode(errors="replace")
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if not reused:
+                    raise
+                conn, reused = None, False
+                continue
+            except Exception:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._give_back(key, conn)
+            return resp.status, text
+
+    def close(self) -> None:
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for c in conns:
+            c.close()
+
+
+_pool: HttpPool | None = None
+_pool_lock = threading.Lock()
+
+def default_pool() -> HttpPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = HttpPool()
+        return _pool
+
+
+def send(url, method="POST", data=None, files=None, headers=None, gzip_json=False,
+         chunked=False, timeout: float = DEFAULT_TIMEOUT, pool: HttpPool | None = None) -> tuple[int, str]:
+    """Call a webhook and return (status, response text)."""
+    url, body, headers = build_request(url, method, data, files, headers, gzip_json, chunked)
+    return (pool or default_pool()).request(method, url, body, headers, timeout=timeout)
@@ -3,8 +3,27 @@ import QtQuick.Controls 2.15
 import QtQuick.Layouts 1.15
 
 Item {
+    id: tab
     width: 480
-    height: 320
+    height: 480
+
+    property bool queuePaused: KenBurns.getPaused()
+    property real now: Date.now()
+
+    Timer { interval: 1000; repeat: true; running: true; onTriggered: tab.now = Date.now() }
+
+    function fmtMs(ms) {
+        const s = Math.max(0, ms) / 1000;
+        if (s < 60) return s.toFixed(1) + "s";
+        return Math.floor(s / 60) + ":" + String(Math.floor(s % 60)).padStart(2, "0");
+    }
+    // "wait 1.2s · run 0:42" for a queue row
+    function timings(q, st, fin, state) {
+        if (state === "queued" || state === "held") return "wait " + fmtMs(now - q);
+        if (!st) return "";  // cancelled while waiting
+        const end = fin || now;
+        return "wait " + fmtMs(st - q) + " · run " + fmtMs(end - st);
+    }
 
     ColumnLayout {
         anchors.fill: parent
@@ -18,6 +37,8 @@ Item {
                 placeholderText: "."
                 text: "."
                 Layout.fillWidth: true
+                ToolTip.visible: hovered
+                ToolTip.text: "Kilka folderów rozdziel średnikiem (;) — każdy trafi do kolejki"
             }
             Button {
                 text: "--help"
@@ -63,14 +84,13 @@ Item {
             Button {
                 text: "Run"
                 onClicked: {
-                    const folder = (folderField.text || ".").trim();
-                    const args = argField.text.trim();
-                    const full = `"${folder.replace(/"/g, '\\"')}"` + (args ? " " + args : "");
-                    KenBurns.run(full);
+                    const folders = (folderField.text || ".").split(";").map(f => f.trim()).filter(f => f.length);
+                    const n = KenBurns.enqueueMany(folders.length ? folders : ["."], argField.text.trim());
+                    if (n > 1) toast.show("Queued " + n + " jobs", true);
                 }
             }
             Button {
-                text: "Stop"
+                text: "Stop all"
                 onClicked: KenBurns.stop()
             }
             Button {
@@ -82,6 +102,85 @@ Item {
             }
         }
 
+        RowLayout {
+            Label { text: "Queue"; font.bold: true }
+            Item { Layout.fillWidth: true }
+            Label { text: "Parallel:" }
+            SpinBox {
+                from: 1; to: 64
+                value: KenBurns.getMaxParallel()
+                onValueModified: KenBurns.setMaxParallel(value)
+            }
+            Button {
+                text: tab.queuePaused ? "Resume queue" : "Pause queue"
+                onClicked: KenBurns.setPaused(!tab.queuePaused)
+            }
+            Button { text: "Clear finished"; onClicked: KenBurns.clearFinished() }
+        }
+
+        ListView {
+            id: queueView
+            Layout.fillWidth: true
+            Layout.preferredHeight: 150
+            clip: true
+            model: KenBurnsQueue
+            delegate: RowLayout {
+                required property int index
+                required property string jobId
+                required property string folder
+                required property string args
+                required property string jobState
+                required property real queuedAt
+                required property real startedAt
+                required property real finishedAt
+                required property int code
+                required property string lastLine
+                width: queueView.width
+                spacing: 6
+
+                Label {
+                    text: jobState === "failed" ? "failed (" + code + ")" : jobState
+                    color: jobState === "failed" ? "#E74C3C" : jobState === "done" ? "#2ECC71"
+                         : jobState === "running" ? "#3498DB" : "#AAAAAA"
+                    Layout.preferredWidth: 80
+                }
+                ColumnLayout {
+                    Layout.fillWidth: true
+                    spacing: 0
+                    Label {
+                        text: (folder || args) + "   " + tab.timings(queuedAt, startedAt, finishedAt, jobState)
+                        elide: Text.ElideMiddle
+                        Layout.fillWidth: true
+                    }
+                    Label {
+                        text: lastLine
+                        visible: jobState === "running" && lastLine.length > 0
+                        opacity: 0.7
+                        elide: Text.ElideRight
+                        Layout.fillWidth: true
+                    }
+                }
+                ToolButton {
+                    text: "↑"; enabled: index > 0
+                    onClicked: KenBurns.moveJob(index, index - 1)
+                }
+                ToolButton {
+                    text: "↓"; enabled: index < queueView.count - 1
+                    onClicked: KenBurns.moveJob(index, index + 1)
+                }
+                ToolButton {
+                    text: jobState === "held" ? "▶" : "||"
+                    enabled: jobState === "queued" || jobState === "held"
+                    onClicked: jobState === "held" ? KenBurns.release(jobId) : KenBurns.hold(jobId)
+                }
+                ToolButton {
+                    text: "✕"
+                    enabled: jobState === "queued" || jobState === "held" || jobState === "running"
+                    onClicked: KenBurns.cancel(jobId)
+                }
+            }
+        }
+
         TextArea {
             id: logArea
             readOnly: true
@@ -105,6 +204,7 @@ Item {
 
     Connections {
         target: KenBurns
+        function onPausedChanged() { tab.queuePaused = KenBurns.getPaused() }
         function onOutput(msg) {
             logArea.append(msg)
             logArea.cursorPosition = logArea.length
@@ -1,34 +1,458 @@
 from __future__ import annotations
+import itertools
+import json
+import os
+import shlex
 import sys
+import time
 from pathlib import Path
-from PySide6.QtCore import QObject, Signal, Slot, QProcess
-from core.process import ProcessRunner
+from PySide6.QtCore import QCoreApplication, QObject, QProcess, QTimer, Signal, Slot
+from core.limits import Limiter, merge
+from core.models import KeyedListModel
+from core.process import LineStream, ProcessRunner
+
+WORKER_SCRIPT = Path(__file__).resolve().with_name("worker.py")
+CANCEL_EXIT = 75  # worker.py: exited to cancel an in-process job
+RESTART_MIN_MS = 500
+RESTART_MAX_MS = 30_000
+
+
+def split_args(args: str) -> list[str]:
+    """Split the dialog's args string (quoted folder + flags) into argv."""
+    try:
+        tokens = shlex.split(args, posix=False)
+    except ValueError:
+        tokens = args.split()
+    return [t[1:-1] if len(t) >= 2 and t[0] == t[-1] == '"' else t for t in tokens]
+
+
+class WarmWorker(QObject):
+    """Long-lived ``worker.py`` process with ken_burns_reel already imported.
+
+    ``run`` hands it a job and returns a job id; output arrives on
+    ``jobOutput`` as the worker reports it, ``jobFinished`` carries the exit
+    code (``ProcessRunner.CANCELLED`` after ``cancel``, ``CRASHED`` if the
+    worker died mid-job). A crashed worker is restarted with backoff; if
+    ken_burns_reel cannot be imported at all, ``unavailable`` is emitted and
+    the worker stays down.
+
+    ``limits`` (see core.limits) are set on the worker process, and its jobs
+    inherit them; problems setting them come out on ``warning``.
+    """
+
+    jobOutput = Signal(int, str)
+    jobFinished = Signal(int, int)
+    unavailable = Signal(str)
+    warning = Signal(str)
+
+    CRASHED = -3
+
+    def __init__(self, parent: QObject | None = None, limits: dict | None = None) -> None:
+        super().__init__(parent)
+        self._limits = limits or {}
+        self._ids = itertools.count(1)
+        self._jobs: dict[int, dict] = {}  # id -> run message
+        self._started: set[int] = set()
+        self._cancelling: set[int] = set()
+        self._proc: QProcess | None = None
+        self._stream: LineStream | None = None
+        self._restart_pending = False
+        self._failed = False
+        self._stopping = False
+        self._backoff = RESTART_MIN_MS
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    @property
+    def available(self) -> bool:
+        return not self._failed
+
+    def start(self) -> None:
+        if self._proc is not None or self._failed or self._stopping:
+            return
+        proc = QProcess(self)
+        proc.setProgram(sys.executable)
+        proc.setArguments([str(WORKER_SCRIPT)])
+        # worker stderr (tracebacks from preload) goes to ours
+        proc.setProcessChannelMode(QProcess.ForwardedErrorChannel)
+        self._stream = LineStream("worker")
+        proc.readyReadStandardOutput.connect(self._on_ready_read)
+        proc.started.connect(lambda: self._on_started(proc))
+        proc.finished.connect(lambda code, _=None: self._on_exit(proc, code))
+        proc.errorOccurred.connect(lambda err: self._on_error(proc, err))
+        self._proc = proc
+        proc.start()
+
+    def run(self, args: list[str], cwd: str | None = None) -> int:
+        if not self._restart_pending:
+            self.start()
+        job_id = next(self._ids)
+        msg = self._jobs[job_id] = {"op": "run", "id": job_id, "args": args, "cwd": cwd}
+        self._write(msg)
+        return job_id
+
+    def cancel(self, job_id: int) -> bool:
+        if job_id not in self._jobs:
+            return False
+        if self._proc is None:
+            # worker down (restart pending): no one holds the job but _jobs,
+            # which would resend it on restart
+            self._end(job_id, ProcessRunner.CANCELLED)
+            return True
+        self._cancelling.add(job_id)
+        self._write({"op": "cancel", "id": job_id})
+        return True
+
+    @Slot()
+    def shutdown(self) -> None:
+        self._stopping = True
+        proc = self._proc
+        if proc is None:
+            return
+        proc.closeWriteChannel()  # worker stops its jobs and exits
+        if not proc.waitForFinished(3000):
+            proc.kill()
+            proc.waitForFinished(1000)
+
+    def _on_started(self, proc: QProcess) -> None:
+        if self._limits and proc is self._proc:
+            # set before "ready": jobs are forked (or started) after preload
+            for error in Limiter(proc.processId(), self._limits).apply():
+                self.warning.emit(f"[WARN] limits: {error}")
+
+    def _write(self, msg: dict) -> None:
+        # written before "ready" is fine: the worker reads stdin once preloaded
+        if self._proc is not None:
+            self._proc.write((json.dumps(msg) + "\n").encode())
+
+    def _on_ready_read(self) -> None:
+        for line in self._stream.feed(bytes(self._proc.readAllStandardOutput())):
+            try:
+                frame = json.loads(line)
+            except ValueError:
+                continue
+            self._on_frame(frame)
+
+    def _on_frame(self, frame: dict) -> None:
+        ev, job_id = frame.get("ev"), frame.get("id")
+        if ev == "ready":
+            self._backoff = RESTART_MIN_MS
+        elif ev == "start" and job_id in self._jobs:
+            self._started.add(job_id)
+        elif ev == "out" and job_id in self._jobs:
+            self.jobOutput.emit(job_id, "\n".join(frame.get("lines") or []))
+        elif ev == "exit" and job_id in self._jobs:
+            self._end(job_id, int(frame.get("code", 0)))
+        elif ev == "fatal":
+            self._failed = True
+            self.unavailable.emit(str(frame.get("error", "")))
+
+    def _end(self, job_id: int, code: int) -> None:
+        self._jobs.pop(job_id, None)
+        self._started.discard(job_id)
+        if job_id in self._cancelling:
+            self._cancelling.discard(job_id)
+            code = ProcessRunner.CANCELLED
+        self.jobFinished.emit(job_id, code)
+
+    def _on_error(self, proc: QProcess, err) -> None:
+        if err == QProcess.FailedToStart and proc is self._proc:
+            self._failed = True
+            self._proc = None
+            self.unavailable.emit(proc.errorString())
+            for job_id in list(self._jobs):
+                self._end(job_id, ProcessRunner.FAILED_TO_START)
+
+    def _on_exit(self, proc: QProcess, code: int) -> None:
+        if proc is not self._proc:
+            return
+        self._on_ready_read()  # frames written just before exiting
+        self._proc = None
+        proc.deleteLater()
+        # jobs the worker had started are lost; the rest are resent on restart
+        for job_id in [j for j in self._jobs if j in self._started or j in self._cancelling]:
+            self._end(job_id, self.CRASHED)
+        if self._failed:
+            for job_id in list(self._jobs):
+                self._end(job_id, ProcessRunner.FAILED_TO_START)
+            return
+        if self._stopping:
+            return
+        if code == CANCEL_EXIT:
+            delay = 0  # ended on purpose to cancel an in-process job
+        else:
+            delay, self._backoff = self._backoff, min(RESTART_MAX_MS, self._backoff * 2)
+        self._restart_pending = True
+        QTimer.singleShot(delay, self._restart)
+
+    def _restart(self) -> None:
+        self._restart_pending = False
+        self.start()
+        for msg in self._jobs.values():
+            self._write(msg)
+
+
+def default_parallel() -> int:
+    """Renders to run at once: usable cores / ffmpeg threads per render.
+
+    ``KENBURNS_JOBS`` sets the number directly; ``KENBURNS_THREADS_PER_JOB``
+    (default 4) is how many cores one render's ffmpeg is assumed to keep busy.
+    """
+    try:
+        return max(1, int(os.environ["KENBURNS_JOBS"]))
+    except (KeyError, ValueError):
+        pass
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    try:
+        threads = max(1, int(os.environ.get("KENBURNS_THREADS_PER_JOB", 4)))
+    except ValueError:
+        threads = 4
+    return max(1, cores // threads)
+
+
+def _quote(folder: str) -> str:
+    return '"' + folder.replace('"', '\\"') + '"'
+
+
+class KenBurnsQueueModel(KeyedListModel):
+    """Batch queue rows; times are epoch milliseconds (0 = not yet)."""
+
+    ROLES = {
+        "jobId": "id", "folder": "folder", "args": "args", "jobState": "state",
+        "queuedAt": "queued_at", "startedAt": "started_at", "finishedAt": "finished_at",
+        "code": "code", "lastLine": "last_line",
+    }
+
 
 class KenBurnsBridge(QObject):
-    """Minimal bridge to run ken_burns_reel in a separate process."""
+    """Batch queue of ken_burns_reel renders for the Ken Burns dialog.
+
+    Jobs (folder + args) wait in ``queue_model`` and run in row order, at
+    most ``max_parallel`` at once (see ``default_parallel``). Queued jobs can
+    be moved, held and cancelled; ``setPaused`` stops starting new ones
+    while running renders finish.
+
+    Jobs go to a warm ``WarmWorker`` (set ``KENBURNS_WARM=0`` to disable);
+    when that is unavailable, or it can only run one job at a time (no
+    fork), they use a cold ``python -m ken_burns_reel`` through the shared
+    ``ProcessRunner``. Both get the same limits: ``limits`` merged over the
+    runner's defaults, which keep renders off the cores reserved for the UI.
+    """
 
     output = Signal(str)
     finished = Signal(int)
+    jobOutput = Signal(str, str)
+    pausedChanged = Signal()
+    maxParallelChanged = Signal()
+
+    QUEUED, HELD, RUNNING, DONE, FAILED, CANCELLED = (
+        "queued", "held", "running", "done", "failed", "cancelled")
 
-    def __init__(self, parent: QObject | None = None) -> None:
+    def __init__(self, parent: QObject | None = None, runner: ProcessRunner | None = None,
+                 limits: dict | None = None) -> None:
         super().__init__(parent)
-        self._runner = ProcessRunner()
-        self._runner.output.connect(self.output)
-        self._runner.finished.connect(self.finished)
+        self.queue_model = KenBurnsQueueModel(self)
+        self._keys = itertools.count(1)
+        self._max_parallel = default_parallel()
+        self._paused = False
+        self._runner = runner or ProcessRunner(self)
+        self._limits = limits
+        self._jobs: dict[int, str] = {}  # runner job id -> queue key
+        self._runner.jobOutput.connect(self._on_job_output)
+        self._runner.jobFinished.connect(self._on_job_finished)
+        self._worker: WarmWorker | None = None
+        self._warm_jobs: dict[int, str] = {}  # worker job id -> queue key
+        if os.environ.get("KENBURNS_WARM", "1") != "0":
+            self._worker = WarmWorker(self, limits=merge(self._runner.default_limits, limits))
+            self._worker.warning.connect(self.output)
+            self._worker.jobOutput.connect(self._on_warm_output)
+            self._worker.jobFinished.connect(self._on_warm_finished)
+            self._worker.unavailable.connect(
+                lambda why: self.output.emit(f"[WARN] warm worker unavailable ({why}); using python -m"))
+            self._worker.start()  # preload while the user is still picking args
+
+    # ---- queue API ----
+    @Slot(str, str, result=str)
+    def enqueue(self, folder: str, args: str) -> str:
+        key = f"kb{next(self._keys)}"
+        self.queue_model.insert(self.queue_model.rowCount(), {
+            "id": key, "folder": folder, "args": args, "state": self.QUEUED,
+            "queued_at": time.time() * 1000, "started_at": 0, "finished_at": 0,
+            "code": 0, "last_line": "",
+        })
+        self._dispatch()
+        return key
+
+    @Slot('QVariant', str, result=int)
+    def enqueueMany(self, folders, args: str) -> int:
+        n = 0
+        for folder in folders or []:
+            if str(folder).strip():
+                self.enqueue(str(folder).strip(), args)
+                n += 1
+        return n
 
     @Slot(str)
     def run(self, args: str) -> None:
-        cmd = f'"{sys.executable}" -m ken_burns_reel {args}'.strip()
-        self._runner.run(cmd)
+        """Queue one render; ``args`` already holds the (quoted) folder."""
+        self.enqueue("", args)
+
+    @Slot(str, result=bool)
+    def cancel(self, key: str) -> bool:
+        job = self.queue_model.get(key)
+        if job is None:
+            return False
+        if job["state"] in (self.QUEUED, self.HELD):
+            self._set(key, state=self.CANCELLED, finished_at=time.time() * 1000, code=ProcessRunner.CANCELLED)
+            return True
+        for job_id, k in self._warm_jobs.items():
+            if k == key:
+                return self._worker.cancel(job_id)
+        for job_id, k in self._jobs.items():
+            if k == key:
+                return self._runner.cancel(job_id)
+        return False
+
+    @Slot(str, result=bool)
+    def hold(self, key: str) -> bool:
+        job = self.queue_model.get(key)
+        if job is None or job["state"] != self.QUEUED:
+            return False
+        self._set(key, state=self.HELD)
+        return True
+
+    @Slot(str, result=bool)
+    def release(self, key: str) -> bool:
+        job = self.queue_model.get(key)
+        if job is None or job["state"] != self.HELD:
+            return False
+        self._set(key, state=self.QUEUED)
+        self._dispatch()
+        return True
+
+    @Slot(int, int, result=bool)
+    def moveJob(self, from_index: int, to_index: int) -> bool:
+        return self.queue_model.move(from_index, to_index)
+
+    @Slot()
+    def clearFinished(self) -> None:
+        for job in self.queue_model.items():
+            if job["state"] in (self.DONE, self.FAILED, self.CANCELLED):
+                self.queue_model.remove(job["id"])
+
+    @Slot(result=bool)
+    def getPaused(self) -> bool:
+        return self._paused
+
+    @Slot(bool)
+    def setPaused(self, paused: bool) -> None:
+        if paused == self._paused:
+            return
+        self._paused = paused
+        self.pausedChanged.emit()
+        self._dispatch()
+
+    @Slot(result=int)
+    def getMaxParallel(self) -> int:
+        return self._max_parallel
+
+    @Slot(int)
+    def setMaxParallel(self, n: int) -> None:
+        n = max(1, n)
+        if n == self._max_parallel:
+            return
+        self._max_parallel = n
+        self.maxParallelChanged.emit()
+        self._dispatch()
 
     @Slot()
     def stop(self) -> None:
-        proc = self._runner.proc
-        if proc and proc.state() != QProcess.NotRunning:
-            proc.terminate()
-            if not proc.waitForFinished(1500):
-                proc.kill()
-                proc.waitForFinished(1000)
+        for job in self.queue_model.items():
+            if job["state"] in (self.QUEUED, self.HELD, self.RUNNING):
+                self.cancel(job["id"])
+
+    # ---- scheduling ----
+    def _set(self, key: str, **changes) -> None:
+        job = self.queue_model.get(key)
+        if job is not None:
+            self.queue_model.update({**job, **changes})
+
+    def _dispatch(self) -> None:
+        if self._paused:
+            return
+        running = len(self._jobs) + len(self._warm_jobs)
+        for job in self.queue_model.items():
+            if running >= self._max_parallel:
+                return
+            if job["state"] == self.QUEUED:
+                self._start(job)
+                running += 1
+
+    def _start(self, job: dict) -> None:
+        args = job["args"]
+        if job["folder"]:
+            args = f"{_quote(job['folder'])} {args}".strip()
+        self._set(job["id"], state=self.RUNNING, started_at=time.time() * 1000)
+        # without fork the warm worker runs one job at a time
+        warm = self._worker is not None and self._worker.available and (
+            hasattr(os, "fork") or not self._warm_jobs)
+        if warm:
+            self._warm_jobs[self._worker.run(split_args(args))] = job["id"]
+        else:
+            self._run_cold(job["id"], args)
+
+    def _run_cold(self, key: str, args: str) -> None:
+        argv = [sys.executable, "-m", "ken_burns_reel", *split_args(args)]
+        # output goes to the Ken Burns tab, not the panel log
+        self._jobs[self._runner.run(argv, limits=self._limits, quiet=True)] = key
+
+    def _job_output(self, key: str, text: str) -> None:
+        self._set(key, last_line=text.rsplit("\n", 1)[-1])
+        self.jobOutput.emit(key, text)
+        self.output.emit("\n".join(f"[{key}] {line}" for line in text.split("\n")))
+
+    def _job_done(self, key: str, code: int) -> None:
+        if code == 0:
+            state = self.DONE
+        elif code == ProcessRunner.CANCELLED:
+            state = self.CANCELLED
+        else:
+            state = self.FAILED
+        self._set(key, state=state, code=code, finished_at=time.time() * 1000)
+        self.finished.emit(code)
+        self._dispatch()
+
+    def _on_job_output(self, job_id: int, text: str) -> None:
+        key = self._jobs.get(job_id)
+        if key is not None:
+            self._job_output(key, text)
+
+    def _on_job_finished(self, job_id: int, code: int) -> None:
+        key = self._jobs.pop(job_id, None)
+        if key is not None:
+            self._job_done(key, code)
+
+    def _on_warm_output(self, job_id: int, text: str) -> None:
+        key = self._warm_jobs.get(job_id)
+        if key is not None:
+            self._job_output(key, text)
+
+    def _on_warm_finished(self, job_id: int, code: int) -> None:
+        key = self._warm_jobs.pop(job_id, None)
+        if key is None:
+            return
+        if code == ProcessRunner.FAILED_TO_START and not self._worker.available:
+            job = self.queue_model.get(key)
+            self._set(key, state=self.QUEUED)
+            self._start(job)  # falls through to the cold path now
+            return
+        if code == WarmWorker.CRASHED:
+            self.output.emit("[ERR] warm worker crashed; restarting it")
+        self._job_done(key, code)
 
     @Slot(str, str, result=bool)
     def savePreset(self, filename: str, args: str) -> bool:
@@ -0,0 +1,339 @@
+"""Warm ken_burns_reel worker.
+
+Started once by ``KenBurnsBridge`` (``python worker.py``); imports
+ken_burns_reel and imageio_ffmpeg up front, then takes jobs as JSON lines on
+stdin and answers with JSON frames on stdout:
+
+    -> {"op": "run", "id": 1, "args": ["folder", "--profile", "preview"], "cwd": null}
+    -> {"op": "cancel", "id": 1}
+    <- {"ev": "ready", "pid": 123}
+    <- {"ev": "start", "id": 1}
+    <- {"ev": "out", "id": 1, "stream": "stdout", "lines": ["..."]}
+    <- {"ev": "exit", "id": 1, "code": 0}
+    <- {"ev": "fatal", "error": "..."}       (preload failed, worker exits)
+
+On POSIX every job runs in a forked child of the warm interpreter, so jobs
+start without re-importing anything, run side by side, and ``cancel`` only
+kills the child (and its ffmpeg, via the process group). Without fork
+(Windows) jobs run in-process one at a time and ``cancel`` ends the worker
+with CANCEL_EXIT; the client reports the job cancelled and starts a new one,
+so the next job waits for a fresh preload. The worker then runs in a
+kill-on-close job object, which takes the job's ffmpeg down with it.
+
+Closing stdin stops the worker and its jobs.
+"""
+import codecs
+import json
+import os
+import re
+import runpy
+import signal
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+
+# core.limits, when started as ``python worker.py`` from this folder; last,
+# so the panel's packages never shadow the job's imports
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+MODULE = "ken_burns_reel"
+CANCELLED = -1
+CANCEL_EXIT = 75
+KILL_GRACE = 1.5
+REAP_POLL = 0.1  # seconds between checks on a job that closed its pipes but has not exited
+CHUNK = 64 * 1024
+
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+# frames go to a private copy of the original stdout; fd 1/2 are pointed
+# elsewhere so stray prints can't corrupt the channel
+_chan = None
+_chan_lock = threading.Lock()
+
+
+def _send(frame: dict) -> None:
+    data = (json.dumps(frame) + "\n").encode()
+    with _chan_lock:
+        _chan.write(data)
+        _chan.flush()
+
+
+def _setup_channel() -> None:
+    global _chan
+    sys.stdout.flush()
+    _chan = os.fdopen(os.dup(1), "wb", buffering=0)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+
+
+def _preload() -> None:
+    try:
+        import imageio_ffmpeg
+        os.environ.setdefault("IMAGEIO_FFMPEG_EXE", imageio_ffmpeg.get_ffmpeg_exe())
+    except Exception:
+        pass
+    import importlib
+    importlib.import_module(MODULE)
+
+
+def _run_module(args: list, cwd) -> int:
+    if cwd:
+        os.chdir(cwd)
+    sys.argv = [MODULE, *args]
+    try:
+        runpy.run_module(MODULE, run_name="__main__", alter_sys=True)
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+class _Lines:
+    """Incremental UTF-8 decoding and line splitting (see core.process.LineStream)."""
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+
+    def feed(self, data: bytes, final: bool = False) -> list:
+        text = self._partial + self._decoder.decode(data, final)
+        carry = ""
+        if text.endswith("\r") and not final:
+            text, carry = text[:-1], "\r"
+        lines = _LINE_BREAK.split(text)
+        self._partial = lines.pop() + carry
+        if final and self._partial:
+            lines.append(self._partial)
+            self._partial = ""
+        return lines
+
+
+def _emit_lines(job_id: int, stream: str, lines: list) -> None:
+    if lines:
+        _send({"ev": "out", "id": job_id, "stream": stream, "lines": lines})
+
+
+# ---- POSIX: fork per job ----
+class _Child:
+    def __init__(self, job_id: int, pid: int, fds: dict):
+        self.job_id = job_id
+        self.pid = pid
+        self.fds = fds  # fd -> (stream name, _Lines)
+        self.cancelled = False
+        self.kill_at = None
+
+
+def _fork_job(job_id: int, args: list, cwd) -> _Child:
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            os.setpgid(0, 0)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            devnull = os.open(os.devnull, os.O_RDONLY)
+            os.dup2(devnull, 0)
+            os.dup2(out_w, 1)
+            os.dup2(err_w, 2)
+            for fd in (devnull, out_r, out_w, err_r, err_w, _chan.fileno()):
+                os.close(fd)
+            code = _run_module(args, cwd)
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(code & 0xFF if code >= 0 else 1)
+    os.close(out_w)
+    os.close(err_w)
+    return _Child(job_id, pid, {out_r: ("stdout", _Lines()), err_r: ("stderr", _Lines())})
+
+
+def _signal_group(pid: int, sig) -> None:
+    try:
+        os.killpg(pid, sig)
+    except OSError:
+        try:
+            os.kill(pid, sig)
+        except OSError:
+            pass
+
+
+def _serve_fork() -> None:
+    import selectors
+
+    sel = selectors.DefaultSelector()
+    stdin_fd = sys.stdin.fileno()
+    sel.register(stdin_fd, selectors.EVENT_READ, None)
+    children: dict[int, _Child] = {}
+    buf = b""
+    closing = False
+
+    def _handle(msg: dict) -> None:
+        op, job_id = msg.get("op"), msg.get("id")
+        if op == "run":
+            try:
+                child = _fork_job(job_id, [str(a) for a in msg.get("args") or []], msg.get("cwd"))
+            except OSError as e:
+                _emit_lines(job_id, "stderr", [f"[ERR] fork failed: {e}"])
+                _send({"ev": "exit", "id": job_id, "code": 1})
+                return
+            children[job_id] = child
+            for fd in child.fds:
+                sel.register(fd, selectors.EVENT_READ, child)
+            _send({"ev": "start", "id": job_id, "pid": child.pid})
+        elif op == "cancel":
+            child = children.get(job_id)
+            if child is not None and not child.cancelled:
+                child.cancelled = True
+                child.kill_at = time.monotonic() + KILL_GRACE
+                _signal_group(child.pid, signal.SIGTERM)
+
+    def _reap(child: _Child) -> None:
+        # the pipes can close before the process exits; never wait for it here
+        pid, status = os.waitpid(child.pid, os.WNOHANG)
+        if pid == 0:
+            return  # checked again on the next REAP_POLL timeout
+        code = CANCELLED if child.cancelled else os.waitstatus_to_exitcode(status)
+        children.pop(child.job_id, None)
+        _send({"ev": "exit", "id": child.job_id, "code": code})
+
+    while children or not closing:
+        deadlines = [c.kill_at for c in children.values() if c.kill_at is not None]
+        if any(not c.fds for c in children.values()):
+            deadlines.append(time.monotonic() + REAP_POLL)
+        timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+        for key, _ in sel.select(timeout):
+            fd, child = key.fd, key.data
+            data = os.read(fd, CHUNK)
+            if child is None:  # control channel
+                if not data:
+                    sel.unregister(fd)
+                    closing = True
+                    for c in children.values():
+                        if not c.cancelled:
+                            c.cancelled = True
+                            c.kill_at = time.monotonic() + KILL_GRACE
+                            _signal_group(c.pid, signal.SIGTERM)
+                    continue
+                buf += data
+                *lines, buf = buf.split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        _handle(json.loads(line))
+                continue
+            stream, splitter = child.fds[fd]
+            _emit_lines(child.job_id, stream, splitter.feed(data, final=not data))
+            if data:
+                continue
+            sel.unregister(fd)
+            os.close(fd)
+            del child.fds[fd]
+        # both pipes closed: the job is gone or about to be
+        for c in [c for c in children.values() if not c.fds]:
+            _reap(c)
+        now = time.monotonic()
+        for c in children.values():
+            if c.kill_at is not None and c.kill_at <= now:
+                c.kill_at = None
+                _signal_group(c.pid, signal.SIGKILL)
+
+
+# ---- no fork: one job at a time in this interpreter ----
+def _pump(fd: int, job: list, stream: str) -> None:
+    splitter = _Lines()
+    while True:
+        data = os.read(fd, CHUNK)
+        _emit_lines(job[0], stream, splitter.feed(data, final=not data))
+        if not data:
+            return
+
+
+def _serve_inline() -> None:
+    import queue
+    from core.limits import contain_children
+
+    # cancelling ends this process; ffmpeg and anything else a job started
+    # must end with it rather than keep rendering as orphans
+    for error in contain_children():
+        print(f"[WARN] worker job object: {error}", file=sys.stderr, flush=True)
+    jobs: "queue.Queue" = queue.Queue()
+    current = [None]  # id of the running job, shared with the pump threads
+
+    def _control():
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            msg = json.loads(line)
+            if msg.get("op") == "run":
+                jobs.put(msg)
+            elif msg.get("op") == "cancel" and msg.get("id") == current[0]:
+                _send({"ev": "exit", "id": current[0], "code": CANCELLED})
+                os._exit(CANCEL_EXIT)
+        jobs.put(None)
+
+    threading.Thread(target=_control, daemon=True).start()
+    saved = os.dup(1), os.dup(2)
+    while True:
+        msg = jobs.get()
+        if msg is None:
+            return
+        job_id = current[0] = msg.get("id")
+        _send({"ev": "start", "id": job_id, "pid": os.getpid()})
+        pipes = [os.pipe(), os.pipe()]
+        os.dup2(pipes[0][1], 1)
+        os.dup2(pipes[1][1], 2)
+        pumps = [threading.Thread(target=_pump, args=(r, current, name), daemon=True)
+                 for (r, _), name in zip(pipes, ("stdout", "stderr"))]
+        for t in pumps:
+            t.start()
+        cwd = os.getcwd()
+        try:
+            code = _run_module([str(a) for a in msg.get("args") or []], msg.get("cwd"))
+        finally:
+            os.chdir(cwd)
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            for _, w in pipes:
+                os.close(w)
+            for t in pumps:
+                t.join()
+            for r, _ in pipes:
+                os.close(r)
+        current[0] = None
+        _send({"ev": "exit", "id": job_id, "code": code})
+
+
+def main() -> int:
+    _setup_channel()
+    try:
+        _preload()
+    except BaseException as e:
+        _send({"ev": "fatal", "error": f"{type(e).__name__}: {e}"})
+        return 1
+    _send({"ev": "ready", "pid": os.getpid()})
+    if hasattr(os, "fork"):
+        _serve_fork()
+    else:
+        _serve_inline()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
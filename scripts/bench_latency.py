@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+"""Headless latency benchmarks for the panel's hot paths.
+
+Runs under QT_QPA_PLATFORM=offscreen and measures:
+
+- action latency: Bridge.runAction -> process spawned -> first output
+  -> finished, for the echo actions in actions_larp/stream/studio.yaml
+- Bridge.reloadActions and Bridge.setMode round trips
+- core.config.load_actions on synthetic catalogs (cold parse, memo, pickle)
+  and Bridge.reloadActions on the same catalogs
+- core.bincheck status probes, cold and with the probe cache
+
+Results are printed as a table; --json writes them machine-readable.
+
+Usage: python scripts/bench_latency.py [-n 30] [--sizes 100,1000,5000] [--json out.json]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PySide6.QtCore import QEventLoop, QSettings, QTimer
+from PySide6.QtWidgets import QApplication
+
+from core import bincheck, config
+from core.process import ProcessRunner
+
+ECHO_MODES = ("larp", "stream", "studio")
+
+
+def summarize(samples_ms: list[float]) -> dict:
+    if not samples_ms:
+        return {"n": 0}
+    s = sorted(samples_ms)
+
+    def pct(p):
+        return s[min(len(s) - 1, int(round(p / 100 * (len(s) - 1))))]
+
+    return {"n": len(s), "mean": statistics.fmean(s), "p50": pct(50),
+            "p90": pct(90), "p99": pct(99), "max": s[-1]}
+
+
+def timed(fn, iterations: int) -> list[float]:
+    out = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000)
+    return out
+
+
+def run_loop(loop: QEventLoop, timeout_s: float = 10.0) -> None:
+    """Spin ``loop`` until something quits it or ``timeout_s`` passes."""
+    QTimer.singleShot(int(timeout_s * 1000), loop.quit)
+    loop.exec()
+
+
+def load_bridge():
+    """Import app.Bridge -> (Bridge, None) or (None, reason)."""
+    try:
+        import app
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+    return app.Bridge, None
+
+
+def make_bridge(Bridge, config_dir: Path):
+    """Bridge over copies of the mode files in ``config_dir``, so pins, run
+    history and caches are written there and not into the real config/."""
+    from PySide6.QtQml import QQmlApplicationEngine
+
+    for path in (ROOT / "config").glob("*.yaml"):
+        shutil.copy2(path, config_dir / path.name)
+    runner = ProcessRunner()
+    engine = QQmlApplicationEngine()
+    return Bridge(runner, engine, config_dir=config_dir), runner, engine
+
+
+def bench_actions(bridge, runner, iterations: int) -> dict:
+    marks: dict[int, dict] = {}
+    last = {}
+    loop = QEventLoop()
+
+    def mark(job_id, key):
+        marks.setdefault(job_id, {}).setdefault(key, time.perf_counter())
+
+    def finished(job_id, _code):
+        mark(job_id, "finished")
+        if job_id == last.get("id"):
+            loop.quit()
+
+    runner.jobQueued.connect(lambda j: last.__setitem__("id", j))
+    runner.jobStarted.connect(lambda j: mark(j, "spawn"))
+    runner.jobOutput.connect(lambda j, _t: mark(j, "output"))
+    runner.jobFinished.connect(finished)
+
+    results = {}
+    for mode in ECHO_MODES:
+        bridge.setMode(mode)
+        for action in bridge.getActions():
+            if not action["command"].lower().startswith("echo"):
+                continue
+            spawn, first, done = [], [], []
+            for _ in range(iterations):
+                t0 = time.perf_counter()
+                bridge.runAction(action["id"])
+                job = marks.setdefault(last["id"], {})
+                if "finished" not in job:
+                    run_loop(loop)
+                if "finished" not in job:
+                    break  # timed out
+                spawn.append((job.get("spawn", t0) - t0) * 1000)
+                if "output" in job:
+                    first.append((job["output"] - t0) * 1000)
+                done.append((job["finished"] - t0) * 1000)
+            key = f"{mode}/{action['id']}"
+            results[f"action.spawn[{key}]"] = summarize(spawn)
+            results[f"action.first_output[{key}]"] = summarize(first)
+            results[f"action.finished[{key}]"] = summarize(done)
+    return results
+
+
+def bench_bridge_reload(bridge, iterations: int) -> dict:
+    results = {"bridge.reloadActions": summarize(timed(bridge.reloadActions, iterations))}
+    modes = list(ECHO_MODES)
+    idx = [0]
+
+    def switch():
+        idx[0] += 1
+        bridge.setMode(modes[idx[0] % len(modes)])
+
+    results["bridge.setMode"] = summarize(timed(switch, iterations))
+    return results
+
+
+def write_catalog(path: Path, size: int) -> None:
+    lines = ["actions:"]
+    for i in range(size):
+        lines += [f"  bench_{i}:", f"    label: \"Bench {i}\"", f"    command: echo bench {i}"]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def bench_catalogs(sizes: list[int], iterations: int, bridge=None) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache_dir = tmp / "cache"
+        for size in sizes:
+            path = tmp / f"catalog_{size}.yaml"
+            write_catalog(path, size)
+
+            def cold():
+                config.clear_memo()
+                config.load_actions(path)
+
+            def pickled():
+                config.clear_memo()
+                config.load_actions(path, cache_dir=cache_dir)
+
+            results[f"config.load.cold[{size}]"] = summarize(timed(cold, max(3, iterations // 5)))
+            config.load_actions(path, cache_dir=cache_dir)
+            results[f"config.load.pickle[{size}]"] = summarize(timed(pickled, iterations))
+            results[f"config.load.memo[{size}]"] = summarize(
+                timed(lambda: config.load_actions(path, cache_dir=cache_dir), iterations))
+
+            if bridge is not None:
+                bridge._modes["bench"] = str(path)
+                bridge._current_mode = "bench"
+                results[f"bridge.reloadActions[{size}]"] = summarize(
+                    timed(bridge.reloadActions, max(3, iterations // 5)))
+        if bridge is not None:
+            bridge._modes.pop("bench", None)
+            bridge.setMode(ECHO_MODES[0])
+    return results
+
+
+def bench_probes(iterations: int) -> dict:
+    results = {}
+
+    def cold():
+        engine = bincheck.ProbeEngine()
+        bincheck.probe_status_async([], engine=engine).result()
+        engine.shutdown()
+
+    results["bincheck.probe_status.cold"] = summarize(timed(cold, max(3, iterations // 5)))
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = bincheck.ProbeEngine(cache=bincheck.ProbeCache(Path(tmp) / "probe_cache.json"))
+        bincheck.probe_status_async([], engine=engine).result()
+        results["bincheck.probe_status.cached"] = summarize(
+            timed(lambda: bincheck.probe_status_async([], engine=engine).result(), iterations))
+        engine.shutdown()
+    return results
+
+
+def print_table(results: dict) -> None:
+    name_w = max(len(k) for k in results) if results else 10
+    print(f"{'benchmark':<{name_w}}  {'n':>4} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}  (ms)")
+    for name, r in results.items():
+        if not r.get("n"):
+            print(f"{name:<{name_w}}  {0:>4} {'-':>9} {'-':>9} {'-':>9} {'-':>9}")
+            continue
+        print(f"{name:<{name_w}}  {r['n']:>4} {r['p50']:>9.3f} {r['p90']:>9.3f} {r['p99']:>9.3f} {r['max']:>9.3f}")
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("-n", "--iterations", type=int, default=30)
+    p.add_argument("--sizes", default="100,1000,5000", help="synthetic catalog sizes")
+    p.add_argument("--json", metavar="PATH", help="write results as JSON")
+    args = p.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    settings_dir = tempfile.TemporaryDirectory()
+    config_dir = tempfile.TemporaryDirectory()
+    # keep Bridge from touching the user's real QSettings (mode, autoReload)
+    QSettings.setPath(QSettings.NativeFormat, QSettings.UserScope, settings_dir.name)
+    QSettings.setPath(QSettings.IniFormat, QSettings.UserScope, settings_dir.name)
+    app = QApplication(sys.argv)
+
+    results: dict = {}
+    skipped: dict = {}
+    Bridge, reason = load_bridge()
+    bridge = None
+    if Bridge is None:
+        skipped["bridge"] = reason
+    else:
+        bridge, runner, _engine = make_bridge(Bridge, Path(config_dir.name))
+        bridge.reloadActions()
+        results.update(bench_actions(bridge, runner, args.iterations))
+        results.update(bench_bridge_reload(bridge, args.iterations))
+    results.update(bench_catalogs(sizes, args.iterations, bridge))
+    results.update(bench_probes(args.iterations))
+
+    print_table(results)
+    for what, why in skipped.items():
+        print(f"[SKIP] {what}: {why}")
+    if args.json:
+        doc = {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "results": results,
+            "skipped": skipped,
+        }
+        Path(args.json).write_text(json.dumps(doc, indent=2), encoding="utf-8")
+    if bridge is not None:
+        bridge.shutdown()  # join its pools and threads while Qt is still up
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
 #!/usr/bin/env python
 import argparse
-import json
-import os
 import sys
-import urllib.request
-import urllib.parse
+from pathlib import Path
+
+# allow `python scripts/n8n_trigger.py` from anywhere
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.spool import WebhookSpool
+from core.webhook import DEFAULT_TIMEOUT, parse_kv, send
+
+# not the panel's config/webhook_spool.jsonl: a journal has one owner, or
+# both processes would replay and deliver the same events
+DEFAULT_SPOOL = Path(__file__).resolve().parent.parent / "config" / "webhook_spool_cli.jsonl"
 
 try:
     import pyperclip
@@ -12,17 +19,6 @@ except Exception:  # optional
     pyperclip = None
 
 
-def parse_kv(items):
-    out = {}
-    for it in items:
-        if "=" in it:
-            k, v = it.split("=", 1)
-        else:
-            k, v = it, ""
-        out[k] = v
-    return out
-
-
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("--url", required=True)
@@ -31,6 +27,12 @@ def main():
     p.add_argument("--data", action="append", default=[])
     p.add_argument("--file", action="append", default=[])
     p.add_argument("--clipboard", action="store_true")
+    p.add_argument("--stdin", metavar="FIELD", help="send text read from stdin as data field FIELD")
+    p.add_argument("--chunked", action="store_true", help="force chunked transfer encoding for uploads")
+    p.add_argument("--gzip", action="store_true", help="gzip-compress JSON payloads")
+    p.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    p.add_argument("--spool", nargs="?", const=str(DEFAULT_SPOOL), metavar="PATH",
+                   help="queue the event in a durable spool and try to deliver it within --timeout")
     args = p.parse_args()
 
     headers = parse_kv(args.header)
@@ -42,7 +44,9 @@ def main():
         except Exception:
             pass
 
-    method = args.method.upper()
+    if args.stdin:
+        data[args.stdin] = sys.stdin.read()
+
     files = {}
     for f in args.file:
         if "=" in f:
@@ -51,36 +55,22 @@ def main():
             name, path = "file", f
         files[name] = path
 
-    if files:
-        boundary = "----n8n-trigger"
-        body = b""
-        for k, v in data.items():
-            body += (f"--{boundary}\r\n" +
-                     f"Content-Disposition: form-data; name=\"{k}\"\r\n\r\n{v}\r\n").encode()
-        for name, path in files.items():
-            with open(path, "rb") as fh:
-                content = fh.read()
-            body += (f"--{boundary}\r\n" +
-                     f"Content-Disposition: form-data; name=\"{name}\"; filename=\"{os.path.basename(path)}\"\r\n" +
-                     "Content-Type: application/octet-stream\r\n\r\n").encode() + content + b"\r\n"
-        body += f"--{boundary}--\r\n".encode()
-        headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
-    else:
-        if method == "GET":
-            args.url += ("?" + urllib.parse.urlencode(data)) if data else ""
-            body = None
-        else:
-            body = json.dumps(data).encode()
-            headers["Content-Type"] = "application/json"
+    if args.spool:
+        if files:
+            p.error("--spool supports JSON data only, not --file")
+        spool = WebhookSpool(args.spool, timeout=args.timeout,
+                             on_error=lambda error: sys.stderr.write(f"[ERR] spool: {error}\n"))
+        spool.enqueue(args.url, data, headers)
+        sent = spool.flush(args.timeout)
+        sys.stdout.write("sent\n" if sent else f"queued ({spool.pending_count()} pending in {args.spool})\n")
+        return
 
-    req = urllib.request.Request(args.url, data=body, method=method, headers=headers)
-    with urllib.request.urlopen(req) as resp:
-        sys.stdout.write(str(resp.status) + "\n")
-        try:
-            txt = resp.read().decode()
-            sys.stdout.write(txt[:200] + "\n")
-        except Exception:
-            pass
+    status, txt = send(args.url, args.method, data, files, headers,
+                       gzip_json=args.gzip, chunked=args.chunked, timeout=args.timeout)
+    sys.stdout.write(str(status) + "\n")
+    sys.stdout.write(txt[:200] + "\n")
+    if status >= 400:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""Drive a running overlay through its control socket."""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# allow `python scripts/overlay_ctl.py` from anywhere
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.control import ControlClient, ControlError, parse_address
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--address", help="socket path or host:port (default: OVERLAY_CONTROL or config/control.sock)")
+    p.add_argument("--token", help="TCP token (default: config/control.token)")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    run = sub.add_parser("run", help="run an action of the current mode")
+    run.add_argument("action")
+    run.add_argument("--force", action="store_true", help="ignore inputs/outputs skip")
+    sub.add_parser("status", help="mode, job counts and tool status")
+    sub.add_parser("actions", help="list actions of the current mode")
+    mode = sub.add_parser("mode", help="show or switch the mode")
+    mode.add_argument("name", nargs="?")
+    sub.add_parser("reload", help="reload the current mode's YAML")
+    sub.add_parser("tail", help="follow the log")
+    ping = sub.add_parser("ping", help="round-trip time of -n pipelined status requests")
+    ping.add_argument("-n", type=int, default=1)
+    args = p.parse_args()
+
+    try:
+        address = parse_address(args.address) if args.address else None
+        client = ControlClient(address, token=args.token, timeout=None if args.cmd == "tail" else 5.0)
+    except (OSError, ControlError) as e:
+        sys.exit(f"[ERR] cannot connect to the overlay: {e}")
+    with client:
+        try:
+            if args.cmd == "run":
+                ok = client.call("run", action=args.action, force=args.force)
+                print("started" if ok else "not started")
+            elif args.cmd == "mode":
+                print(client.call("mode", **({"mode": args.name} if args.name else {})))
+            elif args.cmd == "actions":
+                for a in client.call("actions"):
+                    print(f"{a['id']:<28} {a['type']:<9} {a['label']}")
+            elif args.cmd in ("status", "reload"):
+                print(json.dumps(client.call(args.cmd), indent=2, ensure_ascii=False))
+            elif args.cmd == "ping":
+                # pipelined: send all, then collect, so -n measures throughput too
+                t0 = time.perf_counter()
+                ids = [client.send("status") for _ in range(args.n)]
+                for _ in ids:
+                    client.recv()
+                dt = time.perf_counter() - t0
+                print(f"{args.n} requests in {dt * 1000:.1f} ms ({args.n / dt:.0f}/s)")
+            elif args.cmd == "tail":
+                client.call("subscribe")
+                for event in client.events():
+                    if event.get("dropped"):
+                        print(f"[... {event['dropped']} lines dropped]")
+                    for line in event.get("lines", []):
+                        print(line, flush=True)
+        except ControlError as e:
+            sys.exit(f"[ERR] {e}")
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
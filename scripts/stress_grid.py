@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""Stress test for the panel's action grid with large catalogs.
+
+Loads ui/Main.qml under QT_QPA_PLATFORM=offscreen with a synthetic catalog
+of each size, scrolls the grid two rows per frame from top to bottom and
+reports, per size:
+
+- frame time: setting the scroll position -> frame swapped (p50/p90/p99/max)
+- delegates: items the grid holds after loading and after scrolling
+- RSS after loading and after scrolling (psutil or /proc; else peak RSS)
+
+Each size runs in its own process so memory figures do not carry over.
+With a virtualized grid every column should stay flat as the size grows.
+
+Usage: python scripts/stress_grid.py [--sizes 50,500,5000] [--frames 300] [--json out.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_latency import summarize, write_catalog
+
+
+def rss_bytes() -> int:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        pass
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def run_one(size: int, frames: int) -> dict:
+    from PySide6.QtCore import QEventLoop, QObject, QSettings, QTimer, QUrl
+    from PySide6.QtQml import QQmlApplicationEngine
+    from PySide6.QtQuick import QQuickItem  # noqa: F401  (converter for contentItem)
+    from PySide6.QtWidgets import QApplication
+
+    settings_dir = tempfile.TemporaryDirectory()
+    # keep Bridge from touching the user's real QSettings (mode, autoReload)
+    QSettings.setPath(QSettings.NativeFormat, QSettings.UserScope, settings_dir.name)
+    QSettings.setPath(QSettings.IniFormat, QSettings.UserScope, settings_dir.name)
+    app = QApplication(sys.argv)
+
+    import app as panel
+    from core.process import ProcessRunner
+
+    tmp = tempfile.TemporaryDirectory()
+    catalog = Path(tmp.name) / f"catalog_{size}.yaml"
+    write_catalog(catalog, size)
+
+    engine = QQmlApplicationEngine()
+    # pins, palette usage and caches go to the temp dir, not the real config/
+    bridge = panel.Bridge(ProcessRunner(), engine, config_dir=Path(tmp.name))
+    bridge._modes["stress"] = str(catalog)
+    bridge._current_mode = "stress"
+    ctx = engine.rootContext()
+    for name in ("KenBurns", "KenBurnsSchema", "KenBurnsUi", "KenBurnsQueue"):
+        ctx.setContextProperty(name, None)
+    ctx.setContextProperty("HasKenBurns", False)
+    ctx.setContextProperty("LogModel", panel.LogModel())
+    ctx.setContextProperty("JobLog", panel.JobLogModel())
+    ctx.setContextProperty("Bridge", bridge)
+    ctx.setContextProperty("ActionsModel", bridge.actions_model)
+    ctx.setContextProperty("PinnedModel", bridge.pinned_model)
+    ctx.setContextProperty("PaletteModel", bridge.palette_model)
+    bridge.reloadActions()
+    bridge._pool("palette").submit(lambda: None).result()  # palette index built; not part of the load
+
+    rss_start = rss_bytes()
+    t0 = time.perf_counter()
+    engine.load(QUrl.fromLocalFile(str(ROOT / "ui" / "Main.qml")))
+    if not engine.rootObjects():
+        raise SystemExit("Failed to load QML")
+    win = engine.rootObjects()[0]
+    grid = win.findChild(QObject, "actionsGrid")
+
+    swapped = QEventLoop()
+    win.frameSwapped.connect(swapped.quit)
+
+    def next_frame() -> None:
+        QTimer.singleShot(1000, swapped.quit)
+        win.update()
+        swapped.exec()
+
+    win.show()
+    next_frame()
+    load_ms = (time.perf_counter() - t0) * 1000
+    # let the async loaders of the first screen finish
+    for _ in range(5):
+        next_frame()
+    loaded = {"rss": rss_bytes(), "delegates": len(grid.property("contentItem").childItems())}
+
+    step = grid.property("cellHeight") * 2
+    end = max(0.0, grid.property("contentHeight") - grid.property("height"))
+    times, y = [], 0.0
+    for _ in range(frames):
+        y = min(end, y + step)
+        t = time.perf_counter()
+        grid.setProperty("contentY", y)
+        next_frame()
+        times.append((time.perf_counter() - t) * 1000)
+        if y >= end:
+            break
+    scrolled = {"rss": rss_bytes(), "delegates": len(grid.property("contentItem").childItems())}
+    bridge.shutdown()
+    return {
+        "size": size,
+        "load_ms": load_ms,
+        "frame_ms": summarize(times),
+        "delegates_loaded": loaded["delegates"],
+        "delegates_scrolled": scrolled["delegates"],
+        "rss_base_mb": rss_start / 2**20,
+        "rss_loaded_mb": loaded["rss"] / 2**20,
+        "rss_scrolled_mb": scrolled["rss"] / 2**20,
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--sizes", default="50,500,5000", help="catalog sizes")
+    p.add_argument("--frames", type=int, default=300, help="scroll steps per size (at most to the end)")
+    p.add_argument("--json", metavar="PATH", help="write results as JSON")
+    p.add_argument("--one", type=int, help=argparse.SUPPRESS)
+    args = p.parse_args()
+
+    if args.one is not None:
+        print(json.dumps(run_one(args.one, args.frames)), flush=True)
+        os._exit(0)  # skip Qt teardown of the loaded scene
+
+    results = []
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        proc = subprocess.run([sys.executable, __file__, "--one", str(size), "--frames", str(args.frames)],
+                              capture_output=True, text=True)
+        lines = proc.stdout.strip().splitlines()
+        if proc.returncode or not lines:
+            print(f"[ERR] size {size}: exit {proc.returncode}\n{proc.stderr.strip()}")
+            continue
+        results.append(json.loads(lines[-1]))
+
+    print(f"{'actions':>7} {'load':>8} {'frames':>6} {'p50':>7} {'p90':>7} {'p99':>7} {'max':>7} "
+          f"{'deleg.':>6} {'->':>4} {'RSS':>8} {'->':>8}  (ms, MB)")
+    for r in results:
+        f = r["frame_ms"]
+        print(f"{r['size']:>7} {r['load_ms']:>8.1f} {f['n']:>6} {f.get('p50', 0):>7.2f} {f.get('p90', 0):>7.2f} "
+              f"{f.get('p99', 0):>7.2f} {f.get('max', 0):>7.2f} {r['delegates_loaded']:>6} {r['delegates_scrolled']:>4} "
+              f"{r['rss_loaded_mb']:>8.1f} {r['rss_scrolled_mb']:>8.1f}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+from core.palette import ModeIndex, PaletteIndex
+
+
+def _index(actions: list[dict]) -> PaletteIndex:
+    index = PaletteIndex()
+    index.set_mode(ModeIndex("default", actions))
+    return index
+
+
+def _jobs(n: int) -> list[dict]:
+    return [{"id": f"job_{i}", "label": f"Job {i}", "command": f"magick in{i}.png -resize 50% out{i}.png"}
+            for i in range(n)]
+
+
+def test_exact_hit_ranks_first_among_many_command_hits():
+    index = _index([*_jobs(3000), {"id": "resize", "label": "resize", "command": "magick a -resize 10% b"}])
+    results = index.search("resize", "default", limit=5)
+    assert results[0]["action"] == "resize"
+
+
+def test_label_hit_is_scored_among_many_command_hits():
+    index = _index([*_jobs(3000), {"id": "shrink", "label": "Resize photos", "command": "x"}])
+    assert "shrink" in [r["action"] for r in index.search("resize", "default", limit=5)]
+
+
+def test_exact_hit_for_short_query_among_many_prefix_hits():
+    actions = [{"id": f"a{i}", "label": f"Ab {i}", "command": "x"} for i in range(3000)]
+    index = _index([*actions, {"id": "ab", "label": "ab", "command": "x"}])
+    assert index.search("ab", "default", limit=5)[0]["action"] == "ab"
@@ -1,7 +1,7 @@
 import QtQuick 2.15
 import QtQuick.Controls 2.15
 import QtQuick.Layouts 1.15
-import QtQuick.Effects 1.15
+import QtQuick.Effects
 import QtQuick.Window 2.15
 
 Window {
@@ -26,8 +26,9 @@ Window {
     }
 
     property var statuses: Bridge.getStatuses()
+
+    function fmtSec(ms) { return ms >= 10000 ? Math.round(ms / 1000) + "s" : (ms / 1000).toFixed(1) + "s" }
     property bool ctState: Bridge.getClickThrough()
-    property var logLines: []
 
     function stateColor(st) {
         if (st === "ok") return "#3ECF8E";
@@ -91,13 +92,17 @@ Window {
                     id: kbBtn
                     text: "Ken Burns..."
                     visible: HasKenBurns
-                    onClicked: kbDialog.open()
+                    onClicked: {
+                        if (Bridge.loadKenBurns()) kbDialog.open()
+                        else toast.show("Ken Burns unavailable", "error")
+                    }
                 }
                 Button {
                     id: logBtn
                     text: logPanel.visible ? "Hide Log" : "Show Log"
                     onClicked: logPanel.visible = !logPanel.visible
                 }
+                Button { text: "Job logs..."; onClicked: jobLogDialog.open() }
                 Button { text: "Close"; onClicked: Qt.quit() }
             }
             MouseArea {
@@ -107,54 +112,93 @@ Window {
             }
         }
 
-        Flow {
+        // only visible delegates exist; scrolled-out ones go back to a pool
+        // and are rebound to the next row instead of being destroyed
+        ListView {
             id: pinRow
             width: parent.width
+            height: count > 0 ? 32 : 0
+            visible: count > 0
+            orientation: ListView.Horizontal
             spacing: 4
-            Repeater {
-                id: repPinned
-                model: Bridge.getPinned()
-                delegate: Item {
-                    width: 120; height: 32
-                    Button {
-                        id: pbtn
-                        anchors.fill: parent
-                        text: modelData.label
-                        onClicked: { if (!Bridge.runAction(modelData.id)) toast.show("Action failed", "error") }
-                    }
-                    Row {
-                        anchors.right: pbtn.right
-                        anchors.top: pbtn.top
-                        spacing: 2
-                        Button { text:"◀"; onClicked: Bridge.movePinned(index, index-1) }
-                        Button { text:"▶"; onClicked: Bridge.movePinned(index, index+1) }
-                        Button { text:"✕"; onClicked: Bridge.unpinAction(modelData.id) }
-                    }
+            clip: true
+            reuseItems: true
+            model: PinnedModel
+            delegate: Item {
+                width: 120; height: 32
+                Button {
+                    id: pbtn
+                    anchors.fill: parent
+                    text: model.label
+                    onClicked: { if (!Bridge.runAction(model.actionId)) toast.show("Action failed", "error") }
+                    onPressAndHold: Bridge.forceRunAction(model.actionId)
+                }
+                Row {
+                    anchors.right: pbtn.right
+                    anchors.top: pbtn.top
+                    spacing: 2
+                    Button { text:"◀"; onClicked: Bridge.movePinned(index, index-1) }
+                    Button { text:"▶"; onClicked: Bridge.movePinned(index, index+1) }
+                    Button { text:"✕"; onClicked: Bridge.unpinAction(model.actionId) }
                 }
             }
         }
 
-        Flow {
-            id: actionsFlow
+        GridView {
+            id: actionsGrid
+            objectName: "actionsGrid"
             width: parent.width
-            spacing: 4
-            Repeater {
-                id: repAll
-                model: Bridge.getActions()
-                delegate: Item {
-                    width: 140; height: 40
-                    property bool pinned: Bridge.isPinned(modelData.id)
-                    Button {
-                        id: abtn
-                        anchors.fill: parent
-                        text: modelData.label
-                        onClicked: { if (!Bridge.runAction(modelData.id)) toast.show("Action failed", "error") }
-                    }
-                    Button {
-                        text: pinned ? "★" : "☆"
-                        anchors.right: abtn.right
-                        anchors.top: abtn.top
-                        onClicked: pinned ? Bridge.unpinAction(modelData.id) : Bridge.pinAction(modelData.id)
+            height: mainCol.height - header.height - (pinRow.visible ? pinRow.height + mainCol.spacing : 0) - mainCol.spacing
+            clip: true
+            cellWidth: 144
+            cellHeight: 44
+            // one extra row each way is incubated ahead of scrolling
+            cacheBuffer: cellHeight * 2
+            reuseItems: true
+            model: ActionsModel
+            ScrollBar.vertical: ScrollBar {}
+            delegate: Item {
+                width: 140; height: 40
+                // cheap stand-in until the async Loader has built the button
+                Rectangle {
+                    anchors.fill: parent
+                    visible: tile.status !== Loader.Ready
+                    color: "#2C2C2C"
+                    radius: 3
+                }
+                Loader {
+                    id: tile
+                    anchors.fill: parent
+                    asynchronous: true
+                    sourceComponent: Component {
+                        Item {
+                            Button {
+                                id: abtn
+                                anchors.fill: parent
+                                text: model.label
+                                onClicked: { if (!Bridge.runAction(model.actionId)) toast.show("Action failed", "error") }
+                                onPressAndHold: Bridge.forceRunAction(model.actionId)
+                                ToolTip.visible: hovered && model.runs > 0
+                                ToolTip.text: "Last " + model.runs + " runs: p50 " + root.fmtSec(model.p50Ms)
+                                              + ", p95 " + root.fmtSec(model.p95Ms)
+                            }
+                            // rolling duration stats from the run history
+                            Text {
+                                anchors.left: abtn.left
+                                anchors.bottom: abtn.bottom
+                                anchors.margins: 3
+                                visible: model.runs > 0
+                                text: root.fmtSec(model.p50Ms) + " · p95 " + root.fmtSec(model.p95Ms)
+                                font.pixelSize: 9
+                                color: "#BBBBBB"
+                            }
+                            Button {
+                                text: model.pinned ? "★" : "☆"
+                                anchors.right: abtn.right
+                                anchors.top: abtn.top
+                                onClicked: model.pinned ? Bridge.unpinAction(model.actionId) : Bridge.pinAction(model.actionId)
+                            }
+                        }
                     }
                 }
             }
@@ -170,11 +214,28 @@ Window {
         visible: false
         color: "#101010"
         opacity: 0.8
-        TextArea {
-            id: logArea
+        ListView {
+            id: logView
             anchors.fill: parent
-            readOnly: true
-            color: "white"
+            anchors.margins: 4
+            clip: true
+            model: LogModel
+            // follow the tail unless the user scrolled up
+            property bool follow: true
+            onMovementEnded: follow = atYEnd
+            // count stays flat once the ring buffer is full, so watch inserts
+            Connections {
+                target: LogModel
+                function onRowsInserted() { if (logView.follow) Qt.callLater(logView.positionViewAtEnd) }
+            }
+            delegate: Text {
+                width: ListView.view.width
+                text: model.line
+                color: "white"
+                font.family: "monospace"
+                elide: Text.ElideRight
+            }
+            ScrollBar.vertical: ScrollBar {}
         }
     }
 
@@ -212,15 +273,148 @@ Window {
         }
     }
 
+    // full per-job logs from disk; rows are read from the file as they scroll into view
+    Dialog {
+        id: jobLogDialog
+        modal: true
+        title: "Job logs"
+        width: root.width * 0.9
+        height: root.height * 0.8
+        standardButtons: Dialog.Close
+        property var logs: []
+        onOpened: {
+            logs = Bridge.getJobLogs();
+            JobLog.open(logs.length ? logs[0].path : "");
+        }
+        onClosed: JobLog.close()
+        ColumnLayout {
+            anchors.fill: parent
+            ComboBox {
+                Layout.fillWidth: true
+                model: jobLogDialog.logs
+                textRole: "name"
+                onActivated: JobLog.open(jobLogDialog.logs[currentIndex].path)
+            }
+            ListView {
+                id: jobLogView
+                Layout.fillWidth: true
+                Layout.fillHeight: true
+                clip: true
+                model: JobLog
+                property bool follow: true
+                onMovementEnded: follow = atYEnd
+                Connections {
+                    target: JobLog
+                    function onRowsInserted() { if (jobLogView.follow) Qt.callLater(jobLogView.positionViewAtEnd) }
+                    function onModelReset() { jobLogView.follow = true; Qt.callLater(jobLogView.positionViewAtEnd) }
+                }
+                delegate: Text {
+                    width: ListView.view.width
+                    text: model.line
+                    font.family: "monospace"
+                    elide: Text.ElideRight
+                }
+                ScrollBar.vertical: ScrollBar {}
+            }
+        }
+    }
+
+    // command palette: fuzzy search over the actions of every mode
+    Shortcut {
+        sequence: "Ctrl+K"
+        context: Qt.ApplicationShortcut
+        onActivated: palette.opened ? palette.close() : palette.open()
+    }
+
+    Popup {
+        id: palette
+        modal: true
+        focus: true
+        x: (root.width - width) / 2
+        y: 8
+        width: root.width * 0.9
+        height: Math.min(root.height - 16, 280)
+        padding: 6
+        onOpened: {
+            paletteQuery.text = "";
+            PaletteModel.setQuery("");
+            paletteList.currentIndex = 0;
+            paletteQuery.forceActiveFocus();
+        }
+        function runCurrent() {
+            var item = paletteList.currentItem;
+            if (!item) return;
+            close();
+            if (!Bridge.runPaletteItem(item.mode, item.actionId)) toast.show("Action failed", "error");
+        }
+        background: Rectangle { color: "#262626"; radius: 6; border.color: "#444444" }
+        ColumnLayout {
+            anchors.fill: parent
+            spacing: 4
+            TextField {
+                id: paletteQuery
+                Layout.fillWidth: true
+                placeholderText: "Run action..."
+                onTextEdited: { PaletteModel.setQuery(text); paletteList.currentIndex = 0 }
+                Keys.onDownPressed: paletteList.incrementCurrentIndex()
+                Keys.onUpPressed: paletteList.decrementCurrentIndex()
+                Keys.onReturnPressed: palette.runCurrent()
+                Keys.onEnterPressed: palette.runCurrent()
+            }
+            ListView {
+                id: paletteList
+                Layout.fillWidth: true
+                Layout.fillHeight: true
+                clip: true
+                model: PaletteModel
+                highlightMoveDuration: 0
+                highlight: Rectangle { color: "#3A3A3A"; radius: 3 }
+                delegate: Item {
+                    property string mode: model.mode
+                    property string actionId: model.actionId
+                    width: ListView.view.width
+                    height: 34
+                    Column {
+                        anchors.fill: parent
+                        anchors.leftMargin: 6
+                        anchors.rightMargin: 6
+                        Row {
+                            width: parent.width
+                            spacing: 6
+                            Text { text: model.label; color: "white"; font.pixelSize: 13 }
+                            Text {
+                                text: model.mode
+                                visible: model.mode !== Bridge.getMode()
+                                color: "#8AB4F8"
+                                font.pixelSize: 10
+                                anchors.verticalCenter: parent.verticalCenter
+                            }
+                        }
+                        Text {
+                            width: parent.width
+                            text: model.command
+                            color: "#999999"
+                            font.pixelSize: 10
+                            font.family: "monospace"
+                            elide: Text.ElideRight
+                        }
+                    }
+                    MouseArea {
+                        anchors.fill: parent
+                        onClicked: { paletteList.currentIndex = index; palette.runCurrent() }
+                    }
+                }
+            }
+        }
+    }
+
     Connections {
         target: Bridge
-        function onActionsChanged() {
-            repAll.model = Bridge.getActions();
-            repPinned.model = Bridge.getPinned();
-        }
-        function onPinnedChanged() {
-            repPinned.model = Bridge.getPinned();
-            repAll.model = Bridge.getActions();
+        function onPaletteRequested() {
+            root.show();
+            root.raise();
+            root.requestActivate();
+            palette.open();
         }
         function onModeChanged() {
             modeBox.model = Bridge.getModes();
@@ -237,12 +431,6 @@ Window {
         function onNotify(msg) {
             toast.show(msg, "info");
         }
-        function onLog(text) {
-            logLines.push(text);
-            if (logLines.length > 200) logLines.shift();
-            logArea.text = logLines.join('\n');
-            logArea.cursorPosition = logArea.text.length;
-        }
     }
 
 }